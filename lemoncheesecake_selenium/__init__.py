@@ -1,7 +1,68 @@
-from .selector import Selector
-from .selection import Selection
-from .matchers import has_text, has_attribute, has_property, is_displayed, is_enabled, is_selected, is_in_page
-from .utils import save_screenshot, save_screenshot_on_exception
+import importlib
+
+# The public API is imported on first access (PEP 562) so that importing the package
+# (for instance while collecting tests that do not use a browser) does not import selenium.
+_PUBLIC_API = {
+    "Selector": "selector",
+    "Selection": "selection",
+    "MultiSelector": "multi",
+    "Page": "page",
+    "by_id": "page",
+    "by_xpath": "page",
+    "by_link_text": "page",
+    "by_partial_link_text": "page",
+    "by_name": "page",
+    "by_tag_name": "page",
+    "by_class_name": "page",
+    "by_css_selector": "page",
+    "has_text": "matchers",
+    "has_attribute": "matchers",
+    "has_property": "matchers",
+    "is_displayed": "matchers",
+    "is_enabled": "matchers",
+    "is_selected": "matchers",
+    "is_in_page": "matchers",
+    "has_css": "matchers",
+    "has_size": "matchers",
+    "is_in_viewport": "matchers",
+    "is_not_obscured": "matchers",
+    "each": "matchers",
+    "any_": "matchers",
+    "none_": "matchers",
+    "count_of": "matchers",
+    "looks_like": "visual",
+    "has_row": "table",
+    "contains_rows": "table",
+    "save_screenshot": "utils",
+    "save_screenshot_on_exception": "utils",
+    "save_page_source": "utils",
+    "save_page_source_on_exception": "utils",
+    "instrument_driver": "instrumentation",
+    "Profiler": "profiler",
+    "SlowStepDetector": "slowsteps",
+    "TraceRecorder": "recording",
+    "ReplayDriver": "recording",
+    "SessionPool": "session",
+    "StorageState": "storage",
+    "StoredLogin": "storage",
+    "TimeoutLearner": "timeouts",
+    "Tracer": "tracing",
+    "DurationScheduler": "scheduling",
+}
 
 # for pydoc & sphinx
-__all__ = [sym_name for sym_name in dir() if not sym_name.startswith("_")]
+__all__ = sorted(_PUBLIC_API)
+
+
+def __getattr__(name):
+    try:
+        module_name = _PUBLIC_API[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_PUBLIC_API))
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import io
+import threading
+import weakref
+from typing import Sequence, TYPE_CHECKING
+
+from lemoncheesecake_selenium.instrumentation import step
+from lemoncheesecake_selenium.screenshot import write_screenshot
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+
+# the page state token changes on navigation (the page state is lost), DOM mutation, scroll, resize and zoom;
+# in full page mode, the rects are relative to the document instead of the viewport
+_RECTS_SCRIPT = """
+var w = window;
+if (!w.__lccCapture) {
+    var created = w.__lccCapture = {id: Math.random().toString(36).slice(2), mutations: 0};
+    new MutationObserver(function () { created.mutations++; }).observe(
+        document, {subtree: true, childList: true, attributes: true, characterData: true}
+    );
+}
+var state = w.__lccCapture, fullPage = arguments[1];
+var offsetX = fullPage ? w.scrollX : 0, offsetY = fullPage ? w.scrollY : 0;
+return {
+    token: [
+        state.id, state.mutations, location.href, w.innerWidth, w.innerHeight, w.devicePixelRatio,
+        fullPage ? "full" : w.scrollX + "," + w.scrollY
+    ].join("|"),
+    ratio: w.devicePixelRatio,
+    rects: arguments[0].map(function (element) {
+        var rect = element.getBoundingClientRect();
+        return [rect.left + offsetX, rect.top + offsetY, rect.width, rect.height];
+    })
+};
+"""
+
+
+def _import_pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+class CaptureCache:
+    """
+    Keep the last page capture of a driver so that several element screenshots can be cropped from it
+    instead of each of them requiring a capture by the browser.
+
+    The capture is taken again when the page state has changed since it was taken (navigation, DOM mutation,
+    scroll, window resize) and is dropped on each mutating :py:class:`Selection` action (click, set_text, etc...).
+    Cropping requires the optional ``Pillow`` dependency, without it each element is captured by the browser.
+    """
+
+    def __init__(self, driver: WebDriver):
+        self._driver_ref = weakref.ref(driver)
+        self._lock = threading.Lock()
+        self._image = None
+        self._token = None
+        self._full_page = None
+
+    def invalidate(self):
+        """
+        Drop the cached capture.
+        """
+        with self._lock:
+            self._image = None
+            self._token = None
+
+    def _capture(self, driver, full_page):
+        Image = _import_pillow()
+        if full_page and hasattr(driver, "get_full_page_screenshot_as_png"):
+            png = driver.get_full_page_screenshot_as_png()
+        else:
+            png = driver.get_screenshot_as_png()
+        image = Image.open(io.BytesIO(png))
+        image.load()
+        return image
+
+    def write_element_screenshots(self, elements: Sequence[WebElement], paths: Sequence[str], *,
+                                  full_page: bool = False):
+        """
+        Write the screenshots of ``elements`` as PNG into ``paths``. The bounding rects of the elements are fetched
+        with a single WebDriver command and each screenshot is cropped from the cached capture, the elements that
+        are not entirely within the capture (or have an empty size) are captured by the browser.
+        The driver must be switched to the top level browsing context.
+
+        :param elements: the ``WebElement`` instances
+        :param paths: the PNG file paths
+        :param full_page: whether the capture must be of the full page (only supported by Firefox)
+            instead of the viewport
+        """
+        driver = self._driver_ref()
+        full_page = full_page and hasattr(driver, "get_full_page_screenshot_as_png")
+        if _import_pillow() is None:
+            for element, path in zip(elements, paths):
+                write_screenshot(driver, path, element)
+            return
+
+        result = driver.execute_script(_RECTS_SCRIPT, list(elements), full_page)
+        with self._lock:
+            if self._image is None or result["token"] != self._token or full_page != self._full_page:
+                with step("screenshot", full_page=full_page):
+                    self._image = self._capture(driver, full_page)
+                self._token, self._full_page = result["token"], full_page
+            image = self._image
+
+        ratio = result["ratio"] or 1
+        for element, path, (x, y, width, height) in zip(elements, paths, result["rects"]):
+            box = (round(x * ratio), round(y * ratio), round((x + width) * ratio), round((y + height) * ratio))
+            if box[0] < 0 or box[1] < 0 or box[2] > image.width or box[3] > image.height \
+                    or box[2] <= box[0] or box[3] <= box[1]:
+                write_screenshot(driver, path, element)
+            else:
+                image.crop(box).save(path, "PNG")
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def get_capture_cache(driver: WebDriver) -> CaptureCache:
+    """
+    :param driver: ``WebDriver`` instance
+    :return: the :py:class:`CaptureCache` associated to ``driver``
+    """
+    with _caches_lock:
+        try:
+            return _caches[driver]
+        except KeyError:
+            cache = _caches[driver] = CaptureCache(driver)
+            return cache
+
+
+def invalidate_capture_cache(driver: WebDriver):
+    """
+    Drop the cached capture of ``driver`` (if any).
+
+    :param driver: ``WebDriver`` instance
+    """
+    with _caches_lock:
+        cache = _caches.get(driver)
+    if cache is not None:
+        cache.invalidate()
@@ -0,0 +1,302 @@
+"""
+Expected conditions to be used with :py:meth:`Selection.must_be_waited_until`,
+they share the signature of selenium's ``expected_conditions`` functions.
+"""
+
+import time
+import functools
+
+from lemoncheesecake_selenium.iteration import FIND_JS_FUNCTION, to_script_locator
+from lemoncheesecake_selenium.snapshot import SNAPSHOT_JS_FUNCTION
+
+
+_ACTIVITY_SCRIPT = """
+var w = window;
+if (!w.__lccActivity) {
+    var activity = w.__lccActivity = {inflight: 0, lastNetwork: performance.now(), lastMutation: performance.now()};
+    var touch = function () { activity.lastNetwork = performance.now(); };
+    if (w.fetch) {
+        var origFetch = w.fetch;
+        w.fetch = function () {
+            activity.inflight++;
+            touch();
+            var done = function () { activity.inflight--; touch(); };
+            return origFetch.apply(this, arguments).then(
+                function (response) { done(); return response; },
+                function (error) { done(); throw error; }
+            );
+        };
+    }
+    var origSend = w.XMLHttpRequest.prototype.send;
+    w.XMLHttpRequest.prototype.send = function () {
+        activity.inflight++;
+        touch();
+        this.addEventListener("loadend", function () { activity.inflight--; touch(); });
+        return origSend.apply(this, arguments);
+    };
+    if (w.PerformanceObserver) {
+        try { new PerformanceObserver(touch).observe({entryTypes: ["resource"]}); } catch (e) {}
+    }
+    new MutationObserver(function () { activity.lastMutation = performance.now(); }).observe(
+        document, {subtree: true, childList: true, attributes: true, characterData: true}
+    );
+}
+var activity = w.__lccActivity, now = performance.now();
+var animations = document.getAnimations ? document.getAnimations().filter(function (animation) {
+    return animation.playState === "running" &&
+        !(animation.effect && animation.effect.getTiming().iterations === Infinity);
+}).length : 0;
+return {
+    ready: document.readyState === "complete",
+    inflight: activity.inflight,
+    network_idle: (now - activity.lastNetwork) / 1000,
+    dom_idle: (now - activity.lastMutation) / 1000,
+    animations: animations
+};
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _get_shadow_root_class():
+    try:
+        from selenium.webdriver.remote.shadowroot import ShadowRoot
+    except ImportError:
+        # selenium < 4.1 does not support shadow roots
+        return None
+    return ShadowRoot
+
+
+def _get_driver(search_context):
+    shadow_root_class = _get_shadow_root_class()
+    # explicit waits on selections in a shadow root are performed against the shadow root
+    if shadow_root_class is not None and isinstance(search_context, shadow_root_class):
+        return search_context.session
+    return search_context
+
+
+def get_page_activity(driver) -> dict:
+    """
+    Get the network and DOM activity of the current page. The activity tracker is injected in the page
+    on the first call, the activity that occurred before that is then ignored.
+
+    :param driver: ``WebDriver`` instance
+    :return: a dict with the following keys: ``ready`` (whether the document is loaded),
+        ``inflight`` (number of pending fetch/XHR requests), ``network_idle`` (seconds since the last network activity),
+        ``dom_idle`` (seconds since the last DOM mutation), ``animations`` (number of running finite animations)
+    """
+    return _get_driver(driver).execute_script(_ACTIVITY_SCRIPT)
+
+
+def network_is_idle(locator=None, quiet_period: float = 0.5):
+    """
+    Expected condition: the page is loaded and no fetch/XHR request has been in flight
+    (nor any resource loaded) for ``quiet_period`` seconds.
+
+    :param locator: ignored, the condition applies to the whole page
+    :param quiet_period: the period of time (in seconds) with no network activity
+    """
+    def predicate(driver):
+        activity = get_page_activity(driver)
+        return activity["ready"] and activity["inflight"] == 0 and activity["network_idle"] >= quiet_period
+
+    return predicate
+
+
+def dom_is_settled(locator=None, quiet_period: float = 0.5):
+    """
+    Expected condition: the DOM has not been mutated for ``quiet_period`` seconds and no (finite) animation
+    is running.
+
+    :param locator: ignored, the condition applies to the whole page
+    :param quiet_period: the period of time (in seconds) with no DOM mutation
+    """
+    def predicate(driver):
+        activity = get_page_activity(driver)
+        return activity["dom_idle"] >= quiet_period and activity["animations"] == 0
+
+    return predicate
+
+
+def page_is_settled(locator=None, quiet_period: float = 0.5):
+    """
+    Expected condition: both :py:func:`network_is_idle` and :py:func:`dom_is_settled`.
+
+    :param locator: ignored, the condition applies to the whole page
+    :param quiet_period: the period of time (in seconds) with no network activity nor DOM mutation
+    """
+    def predicate(driver):
+        activity = get_page_activity(driver)
+        return activity["ready"] and activity["inflight"] == 0 and activity["animations"] == 0 and \
+            min(activity["network_idle"], activity["dom_idle"]) >= quiet_period
+
+    return predicate
+
+
+_CHECK_JS_FUNCTION = """
+function (root, using, value, name, args, state) {
+    var find = %s, snapshot = %s;
+    if (name === "staleness") {
+        if (state.element === undefined) {
+            state.element = find(using, value, root, true)[0] || null;
+        }
+        return !state.element || !state.element.isConnected;
+    }
+    var element = find(using, value, root, true)[0];
+    if (name === "presence") {
+        return !!element;
+    }
+    if (name === "invisibility") {
+        return !element || !snapshot([element], ["displayed"])[0].displayed;
+    }
+    if (!element) {
+        return false;
+    }
+    if (name === "visibility") {
+        return snapshot([element], ["displayed"])[0].displayed;
+    }
+    if (name === "clickable") {
+        var data = snapshot([element], ["displayed", "enabled"])[0];
+        return data.displayed && data.enabled;
+    }
+    if (name === "text") {
+        return snapshot([element], ["text"])[0].text.indexOf(args[0]) >= 0;
+    }
+    if (name === "attribute") {
+        var attribute = snapshot([element], ["attribute:" + args[0]])[0]["attribute:" + args[0]];
+        return attribute !== null && attribute.indexOf(args[1]) >= 0;
+    }
+    throw new Error("unknown condition " + name);
+}
+""" % (FIND_JS_FUNCTION, SNAPSHOT_JS_FUNCTION)
+
+# "root" is either a shadow host, a shadow root or null for the current document
+_CHECK_SCRIPT = """
+var root = arguments[0] ? (arguments[0].shadowRoot || arguments[0]) : document;
+var state = arguments[6] ? {element: arguments[5]} : {};
+var met = (%s)(root, arguments[1], arguments[2], arguments[3], arguments[4], state);
+return {met: met, element: state.element || null};
+"""
+
+# resolve as soon as a DOM mutation makes the condition (or its negation if "reverse") true,
+# a low frequency poll catches the changes that are not DOM mutations (such as stylesheet changes)
+_OBSERVE_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var root = arguments[0] ? (arguments[0].shadowRoot || arguments[0]) : document;
+var using = arguments[1], value = arguments[2], name = arguments[3], args = arguments[4], reverse = arguments[5];
+var check = %s, state = {};
+var evaluate = function () { return check(root, using, value, name, args, state) !== reverse; };
+if (evaluate()) {
+    done(true);
+    return;
+}
+var finish = function (met) {
+    observer.disconnect();
+    clearTimeout(timer);
+    clearInterval(poll);
+    done(met);
+};
+var onChange = function () {
+    if (evaluate()) {
+        finish(true);
+    }
+};
+var observer = new MutationObserver(onChange);
+observer.observe(root, {subtree: true, childList: true, attributes: true, characterData: true});
+var poll = setInterval(onChange, arguments[7]);
+var timer = setTimeout(function () { finish(false); }, arguments[6]);
+"""
+
+# selenium enforces a script timeout (30s by default) on asynchronous scripts, long waits are performed by slices
+_MAX_OBSERVE_DURATION = 20
+
+
+class BrowserCondition:
+    """
+    An expected condition evaluated in the browser. It can be used as any selenium expected condition,
+    but when passed to :py:meth:`Selection.must_be_waited_until` / :py:meth:`Selection.must_be_waited_until_not`,
+    the wait is performed by a single asynchronous script that reacts to DOM mutations
+    instead of being polled from Python.
+    """
+
+    #: the interval (in seconds) of the in-browser poll that complements the DOM mutation observer
+    poll_interval = 0.25
+
+    def __init__(self, name: str, condition: str, arg_count: int = 0):
+        self.__name__ = name
+        self.condition = condition
+        self.arg_count = arg_count
+
+    def __call__(self, locator, *args):
+        if len(args) != self.arg_count:
+            raise TypeError(f"{self.__name__} expects {self.arg_count} extra argument(s), got {len(args)}")
+        by, value = to_script_locator(*locator)
+        state = {}
+
+        def predicate(search_context):
+            # ShadowRoot instances can be passed to scripts (with selenium versions that support it)
+            root = None if search_context is _get_driver(search_context) else search_context
+            result = _get_driver(search_context).execute_script(
+                _CHECK_SCRIPT % _CHECK_JS_FUNCTION, root, by, value, self.condition, list(args),
+                state.get("element"), "element" in state
+            )
+            state["element"] = result["element"]
+            return result["met"]
+
+        return predicate
+
+    def wait(self, driver, locator, args, *, host=None, reverse: bool = False, timeout: float):
+        """
+        Wait for the condition to be met (or not met if ``reverse`` is set) with asynchronous scripts.
+
+        :param driver: ``WebDriver`` instance (already switched into the right frame)
+        :param locator: a ``(by, value)`` tuple
+        :param args: the extra arguments of the condition
+        :param host: the shadow host in which the element must be searched (if any)
+        :param reverse: wait for the condition not to be met
+        :param timeout: timeout (in seconds)
+        :raise TimeoutException: if the condition has not been fulfilled in time
+        """
+        from selenium.common import exceptions
+        from selenium.common.exceptions import TimeoutException, JavascriptException
+        # older selenium versions report script timeouts as TimeoutException
+        script_timeout_exceptions = (TimeoutException, getattr(exceptions, "ScriptTimeoutException", TimeoutException))
+
+        by, value = to_script_locator(*locator)
+        deadline = time.monotonic() + timeout
+        while True:
+            duration = max(min(deadline - time.monotonic(), _MAX_OBSERVE_DURATION), 0)
+            try:
+                met = driver.execute_async_script(
+                    _OBSERVE_SCRIPT % _CHECK_JS_FUNCTION, host, by, value, self.condition, list(args), reverse,
+                    round(duration * 1000), round(self.poll_interval * 1000)
+                )
+            except script_timeout_exceptions:
+                # the script timeout of the session is shorter than the requested duration
+                met = False
+            except JavascriptException as exc:
+                # like WebDriverWait, keep waiting across a navigation: the script is issued again on the new page
+                if "unload" not in (exc.msg or "").lower():
+                    raise
+                met = False
+                time.sleep(self.poll_interval)
+            if met:
+                return
+            if time.monotonic() >= deadline:
+                raise TimeoutException("expected condition has not been fulfilled")
+
+
+#: Browser-side equivalent of selenium's ``presence_of_element_located``
+presence_of_element_located = BrowserCondition("presence_of_element_located", "presence")
+#: Browser-side equivalent of selenium's ``visibility_of_element_located``
+visibility_of_element_located = BrowserCondition("visibility_of_element_located", "visibility")
+#: Browser-side equivalent of selenium's ``element_to_be_clickable`` (with a locator)
+element_to_be_clickable = BrowserCondition("element_to_be_clickable", "clickable")
+#: Browser-side equivalent of selenium's ``text_to_be_present_in_element``
+text_to_be_present_in_element = BrowserCondition("text_to_be_present_in_element", "text", 1)
+#: Browser-side equivalent of selenium's ``text_to_be_present_in_element_attribute``
+text_to_be_present_in_element_attribute = BrowserCondition("text_to_be_present_in_element_attribute", "attribute", 2)
+#: The element found when the wait starts is removed from the page (or there is no such element);
+#: browser-side counterpart of selenium's ``staleness_of``, but based on a locator
+staleness_of_element_located = BrowserCondition("staleness_of_element_located", "staleness")
+#: Browser-side equivalent of selenium's ``invisibility_of_element_located``
+invisibility_of_element_located = BrowserCondition("invisibility_of_element_located", "invisibility")
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import NamedTuple, Tuple, Optional
+
+from selenium.common import exceptions
+
+FRAME = "frame"
+SHADOW = "shadow"
+
+# the exceptions raised when the frames / shadow roots of a context are no longer (or not yet) attached,
+# selenium < 4.1 does not support shadow roots and has no DetachedShadowRootException
+STALE_CONTEXT_EXCEPTIONS = (
+    exceptions.StaleElementReferenceException, exceptions.NoSuchFrameException,
+    getattr(exceptions, "DetachedShadowRootException", exceptions.StaleElementReferenceException)
+)
+
+
+class ContextEntry(NamedTuple):
+    #: either ``"frame"`` or ``"shadow"``
+    kind: str
+    #: the ``By`` of the frame element / shadow host
+    by: str
+    #: the value of the frame element / shadow host
+    value: str
+
+
+Context = Tuple[ContextEntry, ...]
+
+#: A JS function expression returning the number of frames between the current browsing context
+#: and the top-level one.
+FRAME_DEPTH_JS_FUNCTION = """
+function () {
+    var depth = 0;
+    for (var w = window; w !== w.parent; w = w.parent) {
+        depth++;
+    }
+    return depth;
+}
+"""
+
+_FRAME_DEPTH_SCRIPT = "return (%s)();" % FRAME_DEPTH_JS_FUNCTION
+
+
+def _get_frame_depth(context: Context) -> int:
+    return sum(1 for entry in context if entry.kind == FRAME)
+
+
+class ContextTracker:
+    """
+    Keep track of the browsing context a driver is currently switched to and of
+    the shadow roots that have already been resolved, so that frame switches and shadow root
+    lookups are only issued when actually needed.
+    """
+
+    def __init__(self, driver):
+        self._driver_ref = weakref.ref(driver)
+        # the frames the driver is currently switched into, None means unknown
+        self._frames: Optional[Context] = ()
+        # whether the driver must be checked to still be in the frames before using them
+        self._check_frames = False
+        self._shadow_roots = {}
+
+    def invalidate(self):
+        """
+        Forget the current browsing context and the resolved shadow roots, to be called when the driver's
+        browsing context has been changed behind the tracker's back (manual frame switch, navigation, etc...).
+        """
+        self._frames = None
+        self._check_frames = False
+        self._shadow_roots.clear()
+
+    def suspect_navigation(self):
+        """
+        To be called when the page may have navigated: a top-level navigation brings the driver back to
+        the top-level document. If the driver is switched into frames, it is checked to still be in them
+        the next time they are used, in the same command as the element lookup when possible
+        (see :py:meth:`ContextTracker.get_frame_depth_to_check`).
+        The resolved shadow roots are kept, the stale ones are detected when used.
+        """
+        if self._frames:
+            self._check_frames = True
+
+    def get_frame_depth_to_check(self, context: Context) -> Optional[int]:
+        """
+        :param context: the context of the elements to be searched in the document of its last frame
+        :return: the number of frames the driver must be in (see :py:data:`FRAME_DEPTH_JS_FUNCTION`)
+            if ``context`` is made of the frames the driver is switched into and these frames must be checked,
+            ``None`` otherwise
+        """
+        if self._check_frames and context == self._frames:
+            return _get_frame_depth(context)
+        return None
+
+    def set_frames_checked(self, valid: bool):
+        """
+        :param valid: whether the driver is still in the frames it has been switched into
+        """
+        if valid:
+            self._check_frames = False
+        else:
+            self.invalidate()
+
+    def _resolve_shadow_root(self, search_context, path):
+        try:
+            return self._shadow_roots[path]
+        except KeyError:
+            entry = path[-1]
+            shadow_root = search_context.find_element(entry.by, entry.value).shadow_root
+            self._shadow_roots[path] = shadow_root
+            return shadow_root
+
+    def enter(self, context: Context):
+        """
+        Make the driver's browsing context match ``context``.
+
+        :param context: the frames and shadow hosts leading to the searched elements
+        :return: the object (``WebDriver`` or ``ShadowRoot``) on which elements must be searched
+        """
+        driver = self._driver_ref()
+
+        last_frame_idx = max((idx for idx, entry in enumerate(context) if entry.kind == FRAME), default=-1)
+        frames = context[:last_frame_idx + 1]
+
+        if self._check_frames and frames == self._frames:
+            self.set_frames_checked(driver.execute_script(_FRAME_DEPTH_SCRIPT) == _get_frame_depth(frames))
+
+        # as long as no frame has been entered through the tracker, frames are left to the user's hands
+        if frames != self._frames:
+            driver.switch_to.default_content()
+            self._frames = None
+            self._check_frames = False
+            search_context = driver
+            for idx, entry in enumerate(frames):
+                if entry.kind == FRAME:
+                    driver.switch_to.frame(search_context.find_element(entry.by, entry.value))
+                    search_context = driver
+                else:
+                    search_context = self._resolve_shadow_root(search_context, context[:idx + 1])
+            self._frames = frames
+
+        search_context = driver
+        for idx in range(last_frame_idx + 1, len(context)):
+            search_context = self._resolve_shadow_root(search_context, context[:idx + 1])
+        return search_context
+
+
+_trackers = weakref.WeakKeyDictionary()
+_trackers_lock = threading.Lock()
+
+
+def get_context_tracker(driver) -> ContextTracker:
+    """
+    :param driver: ``WebDriver`` instance
+    :return: the :py:class:`ContextTracker` associated to ``driver``
+    """
+    with _trackers_lock:
+        try:
+            return _trackers[driver]
+        except KeyError:
+            tracker = _trackers[driver] = ContextTracker(driver)
+            return tracker
@@ -0,0 +1,163 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class Step:
+    """
+    A timed unit of work performed by lemoncheesecake-selenium (an action on a
+    :py:class:`Selection`, an explicit wait, a check, a screenshot, a WebDriver command, etc...).
+    """
+
+    __slots__ = ("kind", "selection", "details", "parent", "start", "end", "error")
+
+    def __init__(self, kind: str, selection=None, details: dict = None, parent: "Step" = None):
+        #: the kind of step (``"find"``, ``"wait"``, ``"click"``, ``"set_text"``, ``"select"``,
+        #: ``"check"``, ``"screenshot"``, ``"command"``, etc...)
+        self.kind = kind
+        #: the :py:class:`Selection` the step is related to (if any)
+        self.selection = selection
+        #: extra information about the step (such as the WebDriver command name)
+        self.details = details or {}
+        #: the enclosing step (if any)
+        self.parent = parent
+        #: start time (as returned by ``time.perf_counter()``)
+        self.start = None
+        #: end time (as returned by ``time.perf_counter()``)
+        self.end = None
+        #: the exception that interrupted the step (if any)
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        """
+        The step duration in seconds.
+        """
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    @property
+    def label(self) -> str:
+        """
+        A short human readable label such as ``"click element identified by id 'login'"``.
+        """
+        if self.selection is not None:
+            return f"{self.kind} {self.selection}"
+        if "command" in self.details:
+            return f"{self.kind} {self.details['command']}"
+        return self.kind
+
+
+class Listener:
+    """
+    Base class for step listeners, see :py:func:`add_listener`.
+    """
+
+    def enable(self):
+        """
+        Start listening to steps.
+        """
+        add_listener(self)
+
+    def disable(self):
+        """
+        Stop listening to steps.
+        """
+        remove_listener(self)
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *_):
+        self.disable()
+
+    def on_step_start(self, step: Step):
+        pass
+
+    def on_step_end(self, step: Step):
+        pass
+
+
+_listeners = ()
+_listeners_lock = threading.Lock()
+_local = threading.local()
+
+
+def add_listener(listener: Listener):
+    """
+    Register a listener that will be notified of every step performed by lemoncheesecake-selenium.
+
+    :param listener: a :py:class:`Listener` instance
+    """
+    global _listeners
+    with _listeners_lock:
+        if listener not in _listeners:
+            _listeners = _listeners + (listener,)
+
+
+def remove_listener(listener: Listener):
+    """
+    Unregister a listener previously registered with :py:func:`add_listener`.
+
+    :param listener: a :py:class:`Listener` instance
+    """
+    global _listeners
+    with _listeners_lock:
+        _listeners = tuple(lst for lst in _listeners if lst is not listener)
+
+
+def current_step() -> Optional[Step]:
+    """
+    :return: the innermost step being performed in the current thread (if any)
+    """
+    return getattr(_local, "step", None)
+
+
+@contextmanager
+def step(kind: str, selection=None, **details):
+    # fast path: nobody is listening, do not pay for any bookkeeping
+    listeners = _listeners
+    if not listeners:
+        yield None
+        return
+
+    parent = getattr(_local, "step", None)
+    current = Step(kind, selection, details, parent)
+    _local.step = current
+    for listener in listeners:
+        listener.on_step_start(current)
+    current.start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = exc
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _local.step = parent
+        for listener in listeners:
+            listener.on_step_end(current)
+
+
+def instrument_driver(driver):
+    """
+    Make every WebDriver command issued through ``driver`` (including the commands issued
+    by its ``WebElement`` instances) reported as a ``"command"`` step.
+    Calling this function several times on the same driver has no additional effect.
+
+    :param driver: ``WebDriver`` instance
+    :return: ``driver``
+    """
+    if getattr(driver, "_lcc_instrumented", False) is True:
+        return driver
+
+    execute = driver.execute
+
+    def instrumented_execute(driver_command, params=None):
+        with step("command", command=driver_command):
+            return execute(driver_command, params)
+
+    driver.execute = instrumented_execute
+    driver._lcc_instrumented = True
+    return driver
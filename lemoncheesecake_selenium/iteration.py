@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import uuid
+from typing import Iterator, Iterable, Union, Optional, TYPE_CHECKING
+
+from selenium.common.exceptions import WebDriverException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from lemoncheesecake_selenium.snapshot import ElementSnapshot, SNAPSHOT_JS_FUNCTION
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
+
+
+_CHUNK_JS_FUNCTION = """
+function (matches, start, size, fields) {
+    var elements = matches.slice(start, start + size);
+    return {elements: elements, snapshots: fields ? (%s)(elements, fields) : null};
+}
+""" % SNAPSHOT_JS_FUNCTION
+
+#: A JS function expression returning the elements matching a (script) locator under a root node,
+#: in document order (only the first one if ``firstOnly`` is true).
+FIND_JS_FUNCTION = """
+function (using, value, root, firstOnly) {
+    if (using === "xpath") {
+        var doc = root.ownerDocument || root;
+        if (firstOnly) {
+            var first = doc.evaluate(value, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            return first ? [first] : [];
+        }
+        var result = doc.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null), matches = [];
+        for (var i = 0; i < result.snapshotLength; i++) {
+            matches.push(result.snapshotItem(i));
+        }
+        return matches;
+    }
+    if (using === "link text" || using === "partial link text") {
+        return Array.prototype.filter.call(root.querySelectorAll("a"), function (link) {
+            var text = (link.innerText || "").trim();
+            return using === "link text" ? text === value : text.indexOf(value) >= 0;
+        });
+    }
+    if (firstOnly) {
+        var element = root.querySelector(value);
+        return element ? [element] : [];
+    }
+    return Array.prototype.slice.call(root.querySelectorAll(value));
+}
+"""
+
+# the matching elements are kept in the page between two chunk fetches, so that the iteration order is stable
+_START_SCRIPT = """
+var using = arguments[0], value = arguments[1], host = arguments[2], key = arguments[3];
+var matches = (%s)(using, value, host ? host.shadowRoot : document, false);
+if (matches.length > arguments[4]) {
+    window.__lccIterations = window.__lccIterations || {};
+    window.__lccIterations[key] = matches;
+}
+var chunk = (%s)(matches, 0, arguments[4], arguments[5]);
+chunk.total = matches.length;
+return chunk;
+""" % (FIND_JS_FUNCTION, _CHUNK_JS_FUNCTION)
+
+_NEXT_SCRIPT = """
+var matches = window.__lccIterations && window.__lccIterations[arguments[0]];
+return matches ? (%s)(matches, arguments[1], arguments[2], arguments[3]) : null;
+""" % _CHUNK_JS_FUNCTION
+
+_END_SCRIPT = """
+if (window.__lccIterations) { delete window.__lccIterations[arguments[0]]; }
+"""
+
+
+def to_script_locator(by: str, value: str):
+    """
+    Convert a locator into a locator understood by :py:data:`FIND_JS_FUNCTION`
+    (the same conversions as selenium's ``WebDriver.find_elements``).
+    """
+    if by == By.ID:
+        return By.CSS_SELECTOR, f'[id="{value}"]'
+    if by == By.NAME:
+        return By.CSS_SELECTOR, f'[name="{value}"]'
+    if by == By.CLASS_NAME:
+        return By.CSS_SELECTOR, f".{value}"
+    if by == By.TAG_NAME:
+        return By.CSS_SELECTOR, value
+    return by, value
+
+
+def _make_items(chunk, fields):
+    if fields is None:
+        return chunk["elements"]
+    return [ElementSnapshot(data, element) for data, element in zip(chunk["snapshots"], chunk["elements"])]
+
+
+def iter_matches(driver, by: str, value: str, *, host: WebElement = None, chunk_size: int = 100,
+                 fields: Optional[Iterable[str]] = None) -> Iterator[Union[WebElement, ElementSnapshot]]:
+    """
+    Iterate over the elements matching a locator, fetching them from the browser by chunks.
+    The matching elements are searched (in document order) and the first chunk is fetched right away.
+
+    :param driver: ``WebDriver`` instance
+    :param by: the ``By`` strategy
+    :param value: a value related to ``by``
+    :param host: the shadow host in which the elements must be searched (in the current document if not given)
+    :param chunk_size: the number of elements fetched at once
+    :param fields: the states to be fetched along with the elements
+        (see :py:func:`fetch_snapshots <lemoncheesecake_selenium.snapshot.fetch_snapshots>`),
+        :py:class:`ElementSnapshot <lemoncheesecake_selenium.snapshot.ElementSnapshot>` instances are then yielded
+        instead of ``WebElement``
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be greater than 0")
+    fields = sorted(fields) if fields is not None else None
+    key = uuid.uuid4().hex
+    using, value = to_script_locator(by, value)
+
+    chunk = driver.execute_script(_START_SCRIPT, using, value, host, key, chunk_size, fields)
+    return _iterate(driver, key, chunk, chunk_size, fields)
+
+
+def _iterate(driver, key, chunk, chunk_size, fields):
+    total = chunk["total"]
+    if total <= chunk_size:
+        # everything has been fetched at once, nothing has been kept in the page
+        yield from _make_items(chunk, fields)
+        return
+
+    try:
+        start = 0
+        while True:
+            yield from _make_items(chunk, fields)
+            start += chunk_size
+            if start >= total:
+                break
+            chunk = driver.execute_script(_NEXT_SCRIPT, key, start, chunk_size, fields)
+            if chunk is None:
+                raise StaleElementReferenceException("the page has changed while iterating over its elements")
+    finally:
+        try:
+            driver.execute_script(_END_SCRIPT, key)
+        except WebDriverException:
+            pass
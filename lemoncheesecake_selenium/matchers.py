@@ -1,11 +1,20 @@
-from typing import Union
+from __future__ import annotations
+
+from typing import Union, Sequence, TYPE_CHECKING
 
-from selenium.webdriver.remote.webelement import WebElement
 from lemoncheesecake.matching.matcher import Matcher, MatchResult, MatcherDescriptionTransformer
 from lemoncheesecake.matching import *
 
+from lemoncheesecake_selenium.snapshot import TEXT, ATTRIBUTE_PREFIX, PROPERTY_PREFIX, CSS_PREFIX, RECT, \
+    IN_VIEWPORT, FULLY_IN_VIEWPORT, NOT_OBSCURED, ElementSnapshot, get_required_fields
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
+
 
 class HasText(Matcher):
+    snapshot_fields = frozenset((TEXT,))
+
     def __init__(self, matcher):
         self.matcher = matcher
 
@@ -31,11 +40,12 @@ def has_text(expected: Union[Matcher, str]):
 
 
 class EntityMatcher(Matcher):
-    def __init__(self, entity, name, func, matcher):
+    def __init__(self, entity, name, func, matcher, snapshot_field=None):
         self.entity = entity
         self.name = name
         self.func = func
         self.matcher = matcher
+        self.snapshot_fields = frozenset((snapshot_field,)) if snapshot_field else None
 
     def build_description(self, transformation):
         description = transformation(f"to have {self.entity} '{self.name}'")
@@ -69,7 +79,8 @@ def has_attribute(name: str, matcher: Union[str, Matcher] = None):
         "attribute",
         name,
         lambda actual: actual.get_attribute(name),
-        is_(matcher) if matcher is not None else None
+        is_(matcher) if matcher is not None else None,
+        ATTRIBUTE_PREFIX + name
     )
 
 
@@ -78,14 +89,73 @@ def has_property(name, matcher: Union[str, Matcher] = None):
         "property",
         name,
         lambda actual: actual.get_property(name),
-        is_(matcher) if matcher is not None else None
+        is_(matcher) if matcher is not None else None,
+        PROPERTY_PREFIX + name
+    )
+
+
+def has_css(name: str, matcher: Union[str, Matcher] = None):
+    """
+    Test if ``WebElement`` element has a computed CSS property.
+
+    :param name: CSS property name (such as ``"background-color"``)
+    :param matcher: CSS property value matcher (the value is the computed value, such as ``"rgb(255, 0, 0)"``)
+    :return: ``Matcher`` instance
+    """
+    return EntityMatcher(
+        "CSS property",
+        name,
+        lambda actual: actual.value_of_css_property(name),
+        is_(matcher) if matcher is not None else None,
+        CSS_PREFIX + name
+    )
+
+
+class HasSize(Matcher):
+    snapshot_fields = frozenset((RECT,))
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def build_description(self, transformation):
+        descriptions = [
+            "%s that %s" % (dimension, matcher.build_description(MatcherDescriptionTransformer(conjugate=True)))
+            for dimension, matcher in (("width", self.width), ("height", self.height)) if matcher is not None
+        ]
+        return transformation("to have a " + " and a ".join(descriptions))
+
+    def matches(self, actual: WebElement):
+        size = actual.size
+        for dimension, matcher in (("width", self.width), ("height", self.height)):
+            if matcher is not None:
+                result = matcher.matches(size[dimension])
+                if not result:
+                    return MatchResult.failure(f"got {dimension} {size[dimension]}")
+        return MatchResult.success(f"got {size['width']}x{size['height']}")
+
+
+def has_size(width: Union[float, Matcher] = None, height: Union[float, Matcher] = None):
+    """
+    Test if ``WebElement`` element has a given size (in CSS pixels).
+
+    :param width: expected width (or width matcher), not tested if ``None``
+    :param height: expected height (or height matcher), not tested if ``None``
+    :return: ``Matcher`` instance
+    """
+    if width is None and height is None:
+        raise ValueError("width and/or height must be given")
+    return HasSize(
+        is_(width) if width is not None else None,
+        is_(height) if height is not None else None
     )
 
 
 class StateMatcher(Matcher):
-    def __init__(self, name, func):
+    def __init__(self, name, func, snapshot_field=None):
         self.name = name
         self.func = func
+        self.snapshot_fields = frozenset((snapshot_field or name,))
 
     def build_description(self, transformation):
         return transformation(f"to be {self.name}")
@@ -121,7 +191,38 @@ def is_selected():
     return StateMatcher("selected", lambda actual: actual.is_selected())
 
 
+def _as_snapshot(actual) -> ElementSnapshot:
+    # the geometry states are not available on WebElement, they are fetched by script
+    return actual if isinstance(actual, ElementSnapshot) else ElementSnapshot({}, actual)
+
+
+def is_in_viewport(fully: bool = False):
+    """
+    Test if ``WebElement`` element is in the viewport.
+
+    :param fully: whether the element must be entirely in the viewport (instead of partially)
+    :return: :py:class:`Matcher <lemoncheesecake.matching.matcher.Matcher>` instance
+    """
+    return StateMatcher(
+        "fully in viewport" if fully else "in viewport",
+        lambda actual: _as_snapshot(actual).is_in_viewport(fully),
+        FULLY_IN_VIEWPORT if fully else IN_VIEWPORT
+    )
+
+
+def is_not_obscured():
+    """
+    Test if ``WebElement`` element is not obscured, meaning that its center is in the viewport
+    and is not covered by another element (such as an overlay), a click on the element would then reach it.
+
+    :return: :py:class:`Matcher <lemoncheesecake.matching.matcher.Matcher>` instance
+    """
+    return StateMatcher("not obscured", lambda actual: _as_snapshot(actual).is_not_obscured(), NOT_OBSCURED)
+
+
 class IsInPage(Matcher):
+    snapshot_fields = frozenset()
+
     def build_description(self, transformation):
         return transformation("to be present in page")
 
@@ -139,3 +240,148 @@ def is_in_page():
     :return: :py:class:`Matcher <lemoncheesecake.matching.matcher.Matcher>` instance
     """
     return IsInPage()
+
+
+class ElementsMatcher(Matcher):
+    """
+    Base class of the matchers that apply an element matcher to a list of elements
+    (see :py:meth:`Selection.check_elements`).
+    """
+
+    #: maximum number of failing elements detailed in the match result
+    max_failure_details = 10
+
+    def __init__(self, matcher: Matcher):
+        self.matcher = matcher
+
+    @property
+    def snapshot_fields(self):
+        return get_required_fields(self.matcher)
+
+    def _describe_matcher(self):
+        return self.matcher.build_description(MatcherDescriptionTransformer(conjugate=True))
+
+    def _evaluate(self, elements):
+        return [self.matcher.matches(element) for element in elements]
+
+    @classmethod
+    def _describe_indexes(cls, results, is_successful):
+        indexes = [idx for idx, result in enumerate(results) if bool(result) is is_successful]
+        description = ", ".join(map(str, indexes[:cls.max_failure_details]))
+        if len(indexes) > cls.max_failure_details:
+            description += f" (and {len(indexes) - cls.max_failure_details} more)"
+        return indexes, description
+
+    def _failure_details(self, results, failing_indexes):
+        details = [
+            f"- at index {idx}: {results[idx].description}"
+            for idx in failing_indexes[:self.max_failure_details] if results[idx].description
+        ]
+        return "\n" + "\n".join(details) if details else ""
+
+
+class EachElement(ElementsMatcher):
+    def build_description(self, transformation):
+        return transformation(f"to have elements that each {self._describe_matcher()}")
+
+    def matches(self, actual: Sequence[WebElement]):
+        # like any_, each requires at least one element: a selection that does not match anything
+        # would otherwise pass vacuously
+        if not actual:
+            return MatchResult.failure("got no element")
+        results = self._evaluate(actual)
+        failing_indexes, failing_desc = self._describe_indexes(results, False)
+        if failing_indexes:
+            return MatchResult.failure(
+                f"{len(failing_indexes)} of {len(results)} elements do not match, at index {failing_desc}" +
+                self._failure_details(results, failing_indexes)
+            )
+        return MatchResult.success(f"got {len(results)} matching elements")
+
+
+def each(matcher: Matcher):
+    """
+    Test if every ``WebElement`` of a list matches ``matcher``, the list must not be empty.
+
+    :param matcher: the ``Matcher`` to be applied on each element
+    :return: ``Matcher`` instance
+    """
+    return EachElement(matcher)
+
+
+class AnyElement(ElementsMatcher):
+    def build_description(self, transformation):
+        return transformation(f"to have an element that {self._describe_matcher()}")
+
+    def matches(self, actual: Sequence[WebElement]):
+        for idx, element in enumerate(actual):
+            if self.matcher.matches(element):
+                return MatchResult.success(f"found matching element at index {idx}")
+        return MatchResult.failure(f"none of the {len(actual)} elements matches")
+
+
+def any_(matcher: Matcher):
+    """
+    Test if at least one ``WebElement`` of a list matches ``matcher``.
+
+    :param matcher: the ``Matcher`` to be applied on the elements
+    :return: ``Matcher`` instance
+    """
+    return AnyElement(matcher)
+
+
+class NoElement(ElementsMatcher):
+    def build_description(self, transformation):
+        return transformation(f"to have no element that {self._describe_matcher()}")
+
+    def matches(self, actual: Sequence[WebElement]):
+        results = self._evaluate(actual)
+        matching_indexes, matching_desc = self._describe_indexes(results, True)
+        if matching_indexes:
+            return MatchResult.failure(
+                f"{len(matching_indexes)} of {len(results)} elements match, at index {matching_desc}"
+            )
+        return MatchResult.success(f"got {len(results)} non-matching elements")
+
+
+def none_(matcher: Matcher):
+    """
+    Test if no ``WebElement`` of a list matches ``matcher``.
+
+    :param matcher: the ``Matcher`` to be applied on the elements
+    :return: ``Matcher`` instance
+    """
+    return NoElement(matcher)
+
+
+class ElementCount(ElementsMatcher):
+    def __init__(self, matcher: Matcher, count: Matcher):
+        super().__init__(matcher)
+        self.count = count
+
+    def build_description(self, transformation):
+        return transformation(
+            "to have a number of elements that %s which %s" % (
+                self._describe_matcher(), self.count.build_description(MatcherDescriptionTransformer(conjugate=True))
+            )
+        )
+
+    def matches(self, actual: Sequence[WebElement]):
+        results = self._evaluate(actual)
+        matching_indexes, matching_desc = self._describe_indexes(results, True)
+        result = self.count.matches(len(matching_indexes))
+        description = f"got {len(matching_indexes)} matching elements"
+        if matching_indexes:
+            description += f" (at index {matching_desc})"
+        return MatchResult(result.is_successful, description)
+
+
+def count_of(matcher: Matcher, count: Union[int, Matcher]):
+    """
+    Test if the number of ``WebElement`` of a list matching ``matcher`` matches ``count``.
+
+    :param matcher: the ``Matcher`` to be applied on the elements
+    :param count: the expected number of matching elements
+    :return: ``Matcher`` instance
+    """
+    return ElementCount(matcher, is_(count))
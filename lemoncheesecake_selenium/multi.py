@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Mapping, TYPE_CHECKING
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+import lemoncheesecake.api as lcc
+from lemoncheesecake.matching import check_that, require_that, assert_that, not_
+from lemoncheesecake.matching.matcher import Matcher, MatchResult, MatcherDescriptionTransformer
+
+from lemoncheesecake_selenium.selection import Selection, HasElement, HasElements
+from lemoncheesecake_selenium.context import Context, ContextEntry, FRAME, SHADOW
+from lemoncheesecake_selenium.matchers import is_in_page
+from lemoncheesecake_selenium.utils import save_screenshot
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class _FanOutSelection(Selection):
+    # the selections used in the worker threads: screenshots are taken (and logs are written)
+    # by the MultiSelection in the main thread
+    __slots__ = ()
+
+    screenshot_on_exceptions = False
+    screenshot_on_failed_checks = False
+    page_source_on_failed_checks = False
+
+
+def _selector(by):
+
+    def builder(selector, value):
+        return selector._select(by, value)
+    builder.__doc__ = f"""
+    Get a :py:class:`MultiSelection` using element's {by}
+
+    :param value: a value related to ``by``
+    :return: :py:class:`MultiSelection`
+    """
+    return builder
+
+
+class MultiSelector:
+    """
+    Factory of :py:class:`MultiSelection` instances: the same selection on several browser sessions,
+    whose actions and checks are performed on all the sessions concurrently::
+
+        with MultiSelector({"chrome": chrome_driver, "firefox": firefox_driver}) as selector:
+            selector.by_id("user").set_text("john")
+            selector.by_id("submit").click()
+            selector.by_id("welcome").check_element(has_text("Welcome john"))
+    """
+
+    def __init__(self, drivers: Mapping[str, WebDriver], *, max_workers: int = None):
+        """
+        :param drivers: the ``WebDriver`` instances indexed by browser name
+        :param max_workers: the number of threads the actions are performed on (one per driver by default)
+        """
+        if not drivers:
+            raise ValueError("At least one driver is expected")
+        #: the ``WebDriver`` instances indexed by browser name
+        self.drivers = dict(drivers)
+        #: the frames and shadow hosts leading to the elements selected by this selector
+        self.context: Context = ()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self.drivers), thread_name_prefix="lcc-selenium-multi"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """
+        Stop the worker threads (the drivers are left untouched).
+        """
+        self._executor.shutdown()
+
+    def _select(self, by, value):
+        return MultiSelection(
+            {name: _FanOutSelection(driver, by, value, self.context) for name, driver in self.drivers.items()},
+            self._executor
+        )
+
+    def _in_context(self, kind, selection: MultiSelection):
+        first = next(iter(selection.selections.values()))
+        # the derived selector shares the drivers and the worker threads
+        selector = object.__new__(MultiSelector)
+        selector.drivers = self.drivers
+        selector.context = first.context + (ContextEntry(kind, first.by, first.value),)
+        selector._executor = self._executor
+        return selector
+
+    def in_frame(self, frame: MultiSelection) -> MultiSelector:
+        """
+        Get a selector whose selections will be searched in a frame (see :py:meth:`Selector.in_frame`).
+
+        :param frame: the :py:class:`MultiSelection` of the frame (or iframe) element
+        :return: :py:class:`MultiSelector`
+        """
+        return self._in_context(FRAME, frame)
+
+    def in_shadow(self, host: MultiSelection) -> MultiSelector:
+        """
+        Get a selector whose selections will be searched in the shadow root of an element
+        (see :py:meth:`Selector.in_shadow`).
+
+        :param host: the :py:class:`MultiSelection` of the shadow host element
+        :return: :py:class:`MultiSelector`
+        """
+        return self._in_context(SHADOW, host)
+
+    by_id = _selector(By.ID)
+    by_xpath = _selector(By.XPATH)
+    by_link_text = _selector(By.LINK_TEXT)
+    by_partial_link_text = _selector(By.PARTIAL_LINK_TEXT)
+    by_name = _selector(By.NAME)
+    by_tag_name = _selector(By.TAG_NAME)
+    by_class_name = _selector(By.CLASS_NAME)
+    by_css_selector = _selector(By.CSS_SELECTOR)
+
+
+class OnEachBrowser(Matcher):
+    """
+    Match a :py:class:`MultiSelection` with a :py:class:`Selection` matcher evaluated on each browser concurrently,
+    the outcome of each browser is reported in the match result description.
+    """
+
+    def __init__(self, matcher: Matcher):
+        super().__init__()
+        self.matcher = matcher
+
+    def build_description(self, transformation):
+        return self.matcher.build_description(transformation)
+
+    def _evaluate(self, selection):
+        try:
+            return self.matcher.matches(selection)
+        except WebDriverException as exc:
+            return MatchResult.failure(f"{type(exc).__name__}: {exc.msg}")
+
+    def matches(self, actual: MultiSelection) -> MatchResult:
+        results = {name: result for name, (result, _) in actual._fan_out(self._evaluate).items()}
+
+        failed = [name for name, result in results.items() if not result]
+        for name in failed:
+            failure_msg = "Expect %s on %s %s: %s" % (
+                actual.selections[name], name,
+                self.matcher.build_description(MatcherDescriptionTransformer()), results[name].description
+            )
+            if Selection.screenshot_on_failed_checks:
+                save_screenshot(actual.selections[name].driver, failure_msg)
+            if Selection.page_source_on_failed_checks:
+                actual.selections[name].save_page_source(failure_msg)
+
+        description = "; ".join(
+            f"{name}: " + (("OK" if result else "KO") + (f" ({result.description})" if result.description else ""))
+            for name, result in results.items()
+        )
+        return MatchResult(not failed, description)
+
+
+class MultiSelection:
+    """
+    The same selection on several browser sessions (see :py:class:`MultiSelector`).
+
+    The actions are logged once and performed on all the sessions concurrently; if the action fails on some
+    sessions, an error is logged for each of them (with a screenshot if :py:attr:`Selection.screenshot_on_exceptions`
+    is set) and the first exception is re-raised. The checks are reported as a single check whose description
+    details the outcome on each browser, screenshots being only taken
+    (if :py:attr:`Selection.screenshot_on_failed_checks` is set) on the sessions where the check failed.
+    """
+
+    def __init__(self, selections: Dict[str, Selection], executor: ThreadPoolExecutor):
+        #: the :py:class:`Selection` instances indexed by browser name
+        self.selections = selections
+        self._executor = executor
+
+    def must_be_waited_until(self, expected_condition: Callable, *, timeout: int = None, extra_args=()):
+        """
+        Set an explicit wait on all the selections, see :py:meth:`Selection.must_be_waited_until`.
+
+        :return: ``self``, meaning this method can be chain called
+        """
+        for selection in self.selections.values():
+            selection.must_be_waited_until(expected_condition, timeout=timeout, extra_args=extra_args)
+        return self
+
+    def must_be_waited_until_not(self, expected_condition: Callable, *, timeout: int = None, extra_args=()):
+        """
+        Set an explicit wait on all the selections, see :py:meth:`Selection.must_be_waited_until_not`.
+
+        :return: ``self``, meaning this method can be chain called
+        """
+        for selection in self.selections.values():
+            selection.must_be_waited_until_not(expected_condition, timeout=timeout, extra_args=extra_args)
+        return self
+
+    def _fan_out(self, operation):
+        futures = {
+            name: self._executor.submit(operation, selection) for name, selection in self.selections.items()
+        }
+        outcomes = {}
+        for name, future in futures.items():
+            try:
+                outcomes[name] = future.result(), None
+            except Exception as exc:
+                outcomes[name] = None, exc
+        return outcomes
+
+    def _perform(self, operation):
+        errors = [(name, exc) for name, (_, exc) in self._fan_out(operation).items() if exc is not None]
+        for name, exc in errors:
+            lcc.log_error(f"Action on {self.selections[name]} failed on {name}: {exc}")
+            if Selection.screenshot_on_exceptions and isinstance(exc, WebDriverException):
+                save_screenshot(self.selections[name].driver, f"{name}: {exc}")
+        if errors:
+            raise errors[0][1]
+
+    def click(self):
+        """
+        Click on the element on all the browsers.
+        """
+        lcc.log_info(f"Click on {self}")
+        self._perform(lambda selection: selection._click())
+
+    def clear(self):
+        """
+        Clear the element on all the browsers.
+        """
+        lcc.log_info(f"Clear {self}")
+        self._perform(lambda selection: selection._clear())
+
+    def set_text(self, text: str, *, strategy: str = None):
+        """
+        Set to text in the element on all the browsers, see :py:meth:`Selection.set_text`.
+
+        :param text: text to be set
+        :param strategy: the input strategy
+        """
+        strategy = next(iter(self.selections.values()))._get_input_strategy(strategy)
+        lcc.log_info(f"Set text '{text}' on {self}")
+        self._perform(lambda selection: selection._set_text(text, strategy))
+
+    def _select(self, method_name, value=NotImplemented):
+        lcc.log_info(f"{Selection._describe_select(method_name, value)} the {self}".capitalize())
+        self._perform(lambda selection: selection._apply_select(method_name, value))
+
+    def select_by_value(self, value):
+        """
+        See :py:meth:`Selection.select_by_value`.
+        """
+        self._select("select_by_value", value)
+
+    def select_by_index(self, index):
+        """
+        See :py:meth:`Selection.select_by_index`.
+        """
+        self._select("select_by_index", index)
+
+    def select_by_visible_text(self, text):
+        """
+        See :py:meth:`Selection.select_by_visible_text`.
+        """
+        self._select("select_by_visible_text", text)
+
+    def deselect_all(self):
+        """
+        See :py:meth:`Selection.deselect_all`.
+        """
+        self._select("deselect_all")
+
+    def deselect_by_value(self, value):
+        """
+        See :py:meth:`Selection.deselect_by_value`.
+        """
+        self._select("deselect_by_value", value)
+
+    def deselect_by_index(self, index):
+        """
+        See :py:meth:`Selection.deselect_by_index`.
+        """
+        self._select("deselect_by_index", index)
+
+    def deselect_by_visible_text(self, text):
+        """
+        See :py:meth:`Selection.deselect_by_visible_text`.
+        """
+        self._select("deselect_by_visible_text", text)
+
+    def check_element(self, expected: Matcher):
+        """
+        Check that the element matches ``expected`` on all the browsers using
+        the :py:func:`lemoncheesecake.matching.check_that` function.
+
+        :param expected: see :py:meth:`Selection.check_element`
+        """
+        check_that(str(self), self, OnEachBrowser(HasElement(expected)))
+
+    def require_element(self, expected: Matcher):
+        """
+        Check that the element matches ``expected`` on all the browsers using
+        the :py:func:`lemoncheesecake.matching.require_that` function.
+
+        :param expected: see :py:meth:`Selection.check_element`
+        """
+        require_that(str(self), self, OnEachBrowser(HasElement(expected)))
+
+    def assert_element(self, expected: Matcher):
+        """
+        Check that the element matches ``expected`` on all the browsers using
+        the :py:func:`lemoncheesecake.matching.assert_that` function.
+
+        :param expected: see :py:meth:`Selection.check_element`
+        """
+        assert_that(str(self), self, OnEachBrowser(HasElement(expected)))
+
+    def check_no_element(self):
+        """
+        Check that the element is not present on any browser using
+        the :py:func:`lemoncheesecake.matching.check_that` function.
+        """
+        check_that(str(self), self, OnEachBrowser(not_(HasElement(is_in_page()))))
+
+    def require_no_element(self):
+        """
+        Check that the element is not present on any browser using
+        the :py:func:`lemoncheesecake.matching.require_that` function.
+        """
+        require_that(str(self), self, OnEachBrowser(not_(HasElement(is_in_page()))))
+
+    def assert_no_element(self):
+        """
+        Check that the element is not present on any browser using
+        the :py:func:`lemoncheesecake.matching.assert_that` function.
+        """
+        assert_that(str(self), self, OnEachBrowser(not_(HasElement(is_in_page()))))
+
+    def check_elements(self, expected: Matcher):
+        """
+        Check that the elements match ``expected`` on all the browsers using
+        the :py:func:`lemoncheesecake.matching.check_that` function.
+
+        :param expected: see :py:meth:`Selection.check_elements`
+        """
+        check_that(str(self), self, OnEachBrowser(HasElements(expected)))
+
+    def require_elements(self, expected: Matcher):
+        """
+        Check that the elements match ``expected`` on all the browsers using
+        the :py:func:`lemoncheesecake.matching.require_that` function.
+
+        :param expected: see :py:meth:`Selection.check_elements`
+        """
+        require_that(str(self), self, OnEachBrowser(HasElements(expected)))
+
+    def assert_elements(self, expected: Matcher):
+        """
+        Check that the elements match ``expected`` on all the browsers using
+        the :py:func:`lemoncheesecake.matching.assert_that` function.
+
+        :param expected: see :py:meth:`Selection.check_elements`
+        """
+        assert_that(str(self), self, OnEachBrowser(HasElements(expected)))
+
+    def __str__(self):
+        first = next(iter(self.selections.values()))
+        return f"{first} on {', '.join(self.selections)}"
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, Sequence, Optional, TYPE_CHECKING
+
+from selenium.webdriver.common.by import By
+
+from lemoncheesecake_selenium.selection import Selection
+from lemoncheesecake_selenium.context import Context, ContextEntry, FRAME, SHADOW
+from lemoncheesecake_selenium.prefetch import prefetch_selections
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+
+_BYS = frozenset((
+    By.ID, By.XPATH, By.LINK_TEXT, By.PARTIAL_LINK_TEXT, By.NAME, By.TAG_NAME, By.CLASS_NAME, By.CSS_SELECTOR
+))
+
+_CLOSING_BRACKETS = {"[": "]", "(": ")"}
+
+
+def _check_syntax(value):
+    # a cheap sanity check of CSS selectors & XPath expressions: quotes and brackets must be balanced
+    stack = []
+    quote = None
+    for char in value:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in _CLOSING_BRACKETS:
+            stack.append(_CLOSING_BRACKETS[char])
+        elif char in "])":
+            if not stack or stack.pop() != char:
+                return f"unexpected '{char}'"
+    if quote:
+        return "unterminated string"
+    if stack:
+        return f"missing '{stack[-1]}'"
+    return None
+
+
+class Locator:
+    """
+    A selection declared on a :py:class:`Page` class, it is validated when the page class is created
+    and bound (as a :py:class:`Selection`) to the page's driver on first access.
+    """
+
+    __slots__ = ("by", "value", "name", "in_frame", "in_shadow", "context", "_wait")
+
+    def __init__(self, by: str, value: str, *, in_frame: Locator = None, in_shadow: Locator = None):
+        """
+        :param by: the ``By`` strategy
+        :param value: a value related to ``by``
+        :param in_frame: the :py:class:`Locator` of the frame in which the element must be searched
+        :param in_shadow: the :py:class:`Locator` of the shadow host in which the element must be searched
+        """
+        self.by = by
+        self.value = value
+        self.name = None
+        self.in_frame = in_frame
+        self.in_shadow = in_shadow
+        #: the frames and shadow hosts leading to the element, computed when the page class is created
+        self.context: Optional[Context] = None
+        self._wait = None
+
+    def must_be_waited_until(self, expected_condition: Callable, *, timeout: int = None, extra_args=()):
+        """
+        Declare an explicit wait, see :py:meth:`Selection.must_be_waited_until`.
+
+        :return: ``self``, meaning this method can be chain called
+        """
+        self._wait = ("must_be_waited_until", expected_condition, timeout, extra_args)
+        return self
+
+    def must_be_waited_until_not(self, expected_condition: Callable, *, timeout: int = None, extra_args=()):
+        """
+        Declare an explicit wait, see :py:meth:`Selection.must_be_waited_until_not`.
+
+        :return: ``self``, meaning this method can be chain called
+        """
+        self._wait = ("must_be_waited_until_not", expected_condition, timeout, extra_args)
+        return self
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def _compile(self, owner, visiting=()):
+        if self.context is not None:
+            return self.context
+
+        label = f"{owner.__name__}.{self.name}" if self.name else repr(self)
+        if self in visiting:
+            raise ValueError(f"Invalid locator {label}: circular frame/shadow host reference")
+        if self.by not in _BYS:
+            raise ValueError(f"Invalid locator {label}: unknown 'by' strategy '{self.by}'")
+        if not isinstance(self.value, str) or not self.value:
+            raise ValueError(f"Invalid locator {label}: the value must be a non-empty string")
+        if self.by == By.CLASS_NAME and any(char.isspace() for char in self.value):
+            raise ValueError(f"Invalid locator {label}: compound class names are not supported")
+        if self.by in (By.CSS_SELECTOR, By.XPATH):
+            error = _check_syntax(self.value)
+            if error:
+                raise ValueError(f"Invalid locator {label}: {error} in '{self.value}'")
+        if self.in_frame is not None and self.in_shadow is not None:
+            raise ValueError(f"Invalid locator {label}: in_frame and in_shadow cannot be both set")
+
+        parent, kind = (self.in_frame, FRAME) if self.in_frame is not None else (self.in_shadow, SHADOW)
+        if parent is None:
+            context = ()
+        else:
+            context = parent._compile(owner, visiting + (self,)) + (ContextEntry(kind, parent.by, parent.value),)
+        self.context = context
+        return context
+
+    def bind(self, driver: WebDriver) -> Selection:
+        """
+        :param driver: ``WebDriver`` instance
+        :return: a :py:class:`Selection` on ``driver``
+        """
+        selection = Selection(driver, self.by, self.value, self.context)
+        if self._wait:
+            method_name, expected_condition, timeout, extra_args = self._wait
+            getattr(selection, method_name)(expected_condition, timeout=timeout, extra_args=extra_args)
+        return selection
+
+    def __get__(self, page, owner=None):
+        if page is None:
+            return self
+        selections = page._selections
+        try:
+            return selections[self.name]
+        except KeyError:
+            selection = selections[self.name] = self.bind(page.driver)
+            return selection
+
+    def __set__(self, page, value):
+        raise AttributeError(f"Selection '{self.name}' is read-only")
+
+    def __repr__(self):
+        return f"<Locator {self.by} '{self.value}'>"
+
+
+def _locator(name, by):
+    def builder(value: str, *, in_frame: Locator = None, in_shadow: Locator = None) -> Locator:
+        return Locator(by, value, in_frame=in_frame, in_shadow=in_shadow)
+    builder.__doc__ = f"""
+    Declare a :py:class:`Page` selection using element's {by}.
+
+    :param value: a value related to ``by``
+    :param in_frame: the :py:class:`Locator` of the frame in which the element must be searched
+    :param in_shadow: the :py:class:`Locator` of the shadow host in which the element must be searched
+    :return: :py:class:`Locator`
+    """
+    builder.__name__ = builder.__qualname__ = name
+    return builder
+
+
+by_id = _locator("by_id", By.ID)
+by_xpath = _locator("by_xpath", By.XPATH)
+by_link_text = _locator("by_link_text", By.LINK_TEXT)
+by_partial_link_text = _locator("by_partial_link_text", By.PARTIAL_LINK_TEXT)
+by_name = _locator("by_name", By.NAME)
+by_tag_name = _locator("by_tag_name", By.TAG_NAME)
+by_class_name = _locator("by_class_name", By.CLASS_NAME)
+by_css_selector = _locator("by_css_selector", By.CSS_SELECTOR)
+
+
+class Page:
+    """
+    Base class of declarative page objects::
+
+        class LoginPage(Page):
+            user = by_id("user")
+            password = by_id("password")
+            submit = by_css_selector("form button[type=submit]")
+
+        page = LoginPage(driver)
+        page.user.set_text("john")
+
+    The locators are validated when the class is created (an invalid locator raises a ``ValueError``),
+    instantiating a page costs almost nothing since each :py:class:`Selection` is only built upon its first access.
+    """
+
+    __slots__ = ("driver", "_selections")
+
+    #: The names of the selections to be resolved by :py:meth:`Page.prefetch`.
+    prefetch_selections: Sequence[str] = ()
+
+    _locators: Dict[str, Locator] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        locators = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, Locator):
+                    locators[name] = value
+                else:
+                    locators.pop(name, None)
+        for locator in locators.values():
+            locator._compile(cls)
+        for name in cls.prefetch_selections:
+            if name not in locators:
+                raise ValueError(f"Invalid prefetch selection {cls.__name__}.{name}: no such locator")
+        cls._locators = locators
+
+    def __init__(self, driver: WebDriver):
+        """
+        :param driver: ``WebDriver`` instance
+        """
+        #: WebDriver
+        self.driver = driver
+        self._selections = {}
+
+    @classmethod
+    def get_locators(cls) -> Dict[str, Locator]:
+        """
+        :return: the locators declared on the page class (and its parent classes) indexed by name
+        """
+        return dict(cls._locators)
+
+    def get_selections(self, names: Sequence[str] = None) -> Sequence[Selection]:
+        """
+        :param names: the selection names (all the declared selections if not given)
+        :return: the page's :py:class:`Selection` instances
+        """
+        return [getattr(self, name) for name in (names if names is not None else self._locators)]
+
+    def prefetch(self):
+        """
+        Resolve the :py:attr:`Page.prefetch_selections` along with their state in a single WebDriver command
+        (see :py:meth:`Selector.prefetch`), typically right after the page has been loaded.
+        """
+        if self.prefetch_selections:
+            prefetch_selections(self.driver, self.get_selections(self.prefetch_selections))
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import defaultdict
+from typing import Sequence, Iterable, TYPE_CHECKING
+
+from lemoncheesecake_selenium.context import FRAME, SHADOW, get_context_tracker
+from lemoncheesecake_selenium.iteration import FIND_JS_FUNCTION, to_script_locator
+from lemoncheesecake_selenium.snapshot import SNAPSHOT_JS_FUNCTION, ElementSnapshot, TEXT, DISPLAYED, ENABLED
+from lemoncheesecake_selenium.instrumentation import step
+
+if TYPE_CHECKING:
+    from lemoncheesecake_selenium.selection import Selection
+
+
+#: The element states fetched by default by :py:func:`prefetch_selections`.
+DEFAULT_PREFETCH_FIELDS = frozenset((DISPLAYED, ENABLED, TEXT))
+
+# each item is a list of [using, value] locators: the shadow hosts followed by the element itself
+_PREFETCH_SCRIPT = """
+var find = %s, snapshot = %s, fields = arguments[1];
+return arguments[0].map(function (locators) {
+    var root = document;
+    for (var i = 0; i < locators.length - 1; i++) {
+        var host = find(locators[i][0], locators[i][1], root, true)[0];
+        if (!host || !host.shadowRoot) {
+            return null;
+        }
+        root = host.shadowRoot;
+    }
+    var element = find(locators[i][0], locators[i][1], root, true)[0];
+    return element ? {element: element, data: snapshot([element], fields)[0]} : null;
+});
+""" % (FIND_JS_FUNCTION, SNAPSHOT_JS_FUNCTION)
+
+
+_generations = weakref.WeakKeyDictionary()
+_generations_lock = threading.Lock()
+
+
+def get_prefetch_generation(driver) -> int:
+    """
+    :param driver: ``WebDriver`` instance
+    :return: the current prefetch generation of ``driver``, the data prefetched during a previous generation
+        is no longer used
+    """
+    with _generations_lock:
+        return _generations.get(driver, 0)
+
+
+def invalidate_prefetch(driver):
+    """
+    Drop the data prefetched on ``driver``. It is called upon every mutating :py:class:`Selection` action and
+    must be called after a page change that does not come from a :py:class:`Selection` action
+    (such as a ``driver.get``), unless the selections are prefetched again.
+
+    :param driver: ``WebDriver`` instance
+    """
+    with _generations_lock:
+        _generations[driver] = _generations.get(driver, 0) + 1
+
+
+def prefetch_selections(driver, selections: Sequence[Selection], fields: Iterable[str] = DEFAULT_PREFETCH_FIELDS):
+    """
+    Resolve the elements of several selections along with their state with a single WebDriver command
+    (per frame), and keep them in the selections: until the next mutating action (or call to
+    :py:func:`invalidate_prefetch`), :py:attr:`Selection.element` returns the prefetched element
+    and the checks are evaluated against the prefetched state
+    (see :py:class:`ElementSnapshot <lemoncheesecake_selenium.snapshot.ElementSnapshot>`).
+    The selections whose element is not present are looked up as usual when used, and the selections with
+    an explicit wait (see :py:meth:`Selection.must_be_waited_until`) do not use the prefetched data.
+
+    :param driver: ``WebDriver`` instance
+    :param selections: the :py:class:`Selection` instances
+    :param fields: the element states to be fetched (``"text"``, ``"displayed"``, ``"attribute:href"``, etc...)
+    """
+    batches = defaultdict(list)
+    for selection in selections:
+        last_frame_idx = max((idx for idx, entry in enumerate(selection.context) if entry.kind == FRAME), default=-1)
+        batches[selection.context[:last_frame_idx + 1]].append(selection)
+
+    generation = get_prefetch_generation(driver)
+    fields = sorted(fields)
+    tracker = get_context_tracker(driver)
+    with step("prefetch", count=len(selections)):
+        for frames, batch in batches.items():
+            tracker.enter(frames)
+            results = driver.execute_script(_PREFETCH_SCRIPT, [
+                [
+                    to_script_locator(entry.by, entry.value) for entry in selection.context[len(frames):]
+                    if entry.kind == SHADOW
+                ] + [to_script_locator(selection.by, selection.value)]
+                for selection in batch
+            ], fields)
+            for selection, result in zip(batch, results):
+                selection._prefetched = \
+                    (generation, ElementSnapshot(result["data"], result["element"])) if result else None
@@ -0,0 +1,184 @@
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Sequence, Tuple
+
+import lemoncheesecake.api as lcc
+
+from lemoncheesecake_selenium.instrumentation import Listener, Step
+
+
+_NO_TEST = "<no test>"
+#: name of the pseudo-phase that gathers the time spent in test code outside of any step
+PYTHON_PHASE = "python"
+
+
+def _frame(label):
+    # ";" is the frame separator and " " the value separator of the collapsed stack format
+    return label.replace(";", ",").replace("\n", " ")
+
+
+class _StepStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+
+class Profiler(Listener):
+    """
+    Measure where the time goes in tests: explicit waits, element lookups, actions on elements,
+    checks, screenshots, WebDriver commands (see :py:func:`instrument_driver`) and test code itself.
+
+    Usage example::
+
+        profiler = Profiler()
+        profiler.enable()
+
+        with profiler.profile_test("test_login"):
+            ...
+
+        profiler.save_report()
+
+    The profiler produces:
+
+    - a flame-graph compatible collapsed stacks file (see :py:meth:`Profiler.write_collapsed_stacks`),
+      where the time not spent in lemoncheesecake-selenium is accounted to the test frame itself,
+    - a ranked table of the slowest actions / locators (see :py:meth:`Profiler.format_report`).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stacks = defaultdict(float)
+        self._step_stats = defaultdict(_StepStats)
+        self._phases = defaultdict(lambda: defaultdict(float))
+
+    @property
+    def _child_times(self):
+        try:
+            return self._local.child_times
+        except AttributeError:
+            self._local.child_times = []
+            return self._local.child_times
+
+    @property
+    def _test(self):
+        return getattr(self._local, "test", _NO_TEST)
+
+    @contextmanager
+    def profile_test(self, name: str):
+        """
+        Context manager, account every step performed within the block to test ``name``.
+
+        :param name: test name (such as the test path)
+        """
+        previous_test, previous_child_times = self._test, self._child_times
+        self._local.test, self._local.child_times = name, [0.0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self_time = max(duration - self._child_times[0], 0.0)
+            with self._lock:
+                self._stacks[_frame(name)] += self_time
+                self._phases[name][PYTHON_PHASE] += self_time
+            self._local.test, self._local.child_times = previous_test, previous_child_times
+
+    def on_step_start(self, step: Step):
+        self._child_times.append(0.0)
+
+    def on_step_end(self, step: Step):
+        child_times = self._child_times
+        children_time = child_times.pop()
+        duration = step.duration
+        if child_times:
+            child_times[-1] += duration
+        self_time = max(duration - children_time, 0.0)
+
+        frames = []
+        current = step
+        while current:
+            frames.append(_frame(current.label))
+            current = current.parent
+        frames.append(_frame(self._test))
+
+        with self._lock:
+            self._stacks[";".join(reversed(frames))] += self_time
+            self._step_stats[(step.kind, step.label)].add(duration)
+            self._phases[self._test][step.kind] += self_time
+
+    @property
+    def phases(self) -> dict:
+        """
+        The self time (in seconds) of each phase (step kind plus :py:data:`PYTHON_PHASE`), by test.
+        """
+        with self._lock:
+            return {test: dict(phases) for test, phases in self._phases.items()}
+
+    def get_slowest_steps(self, limit: int = 20) -> Sequence[Tuple[str, int, float, float]]:
+        """
+        :param limit: maximum number of entries
+        :return: a list of ``(label, count, total, max)`` tuples (durations are in seconds)
+            ordered by decreasing total duration
+        """
+        with self._lock:
+            entries = [
+                (label, stats.count, stats.total, stats.max)
+                for (kind, label), stats in self._step_stats.items() if kind != "command"
+            ]
+        return sorted(entries, key=lambda entry: entry[2], reverse=True)[:limit]
+
+    def write_collapsed_stacks(self, path: str):
+        """
+        Write the profiling data in the collapsed stacks format (one ``frame;frame;frame value`` line per stack,
+        the value being expressed in microseconds), as expected by flame graph tools
+        such as ``flamegraph.pl`` or speedscope.
+
+        :param path: destination file path
+        """
+        with self._lock:
+            stacks = sorted(self._stacks.items())
+        with open(path, "w") as fh:
+            for stack, duration in stacks:
+                fh.write(f"{stack} {round(duration * 1000000)}\n")
+
+    def format_report(self, limit: int = 20) -> str:
+        """
+        :param limit: maximum number of entries in the slowest steps table
+        :return: a textual report made of the slowest steps table and of the time spent per phase for each test
+        """
+        lines = ["Slowest actions / locators:", ""]
+        lines.append("%4s  %6s  %10s  %10s  %10s  %s" % ("#", "calls", "total (s)", "mean (ms)", "max (ms)", "step"))
+        for rank, (label, count, total, max_) in enumerate(self.get_slowest_steps(limit), start=1):
+            lines.append(
+                "%4d  %6d  %10.3f  %10.1f  %10.1f  %s" % (rank, count, total, total / count * 1000, max_ * 1000, label)
+            )
+
+        lines.extend(("", "Time per phase (s):"))
+        for test, phases in sorted(self.phases.items()):
+            lines.extend(("", test))
+            for phase, duration in sorted(phases.items(), key=lambda item: item[1], reverse=True):
+                lines.append("    %-12s %10.3f" % (phase, duration))
+
+        return "\n".join(lines) + "\n"
+
+    def save_report(self, limit: int = 20):
+        """
+        Save the profiling data as lemoncheesecake report attachments: the collapsed stacks file
+        and the report returned by :py:meth:`Profiler.format_report`.
+
+        :param limit: maximum number of entries in the slowest steps table
+        """
+        with lcc.prepare_attachment("profile.collapsed", "Profiling data (collapsed stacks)") as path:
+            self.write_collapsed_stacks(path)
+        lcc.save_attachment_content(self.format_report(limit), "profile.txt", "Profiling report")
@@ -0,0 +1,244 @@
+import os
+import copy
+import gzip
+import json
+import time
+import hashlib
+import threading
+from collections import Counter
+from typing import Iterator, Dict, Tuple
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.options import ArgOptions
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+_TRACE_FORMAT_VERSION = 1
+_BLOB_KEY = "$blob"
+
+
+class ReplayError(WebDriverException):
+    """
+    Raised by :py:class:`ReplayDriver` when the commands issued by the test
+    diverge from the recorded ones.
+    """
+
+
+def _blob_dir(path):
+    return path + ".blobs"
+
+
+def _store_blobs(value, blob_dir, threshold):
+    if isinstance(value, str) and len(value) >= threshold:
+        digest = hashlib.sha1(value.encode("utf-8")).hexdigest()
+        blob_path = os.path.join(blob_dir, digest + ".gz")
+        if not os.path.exists(blob_path):
+            os.makedirs(blob_dir, exist_ok=True)
+            with gzip.open(blob_path, "wt", encoding="utf-8") as fh:
+                fh.write(value)
+        return {_BLOB_KEY: digest}
+    if isinstance(value, dict):
+        return {key: _store_blobs(val, blob_dir, threshold) for key, val in value.items()}
+    if isinstance(value, list):
+        return [_store_blobs(item, blob_dir, threshold) for item in value]
+    return value
+
+
+def _load_blobs(value, blob_dir):
+    if isinstance(value, dict):
+        if len(value) == 1 and _BLOB_KEY in value:
+            with gzip.open(os.path.join(blob_dir, value[_BLOB_KEY] + ".gz"), "rt", encoding="utf-8") as fh:
+                return fh.read()
+        return {key: _load_blobs(val, blob_dir) for key, val in value.items()}
+    if isinstance(value, list):
+        return [_load_blobs(item, blob_dir) for item in value]
+    return value
+
+
+class TraceRecorder:
+    """
+    Record every WebDriver command issued through a driver (with its parameters, its response and its duration)
+    into a gzip compressed, line-delimited JSON trace file. Large payloads (such as screenshots
+    or page sources) are stored out of line in a ``<path>.blobs`` directory.
+
+    Usage example::
+
+        with TraceRecorder("login.trace.gz").attach(driver):
+            selector = Selector(driver)
+            ...
+
+    The trace can then be replayed offline with :py:class:`ReplayDriver`.
+    """
+
+    def __init__(self, path: str, *, blob_threshold: int = 4096):
+        """
+        :param path: trace file path
+        :param blob_threshold: size (in characters) from which a string payload is stored out of line
+        """
+        self.path = path
+        self.blob_threshold = blob_threshold
+        self._fh = None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._orig_execute = None
+        self._start_time = None
+
+    def attach(self, driver: WebDriver):
+        """
+        Start recording the commands issued through ``driver``.
+
+        :param driver: ``WebDriver`` instance
+        :return: ``self``, meaning it can be used as a context manager
+        """
+        self._fh = gzip.open(self.path, "wt", encoding="utf-8")
+        self._start_time = time.perf_counter()
+        self._write({
+            "type": "session", "version": _TRACE_FORMAT_VERSION,
+            "session_id": driver.session_id, "capabilities": driver.caps
+        })
+
+        self._executor = driver.command_executor
+        self._orig_execute = self._executor.execute
+        self._executor.execute = self._execute
+        return self
+
+    def detach(self):
+        """
+        Stop recording and close the trace file.
+        """
+        if self._executor is not None:
+            self._executor.execute = self._orig_execute
+            self._executor = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.detach()
+
+    def _write(self, record):
+        line = json.dumps(_store_blobs(record, _blob_dir(self.path), self.blob_threshold), separators=(",", ":"))
+        with self._lock:
+            self._fh.write(line + "\n")
+
+    def _execute(self, command, params):
+        record = {
+            "type": "command", "command": command, "params": copy.deepcopy(params),
+            "time": round(time.perf_counter() - self._start_time, 6)
+        }
+        start = time.perf_counter()
+        try:
+            response = self._orig_execute(command, params)
+        except Exception as exc:
+            record["error"] = str(exc)
+            raise
+        else:
+            record["response"] = response
+            return response
+        finally:
+            record["duration"] = round(time.perf_counter() - start, 6)
+            self._write(record)
+
+
+def read_trace(path: str) -> Iterator[dict]:
+    """
+    Iterate over the records of a trace file written by :py:class:`TraceRecorder`,
+    the first record describes the session, the next ones are the WebDriver commands.
+
+    :param path: trace file path
+    """
+    blob_dir = _blob_dir(path)
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            yield _load_blobs(json.loads(line), blob_dir)
+
+
+def count_commands(path: str) -> Counter:
+    """
+    :param path: trace file path
+    :return: the number of occurrences of each WebDriver command in the trace
+    """
+    return Counter(record["command"] for record in read_trace(path) if record["type"] == "command")
+
+
+def diff_command_counts(path1: str, path2: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Compare the WebDriver commands issued in two traces (for instance, the same test run against
+    two versions of the library).
+
+    :param path1: first trace file path
+    :param path2: second trace file path
+    :return: a dict of ``(count1, count2)`` tuples for the commands whose number of occurrences differ
+    """
+    counts1, counts2 = count_commands(path1), count_commands(path2)
+    return {
+        command: (counts1[command], counts2[command])
+        for command in sorted(set(counts1) | set(counts2)) if counts1[command] != counts2[command]
+    }
+
+
+class _ReplayCommandExecutor:
+    def __init__(self, records, strict):
+        self._records = records
+        self._strict = strict
+        self.command_count = 0
+
+    @staticmethod
+    def _strip_session_id(params):
+        return {key: value for key, value in (params or {}).items() if key != "sessionId"}
+
+    def execute(self, command, params):
+        try:
+            record = next(self._records)
+        except StopIteration:
+            raise ReplayError(f"Trace exhausted, cannot replay command '{command}'")
+
+        self.command_count += 1
+        if record["command"] != command:
+            raise ReplayError(
+                f"Command #{self.command_count} mismatch: expected '{record['command']}', got '{command}'"
+            )
+        if self._strict and self._strip_session_id(record["params"]) != self._strip_session_id(params):
+            raise ReplayError(
+                f"Command #{self.command_count} '{command}' parameters mismatch: "
+                f"expected {record['params']}, got {params}"
+            )
+        if "error" in record:
+            raise WebDriverException(record["error"])
+        return copy.deepcopy(record["response"])
+
+
+class ReplayDriver(WebDriver):
+    """
+    A fake ``WebDriver`` that answers commands with the responses recorded by :py:class:`TraceRecorder`,
+    without any browser. It makes it possible to re-run the :py:class:`Selection` and matchers logic
+    of a test deterministically and offline.
+
+    The commands must be issued in the same order as in the trace, otherwise :py:class:`ReplayError` is raised.
+    """
+
+    def __init__(self, path: str, *, strict: bool = False):
+        """
+        :param path: trace file path
+        :param strict: whether or not the commands parameters must also match the recorded ones
+        """
+        self._records = read_trace(path)
+        header = next(self._records)
+        if header.get("type") != "session":
+            raise ValueError(f"'{path}' is not a valid trace file")
+        self._header = header
+        super().__init__(command_executor=_ReplayCommandExecutor(self._records, strict), options=ArgOptions())
+
+    def start_session(self, capabilities, *args, **kwargs):
+        self.session_id = self._header["session_id"]
+        self.caps = self._header["capabilities"]
+
+    @property
+    def command_count(self) -> int:
+        """
+        The number of commands replayed so far.
+        """
+        return self.command_executor.command_count
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import heapq
+import statistics
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Sequence, TYPE_CHECKING
+
+import lemoncheesecake.api as lcc
+
+from lemoncheesecake_selenium.instrumentation import Listener, Step
+
+if TYPE_CHECKING:
+    from lemoncheesecake.suite import Suite
+
+
+class DurationScheduler(Listener):
+    """
+    Run the longest browser tests first so that the run does not end waiting on a long test started last.
+
+    The browser time of each test (the time spent in :py:class:`Selection` operations and WebDriver commands,
+    see :py:func:`instrument_driver`) is recorded across runs in a JSON history file, the estimated duration
+    of a test being the median of its recorded browser times. :py:meth:`DurationScheduler.order_suites`
+    then orders the suites and their tests by decreasing estimated duration: as lemoncheesecake hands the tests
+    out to its threads (and thus to the browser sessions) in that order as soon as a thread is free, the longest
+    tests are started first, within the limits of the suite hierarchy (the tests of a suite are run one after
+    the other, a long suite made of short tests is thus run before a shorter suite made of a single long test).
+    The makespan predicted for that order and the actual makespan of the run (both in browser time, the actual
+    makespan being the browser time of the busiest thread) are added to the report along with the elapsed time
+    of the tests (see :py:meth:`DurationScheduler.save_report`).
+
+    Usage example in a lemoncheesecake project file::
+
+        scheduler = DurationScheduler(".lcc-durations.json", slots=4)
+
+        class MyProject(Project):
+            def load_suites(self):
+                return scheduler.order_suites(super().load_suites())
+
+    the scheduler being enabled for the whole run (for instance by a session fixture that calls
+    :py:meth:`DurationScheduler.save` and :py:meth:`DurationScheduler.save_report` on teardown)
+    and the tests recorded under their path::
+
+        @lcc.test()
+        def test_checkout(driver):
+            with scheduler.record_test("shop.checkout.test_checkout"):
+                ...
+    """
+
+    def __init__(self, path: str, *, slots: int, max_samples: int = 10):
+        """
+        :param path: the history file path (it is loaded if it exists)
+        :param slots: the number of tests run concurrently (the number of threads / browser sessions)
+        :param max_samples: the number of (most recent) browser times kept per test
+        """
+        if slots < 1:
+            raise ValueError("slots must be greater than or equal to 1")
+        self.path = path
+        self.slots = slots
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._samples = self._load()
+        #: the makespan (in seconds of browser time) predicted by the last :py:meth:`DurationScheduler.order_suites`
+        self.predicted_makespan: Optional[float] = None
+        self._first_start = None
+        self._last_end = None
+        # the browser time recorded by each thread (a thread runs one test at a time, it is a slot)
+        self._slot_times = defaultdict(float)
+
+    def _load(self):
+        try:
+            with open(self.path) as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return {}
+        return {test: list(durations) for test, durations in data.get("tests", {}).items()}
+
+    def save(self):
+        """
+        Write the recorded browser times into the history file.
+        """
+        with self._lock:
+            data = {"tests": {test: list(durations) for test, durations in self._samples.items()}}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(data, fh, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def record_test(self, name: str):
+        """
+        Context manager, account the browser time of the steps performed within the block to test ``name``.
+
+        :param name: test name, it must match the test path used by :py:meth:`DurationScheduler.order_suites`
+        """
+        self._local.browser_time = 0.0
+        self._local.depth = 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            browser_time = self._local.browser_time
+            del self._local.browser_time
+            with self._lock:
+                durations = self._samples.setdefault(name, [])
+                durations.append(round(browser_time, 3))
+                del durations[:-self.max_samples]
+                self._slot_times[threading.get_ident()] += browser_time
+                self._first_start = start if self._first_start is None else min(self._first_start, start)
+                self._last_end = end if self._last_end is None else max(self._last_end, end)
+
+    def on_step_start(self, step: Step):
+        if hasattr(self._local, "browser_time"):
+            self._local.depth += 1
+
+    def on_step_end(self, step: Step):
+        if not hasattr(self._local, "browser_time"):
+            return
+        self._local.depth -= 1
+        # the duration of the nested steps is already part of their outermost step
+        if self._local.depth == 0:
+            self._local.browser_time += step.duration
+
+    def get_estimate(self, name: str) -> Optional[float]:
+        """
+        :param name: test name
+        :return: the estimated browser time (in seconds) of the test, ``None`` if it has never been recorded
+        """
+        with self._lock:
+            durations = self._samples.get(name)
+        return statistics.median(durations) if durations else None
+
+    def _get_estimates(self, names):
+        estimates = {name: self.get_estimate(name) for name in names}
+        known = [estimate for estimate in estimates.values() if estimate is not None]
+        # a test without history is assumed to be an average test
+        default = statistics.mean(known) if known else 0.0
+        return {name: default if estimate is None else estimate for name, estimate in estimates.items()}
+
+    def plan(self, names: Iterable[str]) -> List[List[str]]:
+        """
+        Simulate how tests run in the given order are distributed across the slots: each test goes to the first
+        slot that gets free, that is the least loaded one.
+
+        :param names: test names, in run order
+        :return: the test names of each slot
+        """
+        estimates = self._get_estimates(names)
+        slots = [(0.0, idx, []) for idx in range(self.slots)]
+        for name in estimates:
+            load, idx, tests = heapq.heappop(slots)
+            tests.append(name)
+            heapq.heappush(slots, (load + estimates[name], idx, tests))
+        return [tests for _, _, tests in sorted(slots, key=lambda slot: slot[1])]
+
+    def predict_makespan(self, names: Iterable[str]) -> float:
+        """
+        :param names: test names, in run order
+        :return: the makespan (in seconds of browser time) of the tests distributed by
+            :py:meth:`DurationScheduler.plan`
+        """
+        names = list(names)
+        estimates = self._get_estimates(names)
+        return max((sum(estimates[name] for name in tests) for tests in self.plan(names)), default=0.0)
+
+    def _order_suite(self, suite, estimates):
+        tests = sorted(suite.get_tests(), key=lambda test: estimates[test.path], reverse=True)
+        totals = {sub_suite.path: self._order_suite(sub_suite, estimates) for sub_suite in suite.get_suites()}
+        sub_suites = sorted(suite.get_suites(), key=lambda sub_suite: totals[sub_suite.path], reverse=True)
+        _reorder_suite(suite, tests, sub_suites)
+        return sum(estimates[test.path] for test in tests) + sum(totals.values())
+
+    def order_suites(self, suites: Sequence[Suite]) -> List[Suite]:
+        """
+        Order the suites, their sub suites and their tests by decreasing estimated browser time
+        (the tests are identified by their path, such as ``"suite.sub_suite.test"``)
+        and predict the makespan of the run (see :py:attr:`DurationScheduler.predicted_makespan`).
+
+        :param suites: the loaded suites (they are reordered in place)
+        :return: the suites ordered by decreasing estimated browser time
+        """
+        def iter_tests(suites_):
+            for suite in suites_:
+                yield from suite.get_tests()
+                yield from iter_tests(suite.get_suites())
+
+        estimates = self._get_estimates(test.path for test in iter_tests(suites))
+        totals = {suite.path: self._order_suite(suite, estimates) for suite in suites}
+        suites = sorted(suites, key=lambda suite: totals[suite.path], reverse=True)
+        # the prediction is made for the order the tests will actually be run in
+        self.predicted_makespan = self.predict_makespan(test.path for test in iter_tests(suites))
+        return suites
+
+    @property
+    def actual_makespan(self) -> Optional[float]:
+        """
+        The browser time (in seconds) recorded by the busiest thread, to be compared to
+        :py:attr:`DurationScheduler.predicted_makespan`, ``None`` if no test has been recorded.
+        """
+        with self._lock:
+            return max(self._slot_times.values()) if self._slot_times else None
+
+    @property
+    def elapsed_time(self) -> Optional[float]:
+        """
+        The wall-clock time (in seconds) between the start of the first recorded test and the end of the last one,
+        ``None`` if no test has been recorded.
+        """
+        with self._lock:
+            if self._first_start is None:
+                return None
+            return self._last_end - self._first_start
+
+    def save_report(self):
+        """
+        Add the predicted makespan, the actual makespan (both in browser time) and the elapsed time of the tests
+        to the lemoncheesecake report information.
+        """
+        if self.predicted_makespan is not None:
+            lcc.add_report_info(
+                "Predicted makespan (browser time)", f"{self.predicted_makespan:.1f}s over {self.slots} slots"
+            )
+        actual_makespan = self.actual_makespan
+        if actual_makespan is not None:
+            lcc.add_report_info(
+                "Actual makespan (browser time)", f"{actual_makespan:.1f}s over {len(self._slot_times)} slots"
+            )
+            lcc.add_report_info("Elapsed time of the tests (wall-clock)", f"{self.elapsed_time:.1f}s")
+
+
+def _reorder_suite(suite: Suite, tests, sub_suites) -> bool:
+    # lemoncheesecake does not provide any public API to reorder a loaded suite: its internals are only
+    # used if they are the expected ones, otherwise the suite keeps its original order
+    internal_tests, internal_suites = getattr(suite, "_tests", None), getattr(suite, "_suites", None)
+    if not isinstance(internal_tests, dict) or list(internal_tests.values()) != list(suite.get_tests()) or \
+            not isinstance(internal_suites, list) or internal_suites is not suite.get_suites():
+        return False
+    suite._tests = {test.name: test for test in tests}
+    internal_suites[:] = sub_suites
+    return True
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import re
+import base64
+from contextlib import nullcontext
+from typing import Iterable, BinaryIO, Optional, TYPE_CHECKING
+
+from lemoncheesecake_selenium.instrumentation import step
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+
+_CHUNK_SIZE = 64 * 1024
+_VALUE_START = re.compile(rb'"value"\s*:\s*"')
+
+
+def decode_screenshot_response(chunks: Iterable[bytes], fh: BinaryIO):
+    """
+    Decode the base64 encoded ``"value"`` of a JSON screenshot response into ``fh``,
+    chunk by chunk, so that neither the whole response nor the whole image are held in memory.
+
+    :param chunks: the raw response body as an iterable of bytes chunks
+    :param fh: a file object opened in binary mode
+    :raise ValueError: if the response does not contain a complete base64 string value
+    """
+    chunks = iter(chunks)
+
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        match = _VALUE_START.search(head)
+        if match:
+            break
+    else:
+        raise ValueError("Screenshot response does not contain any string value")
+
+    data = head[match.end():]
+    pending = b""
+    while True:
+        end = data.find(b'"')
+        if end >= 0:
+            data = data[:end]
+        data = pending + data
+        # a JSON escaped "/" might be split across two chunks
+        if data.endswith(b"\\"):
+            data, escape = data[:-1], b"\\"
+        else:
+            escape = b""
+        data = data.replace(b"\\/", b"/").translate(None, b" \r\n")
+        usable = len(data) - len(data) % 4
+        fh.write(base64.b64decode(data[:usable]))
+        pending = data[usable:] + escape
+        if end >= 0:
+            break
+        data = next(chunks, None)
+        if data is None:
+            raise ValueError("Screenshot response is truncated")
+
+    if pending:
+        raise ValueError("Screenshot response contains invalid base64 data")
+
+
+def _get_connection_settings(executor) -> Optional[dict]:
+    from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+    # a patched execute means that commands are intercepted (see TraceRecorder), do not bypass it
+    if not isinstance(executor, RemoteConnection) or "execute" in vars(executor):
+        return None
+
+    # selenium >= 4.14 keeps its settings in a ClientConfig
+    client_config = getattr(executor, "_client_config", None)
+    if client_config is not None:
+        return {
+            "url": client_config.remote_server_addr,
+            "keep_alive": client_config.keep_alive,
+            "timeout": client_config.timeout,
+            "auth_header": client_config.get_auth_header() or {},
+        }
+    url = getattr(executor, "_url", None)
+    if url is None:
+        return None
+    return {
+        "url": url,
+        "keep_alive": executor.keep_alive,
+        "timeout": executor.get_timeout(),
+        "auth_header": {},
+    }
+
+
+def _stream_screenshot(driver: WebDriver, path: str, element: WebElement = None) -> bool:
+    from urllib import parse
+
+    executor = getattr(driver, "command_executor", None)
+    settings = _get_connection_settings(executor)
+    if settings is None:
+        return False
+
+    url = f"{settings['url']}/session/{driver.session_id}"
+    url += f"/element/{element.id}/screenshot" if element is not None else "/screenshot"
+    headers = executor.get_remote_connection_headers(parse.urlparse(url), settings["keep_alive"])
+    headers.update(settings["auth_header"])
+
+    if settings["keep_alive"]:
+        http = executor._conn
+    else:
+        http = executor._get_connection_manager()
+
+    # the streamed request does not go through driver.execute, report it the way instrument_driver does
+    if getattr(driver, "_lcc_instrumented", False) is True:
+        command_step = step("command", command="elementScreenshot" if element is not None else "screenshot")
+    else:
+        command_step = nullcontext()
+
+    try:
+        with command_step:
+            response = http.request(
+                "GET", url, headers=headers, timeout=settings["timeout"], preload_content=False
+            )
+            try:
+                if response.status != 200:
+                    # let the regular command path build the appropriate WebDriverException
+                    return False
+                with open(path, "wb") as fh:
+                    decode_screenshot_response(response.stream(_CHUNK_SIZE), fh)
+                return True
+            finally:
+                response.release_conn()
+    finally:
+        if not settings["keep_alive"]:
+            http.clear()
+
+
+def write_screenshot(driver: WebDriver, path: str, element: WebElement = None):
+    """
+    Take a screenshot (of the page or of ``element``) and write it as PNG into ``path``.
+
+    When talking to a remote end through selenium's HTTP connection, the response is read
+    and base64-decoded incrementally into the file, memory usage then stays bounded whatever the size
+    of the image. Otherwise (or if the response cannot be streamed) the regular selenium method is used.
+
+    :param driver: ``WebDriver`` instance
+    :param path: the PNG file path
+    :param element: an optional ``WebElement``, the screenshot is then restricted to this element
+    """
+    try:
+        streamed = _stream_screenshot(driver, path, element)
+    except Exception:
+        # the streaming relies on selenium internals that may change across versions, whatever goes wrong
+        # (including network errors) the screenshot is taken again through the regular selenium method
+        streamed = False
+    if not streamed:
+        if element is not None:
+            element.screenshot(path)
+        else:
+            driver.save_screenshot(path)
@@ -1,11 +1,9 @@
 from __future__ import annotations
 
-from typing import Sequence, Callable
+from typing import Sequence, List, Optional, Callable, Iterable, Iterator, Union, TYPE_CHECKING
 from contextlib import contextmanager
 
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import WebDriverException, NoSuchElementException
 from selenium.webdriver.support.select import Select
 from selenium.webdriver.common.by import By
 import lemoncheesecake.api as lcc
@@ -13,7 +11,21 @@ from lemoncheesecake.matching import check_that, require_that, assert_that, not_
 from lemoncheesecake.matching.matcher import Matcher, MatchResult, MatcherDescriptionTransformer
 
 from lemoncheesecake_selenium.matchers import is_in_page
-from lemoncheesecake_selenium.utils import save_screenshot, save_screenshot_on_exception
+from lemoncheesecake_selenium.instrumentation import step
+from lemoncheesecake_selenium.context import Context, FRAME, SHADOW, STALE_CONTEXT_EXCEPTIONS, \
+    FRAME_DEPTH_JS_FUNCTION, get_context_tracker
+from lemoncheesecake_selenium.snapshot import ElementSnapshot, fetch_snapshots, get_required_fields, \
+    has_layout_fields
+from lemoncheesecake_selenium.iteration import FIND_JS_FUNCTION, iter_matches, to_script_locator
+from lemoncheesecake_selenium.conditions import BrowserCondition
+from lemoncheesecake_selenium.table import Row, fetch_table, make_rows
+from lemoncheesecake_selenium.utils import save_screenshot, save_screenshot_on_exception, save_page_source
+from lemoncheesecake_selenium.screenshot import write_screenshot
+from lemoncheesecake_selenium.capture import get_capture_cache, invalidate_capture_cache
+from lemoncheesecake_selenium.prefetch import get_prefetch_generation, invalidate_prefetch
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
 
 
 class HasElement(Matcher):
@@ -25,10 +37,21 @@ class HasElement(Matcher):
         return self.matcher.build_description(transformation)
 
     def _matches(self, actual: Selection) -> MatchResult:
+        fields = get_required_fields(self.matcher)
+        snapshot = actual._get_prefetched()
+        if snapshot is not None and fields is not None:
+            missing_fields = fields - snapshot.data.keys()
+            if has_layout_fields(missing_fields):
+                fetched = fetch_snapshots(actual.driver, [snapshot.element], missing_fields)[0]
+                snapshot = ElementSnapshot({**snapshot.data, **fetched.data}, snapshot.element)
+            return self.matcher.matches(snapshot)
         try:
             element = actual.element
         except NoSuchElementException:
             return MatchResult.failure(f"Could not find {actual}")
+        # fetch the computed styles & geometry states needed by the matcher at once
+        if fields is not None and has_layout_fields(fields):
+            return self.matcher.matches(fetch_snapshots(actual.driver, [element], fields)[0])
         return self.matcher.matches(element)
 
     def _build_failure_msg(self, actual: Selection, result: MatchResult):
@@ -40,14 +63,93 @@ class HasElement(Matcher):
         return failure_msg
 
     def matches(self, actual: Selection) -> MatchResult:
-        result = self._matches(actual)
+        with step("check", actual):
+            result = self._matches(actual)
         if not result and actual.screenshot_on_failed_checks:
             save_screenshot(actual.driver, self._build_failure_msg(actual, result))
+        if not result and actual.page_source_on_failed_checks:
+            actual.save_page_source(self._build_failure_msg(actual, result))
 
         return result
 
 
+class HasElements(HasElement):
+    def _matches(self, actual: Selection) -> MatchResult:
+        elements = actual.elements
+        # fetch all the states needed by the matcher for all the elements at once
+        fields = get_required_fields(self.matcher)
+        if fields:
+            elements = fetch_snapshots(actual.driver, elements, fields)
+        return self.matcher.matches(elements)
+
+
+class HasTable(HasElement):
+    def __init__(self, matcher: Matcher, header_row: bool, columns: Optional[Sequence[Optional[str]]]):
+        super().__init__(matcher)
+        self.header_row = header_row
+        self.columns = columns
+
+    def _matches(self, actual: Selection) -> MatchResult:
+        try:
+            table = actual.as_table(self.header_row, self.columns)
+        except NoSuchElementException:
+            return MatchResult.failure(f"Could not find {actual}")
+        return self.matcher.matches(table)
+
+
+INPUT_NATIVE = "native"
+INPUT_SCRIPT = "script"
+INPUT_HYBRID = "hybrid"
+
+_INPUT_STRATEGIES = (INPUT_NATIVE, INPUT_SCRIPT, INPUT_HYBRID)
+
+# find the elements in the document of the current frame, return null if the driver is not at the expected
+# frame depth anymore (a top-level navigation has brought it back to the top-level document)
+_FIND_IN_FRAME_SCRIPT = """
+if ((%s)() !== arguments[0]) {
+    return null;
+}
+return (%s)(arguments[1], arguments[2], document, arguments[3]);
+""" % (FRAME_DEPTH_JS_FUNCTION, FIND_JS_FUNCTION)
+
+# append the text to the value of a text field and dispatch the events a user input would trigger,
+# return false if the element is not a text field (the text must then be typed natively): the value of the
+# other inputs (date, number, color, file, etc...) and of the content editable elements is not a plain
+# concatenation of the typed characters
+_APPEND_VALUE_SCRIPT = """
+var element = arguments[0], text = arguments[1], dispatchChange = arguments[2];
+var tag = element.tagName.toLowerCase();
+// the type property of an input without (or with an unknown) type attribute is "text"
+var textTypes = ["text", "search", "email", "url", "tel", "password"];
+if ((tag === "input" && textTypes.indexOf(element.type) >= 0) || tag === "textarea") {
+    element.focus();
+    var value = element.value + text;
+    if (element.maxLength >= 0) {
+        value = value.substring(0, element.maxLength);
+    }
+    // the native setter is used so that the frameworks tracking the field value (such as React) notice the change
+    var proto = tag === "input" ? HTMLInputElement.prototype : HTMLTextAreaElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, "value").set.call(element, value);
+} else {
+    return false;
+}
+element.dispatchEvent(new Event("input", {bubbles: true}));
+if (dispatchChange) {
+    element.dispatchEvent(new Event("change", {bubbles: true}));
+}
+return true;
+"""
+
+
 class Selection:
+    __slots__ = (
+        "driver", "by", "value", "context",
+        "_expected_condition", "_expected_condition_timeout", "_expected_condition_extra_args",
+        "_expected_condition_reverse", "_prefetched",
+        # the class-level settings below (such as screenshot_on_exceptions) can be overridden per instance
+        "__dict__"
+    )
+
     #: The default timeout value to use if no ``timeout`` argument is passed to
     #: the :py:func:`must_be_waited_until` / :py:func:`must_be_waited_until_not` methods.
     default_timeout = 10
@@ -59,24 +161,56 @@ class Selection:
     #: with :py:func:`Selection.check_element`,
     #: :py:func:`Selection.require_element` and :py:func:`Selection.assert_element` methods.
     screenshot_on_failed_checks = False
-
-    def __init__(self, driver, by, value):
-        from .selector import Selector  # workaround for circular import
+    #: An optional callable taking a :py:class:`Selection` and returning the timeout to be used for its explicit wait
+    #: when no ``timeout`` argument has been passed to :py:func:`must_be_waited_until` /
+    #: :py:func:`must_be_waited_until_not` (or ``None`` to fall back on :py:attr:`Selection.default_timeout`),
+    #: see :py:class:`TimeoutLearner <lemoncheesecake_selenium.TimeoutLearner>`.
+    timeout_provider: Optional[Callable[[Selection], Optional[float]]] = None
+    #: The default input strategy of :py:func:`Selection.set_text`:
+    #:
+    #: - ``"native"``: the text is typed character by character (``send_keys``)
+    #: - ``"script"``: the text is appended to the field value by script, followed by ``input`` and ``change`` events
+    #: - ``"hybrid"``: the text is appended by script except its last :py:attr:`Selection.hybrid_typed_chars`
+    #:   characters that are typed natively so that the key event handlers are triggered
+    input_strategy = INPUT_NATIVE
+    #: The number of characters typed natively by the ``"hybrid"`` input strategy.
+    hybrid_typed_chars = 3
+    #: Whether :py:func:`Selection.save_screenshot` crops the element screenshot from a cached capture
+    #: of the page (``"viewport"`` or ``"full_page"``, see
+    #: :py:class:`CaptureCache <lemoncheesecake_selenium.capture.CaptureCache>`) instead of having the browser
+    #: capture the element (``None``).
+    screenshot_capture: Optional[str] = None
+    #: Whether or not the page source will be automatically saved upon failed checks
+    #: with :py:func:`Selection.check_element`,
+    #: :py:func:`Selection.require_element` and :py:func:`Selection.assert_element` methods
+    #: (see :py:func:`Selection.save_page_source`).
+    page_source_on_failed_checks = False
+    #: The maximum size (in characters) of the page sources saved by :py:func:`Selection.save_page_source`,
+    #: a larger page source is trimmed to the region around the element (``None`` means no limit).
+    page_source_max_size: Optional[int] = None
+
+    def __init__(self, driver, by, value, context: Context = ()):
         self.driver = driver
         self.by = by
         self.value = value
+        #: the frames and shadow hosts (as a tuple of ``(kind, by, value)``) leading to the element
+        self.context = context
         self._expected_condition = None
-        self._expected_condition_timeout = 0
+        self._expected_condition_timeout = None
         self._expected_condition_extra_args = ()
         self._expected_condition_reverse = False
+        self._prefetched = None
 
     @property
     def locator(self):
         return self.by, self.value
 
+    def _is_in_frame(self):
+        return any(entry.kind == FRAME for entry in self.context)
+
     def _must_be_waited(self, expected_condition, timeout, extra_args, reverse):
         self._expected_condition = expected_condition
-        self._expected_condition_timeout = timeout if timeout is not None else self.default_timeout
+        self._expected_condition_timeout = timeout
         self._expected_condition_extra_args = extra_args
         self._expected_condition_reverse = reverse
         return self
@@ -88,7 +222,8 @@ class Selection:
         so that it is considered available when the ``expected_condition`` is met.
 
         :param expected_condition: a callable that will take a locator (a tuple of ``(by, path)``) as first argument
-        :param timeout: wait timeout (will be :py:attr:`Selection.default_timeout` if no argument is passed)
+        :param timeout: wait timeout (will be given by :py:attr:`Selection.timeout_provider` or
+            :py:attr:`Selection.default_timeout` if no argument is passed)
         :param extra_args: extra arguments to be passed to the ``expected_condition`` callable
         :return: ``self``, meaning this method can be chain called
         """
@@ -101,24 +236,59 @@ class Selection:
         so that it is considered available when the ``expected_condition`` is NOT met.
 
         :param expected_condition: a callable that will take a locator (a tuple of ``(by, path)``) as first argument
-        :param timeout: wait timeout (will be :py:attr:`Selection.default_timeout` if no argument is passed)
+        :param timeout: wait timeout (will be given by :py:attr:`Selection.timeout_provider` or
+            :py:attr:`Selection.default_timeout` if no argument is passed)
         :param extra_args: extra arguments to be passed to the ``expected_condition`` callable
         :return: ``self``, meaning this method can be chain called
         """
         return self._must_be_waited(expected_condition, timeout, extra_args, reverse=True)
 
+    def _get_timeout(self):
+        if self._expected_condition_timeout is not None:
+            return self._expected_condition_timeout
+        # looked up on the class so that a plain function is not bound to the selection
+        timeout_provider = type(self).timeout_provider
+        if timeout_provider is not None:
+            timeout = timeout_provider(self)
+            if timeout is not None:
+                return timeout
+        return self.default_timeout
+
     def _wait_expected_condition(self):
         if not self._expected_condition:
             return
 
+        # imported here since it pulls the whole selenium remote webdriver machinery
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        timeout = self._get_timeout()
+        if isinstance(self._expected_condition, BrowserCondition):
+            host = self._script_host()
+            with step("wait", self, timeout=timeout):
+                self._expected_condition.wait(
+                    self.driver, self.locator, self._expected_condition_extra_args,
+                    host=host, reverse=self._expected_condition_reverse, timeout=timeout
+                )
+            return
+
+        expected_condition = self._expected_condition(self.locator, *self._expected_condition_extra_args)
+
+        def condition(_):
+            # the frames & shadow roots are entered on each poll since they may be replaced during the wait
+            try:
+                return expected_condition(self._search_context())
+            except STALE_CONTEXT_EXCEPTIONS:
+                if not self.context:
+                    raise
+                get_context_tracker(self.driver).invalidate()
+                return expected_condition(self._search_context())
+
         wait_method = getattr(
-            WebDriverWait(self.driver, self._expected_condition_timeout),
+            WebDriverWait(self.driver, timeout, ignored_exceptions=STALE_CONTEXT_EXCEPTIONS),
             "until_not" if self._expected_condition_reverse else "until"
         )
-        wait_method(
-            self._expected_condition(self.locator, *self._expected_condition_extra_args),
-            message="expected condition has not been fulfilled"
-        )
+        with step("wait", self, timeout=timeout):
+            wait_method(condition, message="expected condition has not been fulfilled")
 
     @contextmanager
     def _exception_handler(self):
@@ -128,13 +298,88 @@ class Selection:
         else:
             yield
 
+    @contextmanager
+    def _action(self, kind, **details):
+        # an action that may change the page
+        with step(kind, self, **details), self._exception_handler():
+            try:
+                yield
+            finally:
+                invalidate_capture_cache(self.driver)
+                invalidate_prefetch(self.driver)
+                # the action may have triggered a top-level navigation (such as a link targeting _top)
+                get_context_tracker(self.driver).suspect_navigation()
+
+    def _search_context(self):
+        return get_context_tracker(self.driver).enter(self.context)
+
+    def _get_prefetched(self) -> Optional[ElementSnapshot]:
+        # the data of prefetch_selections, as long as no mutating action has been performed since then;
+        # the driver is switched into the element's frames so that the element can be used
+        if self._prefetched is None or self._expected_condition is not None:
+            return None
+        generation, snapshot = self._prefetched
+        if generation != get_prefetch_generation(self.driver):
+            return None
+        self._enter_frames()
+        return snapshot
+
+    def _enter_frames(self):
+        # enter the frames of the element without resolving its shadow hosts
+        last_frame_idx = max((idx for idx, entry in enumerate(self.context) if entry.kind == FRAME), default=-1)
+        get_context_tracker(self.driver).enter(self.context[:last_frame_idx + 1])
+
+    def _script_host(self) -> Optional[WebElement]:
+        # enter the frames of the element and return the shadow host in which the element must be searched (if any),
+        # shadow roots cannot be passed to scripts, their host is passed instead
+        if self.context and self.context[-1].kind == SHADOW:
+            entry = self.context[-1]
+            return Selection(self.driver, entry.by, entry.value, self.context[:-1]).element
+        self._search_context()
+        return None
+
+    def _find_checking_frames(self, method_name):
+        # after an action, the driver is checked to still be in the selection's frames in the same command
+        # as the lookup; return None if the elements must be searched the regular way
+        tracker = get_context_tracker(self.driver)
+        depth = tracker.get_frame_depth_to_check(self.context)
+        if depth is None:
+            return None
+        first_only = method_name == "find_element"
+        matches = self.driver.execute_script(
+            _FIND_IN_FRAME_SCRIPT, depth, *to_script_locator(self.by, self.value), first_only
+        )
+        tracker.set_frames_checked(matches is not None)
+        if matches is None or (first_only and not matches):
+            # the NoSuchElementException is left to the regular lookup
+            return None
+        return matches[0] if first_only else matches
+
+    def _find(self, method_name):
+        with step("find", self):
+            found = self._find_checking_frames(method_name)
+            if found is not None:
+                return found
+            try:
+                return getattr(self._search_context(), method_name)(self.by, self.value)
+            except STALE_CONTEXT_EXCEPTIONS + (NoSuchElementException,):
+                if not self.context:
+                    raise
+                # the page has changed since the frames & shadow roots have been resolved
+                # (or the driver has been brought back to the top-level document by a navigation)
+                get_context_tracker(self.driver).invalidate()
+                return getattr(self._search_context(), method_name)(self.by, self.value)
+
     @property
     def element(self) -> WebElement:
         """
         :return: the underlying ``WebElement`` with the explicit wait taken into account (if any has been set)
         """
         self._wait_expected_condition()
-        return self.driver.find_element(self.by, self.value)
+        snapshot = self._get_prefetched()
+        if snapshot is not None:
+            return snapshot.element
+        return self._find("find_element")
 
     @property
     def elements(self) -> Sequence[WebElement]:
@@ -142,14 +387,37 @@ class Selection:
         :return: the underlying ``WebElement`` list with the explicit wait taken into account (if any has been set)
         """
         self._wait_expected_condition()
-        return self.driver.find_elements(self.by, self.value)
+        return self._find("find_elements")
+
+    def iter_elements(self, chunk_size: int = 100, *,
+                      snapshot: Iterable[str] = None) -> Iterator[Union[WebElement, ElementSnapshot]]:
+        """
+        Iterate lazily over the underlying elements (with the explicit wait taken into account if any has been set):
+        the elements are searched once in the browser and then fetched by chunks of ``chunk_size`` elements,
+        so that breaking out of the loop early spares the fetching of the remaining elements.
+        The elements are yielded in document order.
+
+        :param chunk_size: the number of elements fetched at once
+        :param snapshot: the states to be fetched along with the elements
+            (``"text"``, ``"displayed"``, ``"attribute:href"``, etc...),
+            :py:class:`ElementSnapshot <lemoncheesecake_selenium.snapshot.ElementSnapshot>` instances are then
+            yielded instead of ``WebElement`` instances
+        :return: an iterator
+        """
+        self._wait_expected_condition()
+        return iter_matches(
+            self.driver, self.by, self.value, host=self._script_host(), chunk_size=chunk_size, fields=snapshot
+        )
 
     def click(self):
         """
         Click on the element.
         """
         lcc.log_info(f"Click on {self}")
-        with self._exception_handler():
+        self._click()
+
+    def _click(self):
+        with self._action("click"):
             self.element.click()
 
     def clear(self):
@@ -157,18 +425,44 @@ class Selection:
         Clear the element.
         """
         lcc.log_info(f"Clear {self}")
-        with self._exception_handler():
+        self._clear()
+
+    def _clear(self):
+        with self._action("clear"):
             self.element.clear()
 
-    def set_text(self, text: str):
+    def set_text(self, text: str, *, strategy: str = None):
         """
         Set to text in the element.
 
         :param text: text to be set
+        :param strategy: the input strategy (``"native"``, ``"script"`` or ``"hybrid"``),
+            :py:attr:`Selection.input_strategy` is used if not given; elements that are not text fields
+            (text, search, email, url, tel and password inputs, textareas) are always typed natively
         """
+        strategy = self._get_input_strategy(strategy)
         lcc.log_info(f"Set text '{text}' on {self}")
-        with self._exception_handler():
-            self.element.send_keys(text)
+        self._set_text(text, strategy)
+
+    def _get_input_strategy(self, strategy):
+        strategy = strategy or self.input_strategy
+        if strategy not in _INPUT_STRATEGIES:
+            raise ValueError(f"Invalid input strategy '{strategy}'")
+        return strategy
+
+    def _set_text(self, text, strategy):
+        with self._action("set_text", strategy=strategy):
+            element = self.element
+            typed = text
+            if strategy == INPUT_SCRIPT:
+                if self.driver.execute_script(_APPEND_VALUE_SCRIPT, element, text, True):
+                    typed = ""
+            elif strategy == INPUT_HYBRID and len(text) > self.hybrid_typed_chars:
+                split = len(text) - self.hybrid_typed_chars
+                if self.driver.execute_script(_APPEND_VALUE_SCRIPT, element, text[:split], False):
+                    typed = text[split:]
+            if typed:
+                element.send_keys(typed)
 
     def check_element(self, expected: Matcher):
         """
@@ -221,6 +515,84 @@ class Selection:
         """
         assert_that(str(self), self, not_(HasElement(is_in_page())))
 
+    def check_elements(self, expected: Matcher):
+        """
+        Check that the elements match ``expected`` using
+        the :py:func:`lemoncheesecake.matching.check_that` function.
+
+        :param expected: a ``Matcher`` instance whose ``matches`` method will be called with
+            the list of elements that have been found, such as :py:func:`each`, :py:func:`any_`, :py:func:`none_`
+            or :py:func:`count_of`. The element states needed by the matcher are fetched for all the elements
+            in a single WebDriver command
+        """
+        check_that(str(self), self, HasElements(expected))
+
+    def require_elements(self, expected: Matcher):
+        """
+        Check that the elements match ``expected`` using
+        the :py:func:`lemoncheesecake.matching.require_that` function.
+
+        :param expected: see :py:meth:`Selection.check_elements`
+        """
+        require_that(str(self), self, HasElements(expected))
+
+    def assert_elements(self, expected: Matcher):
+        """
+        Check that the elements match ``expected`` using
+        the :py:func:`lemoncheesecake.matching.assert_that` function.
+
+        :param expected: see :py:meth:`Selection.check_elements`
+        """
+        assert_that(str(self), self, HasElements(expected))
+
+    def as_table(self, header_row: bool = True, columns: Sequence[Optional[str]] = None) -> List[Row]:
+        """
+        Extract the content of the table (a ``<table>`` element or an element with the ARIA ``table``/``grid`` role)
+        in a single WebDriver command. Cells spanning several columns/rows are repeated in each of them.
+
+        :param header_row: whether or not the first row contains the column names
+        :param columns: the column names, they take precedence over the header row; a ``None`` column name means
+            that the column is skipped. If neither ``header_row`` nor ``columns`` are set,
+            the column indexes are used as keys.
+        :return: the rows as a list of dicts (column name => cell text)
+        """
+        return make_rows(fetch_table(self.driver, self.element), header_row, columns)
+
+    def check_table(self, expected: Matcher, *, header_row: bool = True, columns: Sequence[Optional[str]] = None):
+        """
+        Check that the table matches ``expected`` using
+        the :py:func:`lemoncheesecake.matching.check_that` function.
+
+        :param expected: a ``Matcher`` instance (such as :py:func:`has_row <lemoncheesecake_selenium.has_row>`
+            or :py:func:`contains_rows <lemoncheesecake_selenium.contains_rows>`) whose ``matches`` method will be
+            called with the table rows (see :py:meth:`Selection.as_table`)
+        :param header_row: see :py:meth:`Selection.as_table`
+        :param columns: see :py:meth:`Selection.as_table`
+        """
+        check_that(str(self), self, HasTable(expected, header_row, columns))
+
+    def require_table(self, expected: Matcher, *, header_row: bool = True, columns: Sequence[Optional[str]] = None):
+        """
+        Check that the table matches ``expected`` using
+        the :py:func:`lemoncheesecake.matching.require_that` function.
+
+        :param expected: see :py:meth:`Selection.check_table`
+        :param header_row: see :py:meth:`Selection.as_table`
+        :param columns: see :py:meth:`Selection.as_table`
+        """
+        require_that(str(self), self, HasTable(expected, header_row, columns))
+
+    def assert_table(self, expected: Matcher, *, header_row: bool = True, columns: Sequence[Optional[str]] = None):
+        """
+        Check that the table matches ``expected`` using
+        the :py:func:`lemoncheesecake.matching.assert_that` function.
+
+        :param expected: see :py:meth:`Selection.check_table`
+        :param header_row: see :py:meth:`Selection.as_table`
+        :param columns: see :py:meth:`Selection.as_table`
+        """
+        assert_that(str(self), self, HasTable(expected, header_row, columns))
+
     def save_screenshot(self, description: str = None):
         """
         Take and save (as lemoncheesecake attachment) a screenshot of the underlying element.
@@ -230,18 +602,46 @@ class Selection:
         if description is None:
             description = f"Screenshot of {self}"
 
-        with lcc.prepare_image_attachment("screenshot.png", description) as path:
-            self.element.screenshot(path)
+        with step("screenshot", self), lcc.prepare_image_attachment("screenshot.png", description) as path:
+            if self.screenshot_capture and not self._is_in_frame():
+                get_capture_cache(self.driver).write_element_screenshots(
+                    [self.element], [path], full_page=self.screenshot_capture == "full_page"
+                )
+            else:
+                write_screenshot(self.driver, path, self.element)
 
-    def _select(self, method_name, value=NotImplemented):
+    def save_page_source(self, description: str = None):
+        """
+        Save (as gzip-compressed lemoncheesecake attachment) the page source the underlying element belongs to,
+        trimmed to the region around the element if it exceeds :py:attr:`Selection.page_source_max_size`
+        (see :py:func:`save_page_source <lemoncheesecake_selenium.save_page_source>`).
+
+        :param description: description of the page source attachment
+        """
+        if description is None:
+            description = f"Page source of {self}"
+
+        try:
+            element = self.element
+        except WebDriverException:
+            # the page source still helps understanding why the element is missing
+            element = None
+        save_page_source(self.driver, description, element=element, max_size=self.page_source_max_size)
+
+    @staticmethod
+    def _describe_select(method_name, value):
         # Build contextual info for logs
         action_label = method_name.replace("_", " ")
         if value is not NotImplemented:
             action_label += " " + repr(value)
+        return action_label
 
-        lcc.log_info(f"{action_label} the {self}".capitalize())
+    def _select(self, method_name, value=NotImplemented):
+        lcc.log_info(f"{self._describe_select(method_name, value)} the {self}".capitalize())
+        self._apply_select(method_name, value)
 
-        with self._exception_handler():
+    def _apply_select(self, method_name, value=NotImplemented):
+        with self._action("select", method=method_name):
             select = Select(self.element)
             if value is NotImplemented:
                 getattr(select, method_name)()
@@ -303,11 +703,19 @@ class Selection:
         self._select("deselect_by_visible_text", text)
 
     def __str__(self):
-        if self.by == By.XPATH:
-            by = "XPATH"
-        elif self.by == By.CSS_SELECTOR:
-            by = "CSS selector"
-        else:
-            by = self.by
+        description = "element " + _describe_locator(self.by, self.value)
+        for entry in reversed(self.context):
+            if entry.kind == FRAME:
+                description += " in frame " + _describe_locator(entry.by, entry.value)
+            else:
+                description += " in shadow root of element " + _describe_locator(entry.by, entry.value)
+        return description
+
+
+def _describe_locator(by, value):
+    if by == By.XPATH:
+        by = "XPATH"
+    elif by == By.CSS_SELECTOR:
+        by = "CSS selector"
 
-        return f"element identified by {by} '{self.value}'"
+    return f"identified by {by} '{value}'"
@@ -1,12 +1,28 @@
-from selenium.webdriver.remote.webdriver import WebDriver
+from __future__ import annotations
+
+from contextlib import ExitStack
+from typing import Iterable, TYPE_CHECKING
+
 from selenium.webdriver.common.by import By
+import lemoncheesecake.api as lcc
+
 from lemoncheesecake_selenium.selection import Selection
+from lemoncheesecake_selenium.context import Context, ContextEntry, FRAME, SHADOW, get_context_tracker
+from lemoncheesecake_selenium.conditions import network_is_idle, dom_is_settled, page_is_settled
+from lemoncheesecake_selenium.instrumentation import step
+from lemoncheesecake_selenium.waiting import wait_for_selections
+from lemoncheesecake_selenium.capture import get_capture_cache
+from lemoncheesecake_selenium.prefetch import DEFAULT_PREFETCH_FIELDS, prefetch_selections, invalidate_prefetch
+from lemoncheesecake_selenium.screenshot import write_screenshot
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
 
 
 def _selector(by):
 
     def builder(selector, value):
-        return Selection(selector.driver, by, value)
+        return Selection(selector.driver, by, value, selector.context)
     builder.__doc__ = f"""
     Get a :py:class:`Selection` using element's {by}
     
@@ -21,9 +37,161 @@ class Selector:
     Factory of :py:class:`Selection` instances.
     """
 
-    def __init__(self, driver: WebDriver):
+    def __init__(self, driver: WebDriver, context: Context = ()):
         #: WebDriver
         self.driver = driver
+        #: the frames and shadow hosts leading to the elements selected by this selector
+        self.context = context
+
+    def _in_context(self, kind, selection):
+        return Selector(
+            self.driver, selection.context + (ContextEntry(kind, selection.by, selection.value),)
+        )
+
+    def in_frame(self, frame: Selection) -> Selector:
+        """
+        Get a selector whose selections will be searched in a frame.
+        Frames are only switched when the driver is not already in the expected frame.
+
+        :param frame: the :py:class:`Selection` of the frame (or iframe) element
+        :return: :py:class:`Selector`
+        """
+        return self._in_context(FRAME, frame)
+
+    def in_shadow(self, host: Selection) -> Selector:
+        """
+        Get a selector whose selections will be searched in the shadow root of an element.
+        Shadow roots are cached once resolved (see :py:meth:`Selector.invalidate_context_cache`).
+
+        :param host: the :py:class:`Selection` of the shadow host element
+        :return: :py:class:`Selector`
+        """
+        return self._in_context(SHADOW, host)
+
+    def invalidate_context_cache(self):
+        """
+        Forget the frame the driver is known to be switched to and the cached shadow roots.
+        It must be called after a manual frame switch or after a navigation that does not come from
+        a :py:class:`Selection` action (such as ``driver.get`` or ``driver.refresh``): while the stale shadow roots
+        and vanished frames are detected when a single element is searched, an element list searched
+        in the wrong browsing context is merely empty.
+        The prefetched selections (see :py:meth:`Selector.prefetch`) are dropped as well.
+        """
+        get_context_tracker(self.driver).invalidate()
+        invalidate_prefetch(self.driver)
+
+    def _wait_until(self, expected_condition, quiet_period, timeout):
+        # imported here since it pulls the whole selenium remote webdriver machinery
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        search_context = get_context_tracker(self.driver).enter(self.context)
+        with step("wait", condition=expected_condition.__name__):
+            WebDriverWait(search_context, timeout if timeout is not None else Selection.default_timeout).until(
+                expected_condition(None, quiet_period),
+                message=f"page has not been settled ({expected_condition.__name__.replace('_', ' ')})"
+            )
+
+    def wait_until_network_idle(self, quiet_period: float = 0.5, *, timeout: int = None):
+        """
+        Wait until no fetch/XHR request has been in flight for ``quiet_period`` seconds
+        (see :py:func:`lemoncheesecake_selenium.conditions.network_is_idle`).
+
+        :param quiet_period: the period of time (in seconds) with no network activity
+        :param timeout: wait timeout (will be :py:attr:`Selection.default_timeout` if no argument is passed)
+        """
+        self._wait_until(network_is_idle, quiet_period, timeout)
+
+    def wait_until_dom_settled(self, quiet_period: float = 0.5, *, timeout: int = None):
+        """
+        Wait until the DOM has not been mutated for ``quiet_period`` seconds
+        (see :py:func:`lemoncheesecake_selenium.conditions.dom_is_settled`).
+
+        :param quiet_period: the period of time (in seconds) with no DOM mutation
+        :param timeout: wait timeout (will be :py:attr:`Selection.default_timeout` if no argument is passed)
+        """
+        self._wait_until(dom_is_settled, quiet_period, timeout)
+
+    def wait_until_page_settled(self, quiet_period: float = 0.5, *, timeout: int = None):
+        """
+        Wait until both the network is idle and the DOM is settled
+        (see :py:func:`lemoncheesecake_selenium.conditions.page_is_settled`).
+
+        :param quiet_period: the period of time (in seconds) with no network activity nor DOM mutation
+        :param timeout: wait timeout (will be :py:attr:`Selection.default_timeout` if no argument is passed)
+        """
+        self._wait_until(page_is_settled, quiet_period, timeout)
+
+    def wait_all(self, *selections: Selection, timeout: float = None, poll_frequency: float = 0.5):
+        """
+        Wait until all the selections are available, that is until their explicit wait condition
+        (see :py:meth:`Selection.must_be_waited_until`) is met or, for selections without explicit wait,
+        until their element is present. All the conditions are evaluated in a single poll loop, the presence
+        of the elements outside shadow roots being checked with a single WebDriver command per poll.
+
+        :param selections: the :py:class:`Selection` instances
+        :param timeout: wait timeout (the timeout of each selection is used if no argument is passed)
+        :param poll_frequency: the interval (in seconds) between two polls
+        :raise TimeoutException: if some selections have not been available in time,
+            the exception message tells which selections timed out
+        """
+        wait_for_selections(
+            self.driver, selections, require_all=True, timeout=timeout, poll_frequency=poll_frequency
+        )
+
+    def wait_any(self, *selections: Selection, timeout: float = None, poll_frequency: float = 0.5) -> Selection:
+        """
+        Wait until one of the selections is available, see :py:meth:`Selector.wait_all`.
+
+        :param selections: the :py:class:`Selection` instances
+        :param timeout: wait timeout (the longest timeout of the selections is used if no argument is passed)
+        :param poll_frequency: the interval (in seconds) between two polls
+        :return: the first available :py:class:`Selection`
+        :raise TimeoutException: if none of the selections has been available in time
+        :raise ValueError: if no selection is given
+        """
+        return wait_for_selections(
+            self.driver, selections, require_all=False, timeout=timeout, poll_frequency=poll_frequency
+        )
+
+    def prefetch(self, *selections: Selection, fields: Iterable[str] = DEFAULT_PREFETCH_FIELDS):
+        """
+        Resolve the elements of the selections along with their state in a single WebDriver command
+        (per frame), the actions and checks on these selections then use the prefetched data
+        until the next mutating action (see :py:func:`prefetch_selections
+        <lemoncheesecake_selenium.prefetch.prefetch_selections>`).
+
+        :param selections: the :py:class:`Selection` instances
+        :param fields: the element states to be fetched (``"text"``, ``"displayed"``, ``"attribute:href"``, etc...)
+        """
+        prefetch_selections(self.driver, selections, fields)
+
+    def save_screenshots(self, *selections: Selection, full_page: bool = False):
+        """
+        Take and save (as lemoncheesecake attachments) a screenshot of each selection's element. The screenshots
+        are cropped from a single (cached) capture of the page, the bounding rects of the elements being fetched
+        with a single WebDriver command (see :py:class:`CaptureCache <lemoncheesecake_selenium.capture.CaptureCache>`).
+        The elements that are in frames are captured by the browser.
+
+        :param selections: the :py:class:`Selection` instances
+        :param full_page: whether the capture must be of the full page (only supported by Firefox)
+            instead of the viewport
+        """
+        with step("screenshot", count=len(selections)), ExitStack() as stack:
+            paths = [
+                stack.enter_context(lcc.prepare_image_attachment("screenshot.png", f"Screenshot of {selection}"))
+                for selection in selections
+            ]
+            cropped = []
+            for selection, path in zip(selections, paths):
+                if selection._is_in_frame():
+                    write_screenshot(self.driver, path, selection.element)
+                else:
+                    cropped.append((selection.element, path))
+            if cropped:
+                get_context_tracker(self.driver).enter(())
+                get_capture_cache(self.driver).write_element_screenshots(
+                    [element for element, _ in cropped], [path for _, path in cropped], full_page=full_page
+                )
 
     by_id = _selector(By.ID)
     by_xpath = _selector(By.XPATH)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Sequence, TYPE_CHECKING
+
+import lemoncheesecake.api as lcc
+
+from lemoncheesecake_selenium.instrumentation import step
+from lemoncheesecake_selenium.context import get_context_tracker
+from lemoncheesecake_selenium.capture import invalidate_capture_cache
+from lemoncheesecake_selenium.prefetch import invalidate_prefetch
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+
+_CLEAR_STORAGE_SCRIPT = """
+var done = arguments[arguments.length - 1];
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+if (!window.indexedDB || !window.indexedDB.databases) {
+    done(true);
+    return;
+}
+window.indexedDB.databases().then(function (databases) {
+    var pending = databases.length;
+    if (!pending) { done(true); return; }
+    databases.forEach(function (db) {
+        var request = window.indexedDB.deleteDatabase(db.name);
+        request.onsuccess = request.onerror = request.onblocked = function () {
+            if (--pending === 0) { done(true); }
+        };
+    });
+}, function () { done(true); });
+"""
+
+
+class _PooledSession:
+    __slots__ = ("driver", "uses", "retired")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        # the session is to be quit when released (see SessionPool.quit_all)
+        self.retired = False
+
+
+class SessionPool:
+    """
+    Keep browser sessions alive across tests: instead of quitting the browser at the end of a test,
+    the session is reset (extra windows closed, cookies, local/session storage and IndexedDB cleared,
+    timeouts restored, ``about:blank`` loaded) and handed to the next test.
+    A session is restarted only if its reset fails or if it has been used ``max_uses`` times.
+
+    Cookies and storage are bound to an origin: they are cleared for the origin of the page the test ends on
+    and for the ``origins`` passed to the pool. With Chromium-based browsers (that support the Chrome DevTools
+    Protocol), the cookies of all the origins are cleared and the storage of ``origins`` is cleared without loading
+    them; with the other browsers, each of ``origins`` is loaded on reset to clear its cookies and storage.
+    The storage (and, except with Chromium, the cookies) of the other origins visited by a test (such as an identity
+    provider) is kept: list them in ``origins`` or use ``max_uses=1`` for the tests that need a pristine browser.
+
+    Usage example in a lemoncheesecake fixtures file::
+
+        pool = SessionPool(webdriver.Firefox, max_uses=50)
+
+        @lcc.fixture(scope="test")
+        def driver():
+            with pool.use() as driver:
+                yield driver
+
+        @lcc.fixture(scope="session")
+        def browser_pool():
+            yield
+            pool.quit_all()
+
+    The pool is thread-safe: each concurrently running test gets its own session.
+    """
+
+    #: The timeouts (in seconds) restored on each session reset.
+    timeouts = {"implicit_wait": 0, "page_load": 300, "script": 30}
+
+    def __init__(self, factory: Callable[[], WebDriver], *, max_uses: int = 100, origins: Sequence[str] = ()):
+        """
+        :param factory: a callable that starts a new browser session and returns its ``WebDriver``
+        :param max_uses: the number of tests after which a session is restarted
+        :param origins: the other origins (such as ``"https://login.example.com"``) whose cookies and storage
+            must be cleared on reset
+        """
+        self.factory = factory
+        self.max_uses = max_uses
+        self.origins = tuple(origins)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._sessions = []
+        #: total time (in seconds) spent in session resets
+        self.reset_time = 0.0
+        #: number of successful session resets
+        self.reset_count = 0
+
+    def _acquire(self) -> _PooledSession:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        session = _PooledSession(self.factory())
+        with self._lock:
+            self._sessions.append(session)
+        return session
+
+    def _discard(self, session):
+        with self._lock:
+            if session not in self._sessions:
+                # already quit
+                return
+            self._sessions.remove(session)
+        try:
+            session.driver.quit()
+        except Exception:
+            # the browser or the connection to the WebDriver server may be dead already
+            pass
+
+    def reset(self, driver: WebDriver):
+        """
+        Reset the state of a browser session.
+
+        :param driver: ``WebDriver`` instance
+        """
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        # storage is bound to the origin of the current page, it must be cleared before leaving it
+        driver.execute_async_script(_CLEAR_STORAGE_SCRIPT)
+        if callable(getattr(driver, "execute_cdp_cmd", None)):
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            for origin in self.origins:
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        else:
+            # WebDriver only gives access to the cookies & storage of the current page's origin
+            driver.delete_all_cookies()
+            for origin in self.origins:
+                driver.get(origin)
+                driver.execute_async_script(_CLEAR_STORAGE_SCRIPT)
+                driver.delete_all_cookies()
+
+        driver.implicitly_wait(self.timeouts["implicit_wait"])
+        driver.set_page_load_timeout(self.timeouts["page_load"])
+        driver.set_script_timeout(self.timeouts["script"])
+
+        driver.get("about:blank")
+
+        # forget the state cached for the previous test
+        get_context_tracker(driver).invalidate()
+        invalidate_capture_cache(driver)
+        invalidate_prefetch(driver)
+
+    def _release(self, session):
+        if session.retired:
+            self._discard(session)
+            return
+
+        session.uses += 1
+        if session.uses >= self.max_uses:
+            lcc.log_info(f"Restart browser session after {session.uses} uses")
+            self._discard(session)
+            return
+
+        start = time.perf_counter()
+        try:
+            with step("reset_session"):
+                self.reset(session.driver)
+        except Exception as exc:
+            # connection errors (such as urllib3's) are not wrapped into WebDriverException
+            lcc.log_warning(f"Could not reset browser session ({exc}), restart it")
+            self._discard(session)
+        else:
+            duration = time.perf_counter() - start
+            lcc.log_info(f"Browser session reset in {duration:.3f}s")
+            with self._lock:
+                self.reset_time += duration
+                self.reset_count += 1
+                self._idle.append(session)
+
+    @contextmanager
+    def use(self):
+        """
+        Context manager, provide a browser session that will be reset (or restarted) at the end of the block.
+
+        :return: a ``WebDriver`` instance
+        """
+        session = self._acquire()
+        try:
+            yield session.driver
+        finally:
+            self._release(session)
+
+    def quit_all(self):
+        """
+        Quit all the idle browser sessions of the pool, the sessions still in use are quit when released.
+        """
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            for session in self._sessions:
+                if session not in idle:
+                    session.retired = True
+        for session in idle:
+            self._discard(session)
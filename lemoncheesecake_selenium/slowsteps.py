@@ -0,0 +1,84 @@
+import time
+import threading
+from typing import Dict
+
+from selenium.common.exceptions import WebDriverException
+import lemoncheesecake.api as lcc
+
+from lemoncheesecake_selenium.instrumentation import Listener, Step
+from lemoncheesecake_selenium.utils import save_screenshot
+
+
+class SlowStepDetector(Listener):
+    """
+    Log a warning in the report for every :py:class:`Selection` step that takes longer than
+    the threshold associated to its kind, and optionally save a screenshot of the page.
+
+    Usage example::
+
+        detector = SlowStepDetector({"click": 2, "wait": 5}, screenshot=True)
+        detector.enable()
+    """
+
+    #: The default thresholds (in seconds) by step kind, step kinds not listed here are not monitored.
+    default_thresholds = {
+        "find": 2,
+        "click": 2,
+        "clear": 2,
+        "set_text": 2,
+        "select": 2,
+        "wait": 5,
+        "check": 2,
+    }
+
+    def __init__(self, thresholds: Dict[str, float] = None, *,
+                 screenshot: bool = False, screenshot_interval: float = 60, max_screenshots: int = 10):
+        """
+        :param thresholds: thresholds (in seconds) by step kind, they override :py:attr:`default_thresholds`
+        :param screenshot: whether or not a screenshot must be saved when a slow step is detected
+        :param screenshot_interval: minimum delay (in seconds) between two screenshots
+        :param max_screenshots: maximum number of screenshots saved by the detector
+        """
+        self.thresholds = dict(self.default_thresholds)
+        if thresholds:
+            self.thresholds.update(thresholds)
+        self.screenshot = screenshot
+        self.screenshot_interval = screenshot_interval
+        self.max_screenshots = max_screenshots
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._screenshot_count = 0
+        self._last_screenshot_time = None
+
+    def _acquire_screenshot_slot(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._screenshot_count >= self.max_screenshots:
+                return False
+            if self._last_screenshot_time is not None and now - self._last_screenshot_time < self.screenshot_interval:
+                return False
+            self._screenshot_count += 1
+            self._last_screenshot_time = now
+            return True
+
+    def on_step_end(self, step: Step):
+        if step.selection is None or getattr(self._local, "busy", False):
+            return
+
+        threshold = self.thresholds.get(step.kind)
+        duration = step.duration
+        if threshold is None or duration <= threshold:
+            return
+
+        self._local.busy = True
+        try:
+            message = f"Slow step: {step.label} took {duration:.3f}s (threshold: {threshold}s)"
+            lcc.log_warning(message)
+            if self.screenshot and self._acquire_screenshot_slot():
+                try:
+                    save_screenshot(step.selection.driver, message)
+                except WebDriverException as exc:
+                    # evidence capture is best effort, it must not make the test fail
+                    lcc.log_warning(f"Could not save screenshot: {exc}")
+        finally:
+            self._local.busy = False
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from typing import Sequence, Optional, Iterable, TYPE_CHECKING
+
+from lemoncheesecake.matching.matcher import Matcher
+from lemoncheesecake.matching.matchers.composites import AllOf, AnyOf, Not
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
+
+
+TEXT = "text"
+TAG_NAME = "tag_name"
+DISPLAYED = "displayed"
+ENABLED = "enabled"
+SELECTED = "selected"
+ATTRIBUTE_PREFIX = "attribute:"
+PROPERTY_PREFIX = "property:"
+CSS_PREFIX = "css:"
+RECT = "rect"
+IN_VIEWPORT = "in_viewport"
+FULLY_IN_VIEWPORT = "fully_in_viewport"
+NOT_OBSCURED = "not_obscured"
+
+# the fields that cannot be read from a WebElement with a single WebDriver command
+_LAYOUT_FIELDS = frozenset((RECT, IN_VIEWPORT, FULLY_IN_VIEWPORT, NOT_OBSCURED))
+
+# a JS function expression taking a list of elements and a list of fields
+SNAPSHOT_JS_FUNCTION = """
+function (elements, fields) {
+    function isDisplayed(el) {
+        if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) {
+            return el.tagName.toLowerCase() === "option" && !!el.closest("select") && isDisplayed(el.closest("select"));
+        }
+        var style = window.getComputedStyle(el);
+        return style.visibility !== "hidden" && style.visibility !== "collapse" && style.opacity !== "0";
+    }
+
+    function getAttribute(el, name) {
+        var value = el.getAttribute(name);
+        var prop = el[name];
+        if (name in el && prop !== null && prop !== undefined && typeof prop !== "object" && typeof prop !== "function") {
+            value = prop;
+        }
+        if (typeof value === "boolean") {
+            return value ? "true" : null;
+        }
+        return value === null || value === undefined ? null : String(value);
+    }
+
+    function getProperty(el, name) {
+        var value = el[name];
+        return typeof value === "object" || typeof value === "function" ? null : value;
+    }
+
+    function isInViewport(el, fully) {
+        var rect = el.getBoundingClientRect();
+        var width = window.innerWidth || document.documentElement.clientWidth;
+        var height = window.innerHeight || document.documentElement.clientHeight;
+        if (!(rect.width > 0 && rect.height > 0)) {
+            return false;
+        }
+        if (fully) {
+            return rect.left >= 0 && rect.top >= 0 && rect.right <= width && rect.bottom <= height;
+        }
+        return rect.right > 0 && rect.bottom > 0 && rect.left < width && rect.top < height;
+    }
+
+    function isNotObscured(el) {
+        // the topmost element at the center of the element must be the element itself or one of its descendants
+        var rect = el.getBoundingClientRect();
+        var x = rect.left + rect.width / 2, y = rect.top + rect.height / 2;
+        var hit = document.elementFromPoint(x, y);
+        while (hit && hit.shadowRoot) {
+            var inner = hit.shadowRoot.elementFromPoint(x, y);
+            if (!inner || inner === hit) {
+                break;
+            }
+            hit = inner;
+        }
+        for (var node = hit; node; node = node.parentNode || node.host) {
+            if (node === el) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    return elements.map(function (el) {
+        var data = {};
+        fields.forEach(function (field) {
+            var sep = field.indexOf(":");
+            var kind = sep < 0 ? field : field.slice(0, sep), name = field.slice(sep + 1);
+            if (kind === "text") {
+                data[field] = isDisplayed(el) ? (el.innerText || "").replace(/[ \\t]+\\n/g, "\\n").trim() : "";
+            } else if (kind === "tag_name") {
+                data[field] = el.tagName.toLowerCase();
+            } else if (kind === "displayed") {
+                data[field] = isDisplayed(el);
+            } else if (kind === "enabled") {
+                data[field] = !el.disabled;
+            } else if (kind === "selected") {
+                data[field] = !!(el.selected || el.checked);
+            } else if (kind === "attribute") {
+                data[field] = getAttribute(el, name);
+            } else if (kind === "property") {
+                data[field] = getProperty(el, name);
+            } else if (kind === "css") {
+                data[field] = window.getComputedStyle(el).getPropertyValue(name);
+            } else if (kind === "rect") {
+                var rect = el.getBoundingClientRect();
+                data[field] = {
+                    x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height
+                };
+            } else if (kind === "in_viewport" || kind === "fully_in_viewport") {
+                data[field] = isInViewport(el, kind === "fully_in_viewport");
+            } else if (kind === "not_obscured") {
+                data[field] = isNotObscured(el);
+            }
+        });
+        return data;
+    });
+}
+"""
+
+_SNAPSHOT_SCRIPT = "return (%s)(arguments[0], arguments[1]);" % SNAPSHOT_JS_FUNCTION
+
+
+class ElementSnapshot:
+    """
+    A read-only copy of some of the state of an element, it exposes the same reading methods
+    as ``WebElement`` (``text``, ``get_attribute``, ``is_displayed``, etc...).
+    Reading a state that has not been fetched falls back on the underlying ``WebElement``.
+
+    The values are computed in the browser with an approximation of the WebDriver algorithms
+    (for instance, ``text`` relies on ``innerText``).
+    """
+
+    def __init__(self, data: dict, element: WebElement = None):
+        self.data = data
+        #: the underlying ``WebElement``
+        self.element = element
+
+    def _get(self, field, fallback):
+        try:
+            return self.data[field]
+        except KeyError:
+            if self.element is None:
+                raise
+            return fallback(self.element)
+
+    @property
+    def text(self):
+        return self._get(TEXT, lambda element: element.text)
+
+    @property
+    def tag_name(self):
+        return self._get(TAG_NAME, lambda element: element.tag_name)
+
+    def is_displayed(self):
+        return self._get(DISPLAYED, lambda element: element.is_displayed())
+
+    def is_enabled(self):
+        return self._get(ENABLED, lambda element: element.is_enabled())
+
+    def is_selected(self):
+        return self._get(SELECTED, lambda element: element.is_selected())
+
+    def get_attribute(self, name):
+        return self._get(ATTRIBUTE_PREFIX + name, lambda element: element.get_attribute(name))
+
+    def get_property(self, name):
+        return self._get(PROPERTY_PREFIX + name, lambda element: element.get_property(name))
+
+    def value_of_css_property(self, name):
+        return self._get(CSS_PREFIX + name, lambda element: element.value_of_css_property(name))
+
+    @property
+    def rect(self):
+        return self._get(RECT, lambda element: element.rect)
+
+    @property
+    def size(self):
+        rect = self.rect
+        return {"width": rect["width"], "height": rect["height"]}
+
+    def is_in_viewport(self, fully: bool = False):
+        """
+        Whether the element is (entirely if ``fully`` is set) in the viewport, this state has no
+        ``WebElement`` equivalent.
+        """
+        field = FULLY_IN_VIEWPORT if fully else IN_VIEWPORT
+        return self._get(field, self._fetch(field))
+
+    def is_not_obscured(self):
+        """
+        Whether the center of the element is in the viewport and not covered by another element,
+        this state has no ``WebElement`` equivalent.
+        """
+        return self._get(NOT_OBSCURED, self._fetch(NOT_OBSCURED))
+
+    @staticmethod
+    def _fetch(field):
+        return lambda element: fetch_snapshots(element.parent, [element], [field])[0].data[field]
+
+    def __repr__(self):
+        return f"<ElementSnapshot {self.data!r}>"
+
+
+def fetch_snapshots(driver, elements: Sequence[WebElement], fields: Iterable[str]) -> Sequence[ElementSnapshot]:
+    """
+    Fetch the state of several elements in a single WebDriver command.
+
+    :param driver: ``WebDriver`` instance
+    :param elements: the ``WebElement`` list
+    :param fields: the states to be fetched (``"text"``, ``"displayed"``, ``"attribute:href"``, etc...)
+    :return: a list of :py:class:`ElementSnapshot`
+    """
+    if not elements:
+        return []
+    data = driver.execute_script(_SNAPSHOT_SCRIPT, list(elements), sorted(fields))
+    return [ElementSnapshot(item, element) for item, element in zip(data, elements)]
+
+
+def has_layout_fields(fields: Iterable[str]) -> bool:
+    """
+    :param fields: snapshot fields
+    :return: whether some of the fields are computed styles or geometry states
+        (such states are better fetched at once for an element)
+    """
+    return any(field in _LAYOUT_FIELDS or field.startswith(CSS_PREFIX) for field in fields)
+
+
+def get_required_fields(matcher: Matcher) -> Optional[set]:
+    """
+    Get the element states a matcher needs to be evaluated against an :py:class:`ElementSnapshot`.
+
+    :param matcher: ``Matcher`` instance
+    :return: the fields or ``None`` if the matcher does not support snapshots
+    """
+    if isinstance(matcher, (AllOf, AnyOf)):
+        fields = set()
+        for sub_matcher in matcher.matchers:
+            sub_fields = get_required_fields(sub_matcher)
+            if sub_fields is None:
+                return None
+            fields |= sub_fields
+        return fields
+    if isinstance(matcher, Not):
+        return get_required_fields(matcher.matcher)
+    fields = getattr(matcher, "snapshot_fields", None)
+    return set(fields) if isinstance(fields, (set, frozenset)) else None
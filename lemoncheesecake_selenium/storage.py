@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import threading
+from typing import Callable, Optional, Sequence, TYPE_CHECKING
+from urllib.parse import urlsplit
+
+import lemoncheesecake.api as lcc
+
+from lemoncheesecake_selenium.instrumentation import step
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+
+_CAPTURE_SCRIPT = """
+var dump = function (storage) {
+    var data = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        data[key] = storage.getItem(key);
+    }
+    return data;
+};
+return {origin: window.location.origin, local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+_RESTORE_SCRIPT = """
+var fill = function (storage, data) {
+    Object.keys(data).forEach(function (key) { storage.setItem(key, data[key]); });
+};
+fill(window.localStorage, arguments[0]);
+fill(window.sessionStorage, arguments[1]);
+"""
+
+_CLEAR_SCRIPT = """
+window.localStorage.clear();
+window.sessionStorage.clear();
+"""
+
+# the cookie attributes accepted by WebDriver's "Add Cookie" command
+_COOKIE_KEYS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+
+def _domain_matches(host, domain):
+    domain = domain.lstrip(".")
+    return host == domain or host.endswith("." + domain)
+
+
+class StorageState:
+    """
+    The cookies, local storage and session storage of an origin, captured from a logged in browser session
+    so that they can be restored into another session (see :py:class:`StoredLogin`).
+    """
+
+    def __init__(self, origin: str, cookies: Sequence[dict] = (), local_storage: dict = None,
+                 session_storage: dict = None, created: float = None):
+        """
+        :param origin: the origin (such as ``"https://example.com"``) the state belongs to
+        :param cookies: the cookies as returned by ``WebDriver.get_cookies``
+        :param local_storage: the local storage items
+        :param session_storage: the session storage items
+        :param created: the capture time (as a timestamp), now if not given
+        """
+        self.origin = origin
+        self.cookies = list(cookies)
+        self.local_storage = dict(local_storage or {})
+        self.session_storage = dict(session_storage or {})
+        self.created = created if created is not None else time.time()
+
+    @classmethod
+    def capture(cls, driver: WebDriver) -> StorageState:
+        """
+        Capture the state of the origin of the page currently loaded by ``driver``.
+
+        :param driver: ``WebDriver`` instance
+        :return: :py:class:`StorageState`
+        """
+        data = driver.execute_script(_CAPTURE_SCRIPT)
+        return cls(data["origin"], driver.get_cookies(), data["local"], data["session"])
+
+    def restore(self, driver: WebDriver):
+        """
+        Restore the state into ``driver``. Cookies and storage can only be set from a page of their origin,
+        the origin is then loaded first if ``driver`` is on another origin. The cookies of other domains
+        (such as the cookies of an identity provider) are not restored.
+
+        :param driver: ``WebDriver`` instance
+        """
+        if not driver.current_url.startswith(self.origin + "/") and driver.current_url != self.origin:
+            driver.get(self.origin + "/")
+        host = urlsplit(self.origin).hostname
+        for cookie in self.cookies:
+            if "domain" in cookie and not _domain_matches(host, cookie["domain"]):
+                continue
+            driver.add_cookie({key: cookie[key] for key in _COOKIE_KEYS if key in cookie})
+        driver.execute_script(_RESTORE_SCRIPT, self.local_storage, self.session_storage)
+
+    def is_expired(self, max_age: float = None, margin: float = 60) -> bool:
+        """
+        :param max_age: the age (in seconds) beyond which the state is considered as expired
+        :param margin: a cookie expiring in less than ``margin`` seconds is considered as expired
+        :return: whether or not the state has expired (``max_age`` has been reached or a cookie has expired)
+        """
+        now = time.time()
+        if max_age is not None and now - self.created >= max_age:
+            return True
+        return any("expiry" in cookie and cookie["expiry"] <= now + margin for cookie in self.cookies)
+
+    def save(self, path: str):
+        """
+        Write the state into a JSON file (atomically).
+
+        :param path: the file path
+        """
+        data = {
+            "origin": self.origin, "created": self.created, "cookies": self.cookies,
+            "localStorage": self.local_storage, "sessionStorage": self.session_storage,
+        }
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional[StorageState]:
+        """
+        Load a state written by :py:meth:`StorageState.save`.
+
+        :param path: the file path
+        :return: :py:class:`StorageState`, ``None`` if the file does not exist or is not valid
+        """
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+            return cls(
+                data["origin"], data["cookies"], data["localStorage"], data["sessionStorage"], data["created"]
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+class StoredLogin:
+    """
+    Skip the login flow of the tests: the first test performs the actual login and the resulting
+    :py:class:`StorageState` is written into a file, the next tests (including those of later runs
+    or of other workers sharing the file) restore it into their session instead of logging in.
+    When the stored state has expired (or ``is_logged_in`` tells that the restored session is not logged in),
+    the actual login is performed again and the stored state is refreshed.
+
+    Usage example in a lemoncheesecake fixtures file::
+
+        def login(driver):
+            driver.get("https://example.com/login")
+            selector = Selector(driver)
+            selector.by_id("user").set_text("john")
+            selector.by_id("password").set_text("secret")
+            selector.by_id("submit").click()
+
+        stored_login = StoredLogin(".lcc-login.json", login, max_age=3600)
+
+        @lcc.fixture(scope="test")
+        def logged_driver(driver):
+            stored_login.apply(driver, "https://example.com/dashboard")
+            yield driver
+    """
+
+    def __init__(self, path: str, login: Callable[[WebDriver], None], *, max_age: float = None,
+                 is_logged_in: Callable[[WebDriver], bool] = None):
+        """
+        :param path: the file the storage state is kept in (use a path per worker to get a login per worker)
+        :param login: a callable performing the actual login with the ``WebDriver`` passed as argument
+        :param max_age: the age (in seconds) beyond which the stored state is considered as expired
+        :param is_logged_in: an optional callable telling whether the session is logged in once the state
+            has been restored and the page loaded (it detects the states invalidated on the server side)
+        """
+        self.path = path
+        self.login = login
+        self.max_age = max_age
+        self.is_logged_in = is_logged_in
+        self._lock = threading.Lock()
+        self._state = None
+
+    def _get_state(self):
+        if self._state is None:
+            self._state = StorageState.load(self.path)
+        if self._state is not None and self._state.is_expired(self.max_age):
+            self._state = None
+        return self._state
+
+    def _login(self, driver, url):
+        with step("login"):
+            self.login(driver)
+        self._state = StorageState.capture(driver)
+        self._state.save(self.path)
+        lcc.log_info(f"Logged in, storage state saved into '{self.path}'")
+        driver.get(url)
+
+    def apply(self, driver: WebDriver, url: str) -> bool:
+        """
+        Make ``driver`` logged in and load ``url``.
+
+        :param driver: ``WebDriver`` instance (a fresh or reset session)
+        :param url: the URL to be loaded once logged in
+        :return: ``True`` if the stored state has been restored, ``False`` if the actual login has been performed
+        """
+        # concurrent tests wait for the login in progress instead of logging in too
+        with self._lock:
+            state = self._get_state()
+            if state is None:
+                self._login(driver, url)
+                return False
+
+        with step("restore_storage"):
+            state.restore(driver)
+            driver.get(url)
+        if self.is_logged_in is not None and not self.is_logged_in(driver):
+            lcc.log_info("The restored storage state is no longer valid, log in again")
+            driver.delete_all_cookies()
+            driver.execute_script(_CLEAR_SCRIPT)
+            with self._lock:
+                self._login(driver, url)
+            return False
+
+        lcc.log_info(f"Storage state restored from '{self.path}'")
+        return True
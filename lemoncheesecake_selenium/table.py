@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+from typing import Sequence, List, Dict, Union, Optional, Any, TYPE_CHECKING
+
+from lemoncheesecake.matching import is_
+from lemoncheesecake.matching.matcher import Matcher, MatchResult, MatcherDescriptionTransformer
+from lemoncheesecake.matching.matchers.value import EqualTo
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
+
+
+_TABLE_SCRIPT = """
+var root = arguments[0], rows, getCells, getSpan;
+if (root.tagName.toLowerCase() === "table") {
+    rows = Array.prototype.slice.call(root.rows);
+    getCells = function (row) { return Array.prototype.slice.call(row.cells); };
+    getSpan = function (cell, name) { return cell[name]; };
+} else {
+    // ARIA table / grid
+    rows = Array.prototype.slice.call(root.querySelectorAll('[role="row"]'));
+    getCells = function (row) {
+        return Array.prototype.slice.call(
+            row.querySelectorAll('[role="cell"], [role="gridcell"], [role="columnheader"], [role="rowheader"]')
+        );
+    };
+    getSpan = function (cell, name) { return parseInt(cell.getAttribute("aria-" + name.toLowerCase()), 10); };
+}
+
+var grid = rows.map(function () { return []; });
+rows.forEach(function (row, rowIdx) {
+    var colIdx = 0;
+    getCells(row).forEach(function (cell) {
+        while (grid[rowIdx][colIdx] !== undefined) {
+            colIdx++;
+        }
+        var text = (cell.innerText || cell.textContent || "").replace(/\\s+/g, " ").trim();
+        var colSpan = Math.max(getSpan(cell, "colSpan") || 1, 1);
+        var rowSpan = Math.min(Math.max(getSpan(cell, "rowSpan") || 1, 1), rows.length - rowIdx);
+        for (var i = 0; i < rowSpan; i++) {
+            for (var j = 0; j < colSpan; j++) {
+                grid[rowIdx + i][colIdx + j] = text;
+            }
+        }
+        colIdx += colSpan;
+    });
+});
+return grid.map(function (row) {
+    var texts = [];
+    for (var i = 0; i < row.length; i++) {
+        texts.push(row[i] === undefined ? "" : row[i]);
+    }
+    return texts;
+});
+"""
+
+Row = Dict[Any, str]
+
+
+def fetch_table(driver, element: WebElement) -> List[List[str]]:
+    """
+    Extract the cells text of a table (a ``<table>`` element, or an element with the ARIA ``table``/``grid`` role)
+    in a single WebDriver command. The cells spanning several columns and/or rows are repeated
+    in each of the columns/rows they span.
+
+    :param driver: ``WebDriver`` instance
+    :param element: the table ``WebElement``
+    :return: the rows as lists of cell texts
+    """
+    return driver.execute_script(_TABLE_SCRIPT, element)
+
+
+def make_rows(grid: Sequence[Sequence[str]], header_row: bool = True, columns: Sequence[Optional[str]] = None) \
+        -> List[Row]:
+    """
+    Convert the cells of a table into a list of dicts.
+
+    :param grid: the rows as lists of cell texts
+    :param header_row: whether or not the first row contains the column names
+    :param columns: the column names, they take precedence over the header row; a ``None`` column name means that
+        the column is skipped. If neither ``header_row`` nor ``columns`` are set, the column indexes are used as keys.
+    :return: a list of dicts
+    """
+    if header_row:
+        header, grid = (grid[0] if grid else []), grid[1:]
+    else:
+        header = None
+    if columns is None:
+        columns = header if header is not None else range(max(map(len, grid), default=0))
+
+    return [
+        {name: cell for name, cell in zip(columns, row) if name is not None}
+        for row in grid
+    ]
+
+
+class RowMatcher(Matcher):
+    """
+    Base class of the matchers that look for rows in a table (as returned by :py:meth:`Selection.as_table`).
+    """
+
+    def __init__(self, rows: Sequence[Dict[Any, Union[str, Matcher]]]):
+        self.rows = [{name: is_(value) for name, value in row.items()} for row in rows]
+
+    @staticmethod
+    def _describe_row(row):
+        return ", ".join(
+            f"{name!r} that {matcher.build_description(MatcherDescriptionTransformer(conjugate=True))}"
+            for name, matcher in row.items()
+        )
+
+    @staticmethod
+    def _get_mismatches(expected, actual: Row):
+        return [
+            name for name, matcher in expected.items()
+            if name not in actual or not matcher.matches(actual[name])
+        ]
+
+    def _find_row(self, expected, table: Sequence[Row]):
+        # return the index of the matching row or a description of the closest row
+        closest = None
+        for idx, row in enumerate(table):
+            mismatches = self._get_mismatches(expected, row)
+            if not mismatches:
+                return idx, None
+            if closest is None or len(mismatches) < len(closest[1]):
+                closest = idx, mismatches
+        if closest is None:
+            return None, "the table is empty"
+        idx, mismatches = closest
+        cells = ", ".join(
+            f"{name!r}: {table[idx][name]!r}" if name in table[idx] else f"no {name!r} column"
+            for name in mismatches
+        )
+        return None, f"closest row is #{idx} which differs on {cells}"
+
+
+class HasRow(RowMatcher):
+    def build_description(self, transformation):
+        return transformation(f"to have a row with {self._describe_row(self.rows[0])}")
+
+    def matches(self, actual: Sequence[Row]):
+        idx, diff = self._find_row(self.rows[0], actual)
+        if idx is None:
+            return MatchResult.failure(diff)
+        return MatchResult.success(f"found at row #{idx}")
+
+
+def has_row(expected: Dict[Any, Union[str, Matcher]] = None, **cells: Union[str, Matcher]):
+    """
+    Test if a table (as returned by :py:meth:`Selection.as_table`) has a row matching the given cells.
+
+    :param expected: the expected cells as a dict (column name => value or ``Matcher``)
+    :param cells: the expected cells as keyword arguments
+    :return: ``Matcher`` instance
+    """
+    return HasRow([dict(expected or {}, **cells)])
+
+
+class ContainsRows(RowMatcher):
+    def build_description(self, transformation):
+        return transformation(
+            "to contain rows: %s" % "; ".join(f"[{self._describe_row(row)}]" for row in self.rows)
+        )
+
+    def matches(self, actual: Sequence[Row]):
+        candidates = [
+            [idx for idx, row in enumerate(actual) if not self._get_mismatches(expected, row)]
+            for expected in self.rows
+        ]
+        assignment = _assign_rows(candidates)
+        diffs = []
+        for expected_idx, row in enumerate(self.rows):
+            if expected_idx in assignment:
+                continue
+            if candidates[expected_idx]:
+                diff = "all the matching rows (%s) are matched by other expected rows" % ", ".join(
+                    f"#{idx}" for idx in candidates[expected_idx]
+                )
+            else:
+                _, diff = self._find_row(row, actual)
+            diffs.append(f"- missing row {self._format_expected(row)}: {diff}")
+        if diffs:
+            return MatchResult.failure(f"{len(diffs)} of {len(self.rows)} rows are missing\n" + "\n".join(diffs))
+        return MatchResult.success()
+
+    @staticmethod
+    def _format_expected(row):
+        return "{%s}" % ", ".join(
+            f"{name!r}: {matcher.expected!r}" if isinstance(matcher, EqualTo) else
+            f"{name!r}: {matcher.build_description(MatcherDescriptionTransformer())}"
+            for name, matcher in row.items()
+        )
+
+
+def _assign_rows(candidates: Sequence[Sequence[int]]) -> Dict[int, int]:
+    # assign a distinct actual row to as many expected rows as possible (maximum bipartite matching
+    # through augmenting paths), candidates being the indexes of the actual rows matching each expected row;
+    # return expected row index => actual row index
+    owners = {}
+
+    def assign(expected_idx, visited):
+        for idx in candidates[expected_idx]:
+            if idx not in visited:
+                visited.add(idx)
+                if idx not in owners or assign(owners[idx], visited):
+                    owners[idx] = expected_idx
+                    return True
+        return False
+
+    for expected_idx in range(len(candidates)):
+        assign(expected_idx, set())
+    return {expected_idx: idx for idx, expected_idx in owners.items()}
+
+
+def contains_rows(*rows: Dict[Any, Union[str, Matcher]]):
+    """
+    Test if a table (as returned by :py:meth:`Selection.as_table`) contains all the given rows
+    (in any order), each expected row matching a distinct row of the table.
+    Each expected row only has to specify the cells to be checked.
+
+    :param rows: the expected rows as dicts (column name => value or ``Matcher``)
+    :return: ``Matcher`` instance
+    """
+    return ContainsRows(rows)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import os
+import json
+import math
+import threading
+from typing import Optional, Sequence, Tuple
+
+from selenium.common.exceptions import TimeoutException
+import lemoncheesecake.api as lcc
+
+from lemoncheesecake_selenium.instrumentation import Listener, Step
+from lemoncheesecake_selenium.selection import Selection
+
+
+def _get_wait_key(selection: Selection) -> str:
+    # a locator waited until different conditions (such as until present and until not visible) does not take
+    # the same time, the durations are kept per locator and condition
+    condition = selection._expected_condition
+    if condition is None:
+        return str(selection)
+    name = getattr(condition, "__name__", type(condition).__name__)
+    return f"{selection} until{' not' if selection._expected_condition_reverse else ''} {name}"
+
+
+class TimeoutLearner(Listener):
+    """
+    Learn the timeout of each locator's explicit wait from the wait durations observed across runs.
+
+    The observed durations are stored per locator and expected condition (such as
+    ``"element identified by id 'spinner' until not visibility_of_element_located"``) in a JSON history file
+    (a timed out wait being recorded as lasting its timeout), the learned timeout of a locator is
+    the ``percentile`` of its durations multiplied by ``margin`` and clamped between ``min_timeout``
+    and ``max_timeout``. Learned timeouts apply to the waits set up without any explicit ``timeout``
+    (see :py:attr:`Selection.timeout_provider`); as long as a locator has less than ``min_samples`` observed
+    durations, :py:attr:`Selection.default_timeout` is used.
+
+    Usage example::
+
+        learner = TimeoutLearner(".lcc-timeouts.json")
+        learner.enable()
+        ...
+        learner.save()
+        learner.save_report()
+    """
+
+    def __init__(self, path: str, *, percentile: float = 99, margin: float = 1.5,
+                 min_timeout: float = 1, max_timeout: float = 30, min_samples: int = 10, max_samples: int = 500,
+                 near_limit_ratio: float = 0.8):
+        """
+        :param path: the history file path (it is loaded if it exists)
+        :param percentile: the percentile of the observed durations the timeout is based on
+        :param margin: the factor applied to the percentile
+        :param min_timeout: the minimum learned timeout (in seconds)
+        :param max_timeout: the maximum learned timeout (in seconds)
+        :param min_samples: the number of observed durations needed for a locator's timeout to be learned
+        :param max_samples: the number of (most recent) durations kept per locator
+        :param near_limit_ratio: the ratio of its timeout above which a wait is reported as near the limit
+        """
+        self.path = path
+        self.percentile = percentile
+        self.margin = margin
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.near_limit_ratio = near_limit_ratio
+        self._lock = threading.Lock()
+        self._samples = self._load()
+        self._timeouts = {}
+        self._near_limit = {}
+        self._previous_timeout_provider = None
+
+    def _load(self):
+        try:
+            with open(self.path) as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return {}
+        return {locator: list(durations) for locator, durations in data.get("locators", {}).items()}
+
+    def save(self):
+        """
+        Write the observed durations into the history file.
+        """
+        with self._lock:
+            data = {"locators": {locator: list(durations) for locator, durations in self._samples.items()}}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(data, fh, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def enable(self):
+        """
+        Start recording wait durations and install the learned timeouts as :py:attr:`Selection.timeout_provider`.
+        """
+        super().enable()
+        self._previous_timeout_provider = Selection.timeout_provider
+        Selection.timeout_provider = self.get_timeout
+
+    def disable(self):
+        """
+        Stop recording wait durations and restore the previous :py:attr:`Selection.timeout_provider`.
+        """
+        super().disable()
+        Selection.timeout_provider = self._previous_timeout_provider
+
+    def _compute_timeout(self, durations):
+        if len(durations) < self.min_samples:
+            return None
+        durations = sorted(durations)
+        rank = max(math.ceil(self.percentile / 100 * len(durations)), 1)
+        return min(max(durations[rank - 1] * self.margin, self.min_timeout), self.max_timeout)
+
+    def get_timeout(self, selection: Selection) -> Optional[float]:
+        """
+        :param selection: a :py:class:`Selection`
+        :return: the learned timeout (in seconds) of the selection's locator and expected condition,
+            ``None`` if it has not been learned yet
+        """
+        locator = _get_wait_key(selection)
+        with self._lock:
+            try:
+                return self._timeouts[locator]
+            except KeyError:
+                timeout = self._timeouts[locator] = self._compute_timeout(self._samples.get(locator, ()))
+                return timeout
+
+    def on_step_end(self, step: Step):
+        if step.kind != "wait" or step.selection is None or "timeout" not in step.details:
+            return
+
+        locator = _get_wait_key(step.selection)
+        duration = step.duration
+        timeout = step.details["timeout"]
+        with self._lock:
+            # a timed out wait tells that the element needs at least the timeout, recording it as such
+            # lets a learned timeout that has become too short grow back
+            if step.error is None or isinstance(step.error, TimeoutException):
+                durations = self._samples.setdefault(locator, [])
+                durations.append(round(duration if step.error is None else max(duration, timeout or 0), 3))
+                del durations[:-self.max_samples]
+                self._timeouts.pop(locator, None)
+            ratio = duration / timeout if timeout else 1.0
+            if step.error is not None or ratio >= self.near_limit_ratio:
+                previous = self._near_limit.get(locator)
+                if previous is None or duration > previous[0]:
+                    self._near_limit[locator] = (duration, timeout, step.error is not None)
+
+    def get_near_limit_locators(self) -> Sequence[Tuple[str, float, float, bool]]:
+        """
+        :return: the locators whose waits have been close to (or over) their timeout during this run,
+            as a list of ``(locator, max duration, timeout, timed out)`` tuples ordered by decreasing
+            duration / timeout ratio
+        """
+        with self._lock:
+            entries = [(locator,) + entry for locator, entry in self._near_limit.items()]
+        return sorted(entries, key=lambda entry: entry[1] / entry[2] if entry[2] else 1.0, reverse=True)
+
+    def format_report(self) -> str:
+        """
+        :return: a textual report of the locators near their timeout
+        """
+        lines = ["Locators near their timeout:", ""]
+        lines.append("%10s  %12s  %9s  %s" % ("max (s)", "timeout (s)", "ratio", "locator"))
+        for locator, duration, timeout, timed_out in self.get_near_limit_locators():
+            ratio = "timed out" if timed_out else "%8.0f%%" % (duration / timeout * 100 if timeout else 100)
+            lines.append("%10.3f  %12.3f  %9s  %s" % (duration, timeout, ratio, locator))
+        return "\n".join(lines) + "\n"
+
+    def save_report(self):
+        """
+        Save the report returned by :py:meth:`TimeoutLearner.format_report` as a lemoncheesecake report attachment.
+        """
+        lcc.save_attachment_content(self.format_report(), "timeouts.txt", "Learned timeouts report")
@@ -0,0 +1,252 @@
+import os
+import json
+import time
+import random
+import threading
+from contextlib import contextmanager
+from typing import Sequence, List
+
+import lemoncheesecake.api as lcc
+
+from lemoncheesecake_selenium.__version__ import __version__
+from lemoncheesecake_selenium.instrumentation import Listener, Step
+
+
+# OTLP span status codes
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+# OTLP span kind
+_SPAN_KIND_INTERNAL = 1
+
+
+class Span:
+    """
+    A finished span as recorded by :py:class:`Tracer`.
+    """
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "end", "thread_id", "attributes",
+                 "error")
+
+    def __init__(self, trace_id: int, span_id: int, parent_id, name: str, kind: str, thread_id: int):
+        #: the trace id (128 bits)
+        self.trace_id = trace_id
+        #: the span id (64 bits)
+        self.span_id = span_id
+        #: the parent span id (``None`` for a root span)
+        self.parent_id = parent_id
+        #: the span name (the label of the step)
+        self.name = name
+        #: the step kind (``"click"``, ``"wait"``, ``"command"``, etc...) or ``"test"``
+        self.kind = kind
+        #: start time (in nanoseconds since the epoch)
+        self.start = None
+        #: end time (in nanoseconds since the epoch)
+        self.end = None
+        #: the thread in which the span has been recorded
+        self.thread_id = thread_id
+        #: the span attributes (locator, command, timeout, etc...)
+        self.attributes = {}
+        #: the error message (``None`` if the span succeeded)
+        self.error = None
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": value if isinstance(value, str) else repr(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class Tracer(Listener):
+    """
+    Record the steps performed by lemoncheesecake-selenium (actions, waits, checks, screenshots and, with
+    :py:func:`instrument_driver`, WebDriver commands) as nested spans, to be exported as a Chrome trace-event file
+    (to be opened in ``chrome://tracing`` or Perfetto) and/or as an OTLP JSON file (as read by OpenTelemetry
+    collectors).
+
+    Usage example::
+
+        tracer = Tracer(sample_rate=0.1)
+        tracer.enable()
+
+        with tracer.trace_test("test_login"):
+            ...
+
+        tracer.save_report()
+
+    The sampling decision is taken for each trace (a test traced with :py:meth:`Tracer.trace_test`
+    or a top-level step), either all its spans are recorded or none.
+    """
+
+    def __init__(self, *, sample_rate: float = 1.0, max_spans: int = 1000000,
+                 service_name: str = "lemoncheesecake-selenium"):
+        """
+        :param sample_rate: the ratio (between 0 and 1) of traces to be recorded
+        :param max_spans: the maximum number of recorded spans, the spans beyond are dropped
+        :param service_name: the ``service.name`` resource attribute of the OTLP export
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.max_spans = max_spans
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._spans: List[Span] = []
+        #: the number of spans dropped because of ``max_spans``
+        self.dropped_spans = 0
+        # Step times come from time.perf_counter(), spans use the epoch
+        self._epoch_offset = time.time() - time.perf_counter()
+
+    @property
+    def _stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def _to_ns(self, perf_counter):
+        return int((perf_counter + self._epoch_offset) * 1000000000)
+
+    def _open_span(self, name, kind):
+        stack = self._stack
+        parent = stack[-1] if stack else None
+        if parent is None:
+            if stack:
+                # the enclosing trace is not sampled
+                stack.append(None)
+                return None
+            if self.sample_rate < 1 and random.random() >= self.sample_rate:
+                stack.append(None)
+                return None
+            trace_id, parent_id = random.getrandbits(128) | 1, None
+        else:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        span = Span(trace_id, random.getrandbits(64) | 1, parent_id, name, kind, threading.get_ident())
+        stack.append(span)
+        return span
+
+    def _close_span(self, span):
+        with self._lock:
+            if len(self._spans) < self.max_spans:
+                self._spans.append(span)
+            else:
+                self.dropped_spans += 1
+
+    @contextmanager
+    def trace_test(self, name: str):
+        """
+        Context manager, record the steps performed within the block as children of a ``test`` span.
+
+        :param name: test name (such as the test path)
+        """
+        span = self._open_span(name, "test")
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as exc:
+            if span is not None:
+                span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            self._stack.pop()
+            if span is not None:
+                span.start, span.end = self._to_ns(start), self._to_ns(time.perf_counter())
+                span.attributes["test"] = name
+                self._close_span(span)
+
+    def on_step_start(self, step: Step):
+        self._open_span(step.label, step.kind)
+
+    def on_step_end(self, step: Step):
+        span = self._stack.pop()
+        if span is None:
+            return
+        span.start, span.end = self._to_ns(step.start), self._to_ns(step.end)
+        if step.selection is not None:
+            span.attributes["locator"] = str(step.selection)
+        span.attributes.update(step.details)
+        if step.error is not None:
+            span.error = f"{type(step.error).__name__}: {step.error}"
+        self._close_span(span)
+
+    @property
+    def spans(self) -> Sequence[Span]:
+        """
+        The recorded spans (in the order they have ended).
+        """
+        with self._lock:
+            return list(self._spans)
+
+    def write_chrome_trace(self, path: str):
+        """
+        Write the spans in the Chrome trace-event JSON format (as complete ``"X"`` events).
+
+        :param path: destination file path
+        """
+        pid = os.getpid()
+        events = []
+        for span in self.spans:
+            args = dict(span.attributes, outcome="error" if span.error else "ok")
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name, "cat": span.kind, "ph": "X", "pid": pid, "tid": span.thread_id,
+                "ts": span.start / 1000, "dur": (span.end - span.start) / 1000,
+                "args": {key: value if isinstance(value, (str, int, float, bool)) else repr(value)
+                         for key, value in args.items()},
+            })
+        with open(path, "w") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+
+    def write_otlp_json(self, path: str):
+        """
+        Write the spans in the OTLP JSON format (an ``ExportTraceServiceRequest``).
+
+        :param path: destination file path
+        """
+        spans = []
+        for span in self.spans:
+            data = {
+                "traceId": "%032x" % span.trace_id,
+                "spanId": "%016x" % span.span_id,
+                "name": span.name,
+                "kind": _SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": str(span.start),
+                "endTimeUnixNano": str(span.end),
+                "attributes": _otlp_attributes(dict(span.attributes, **{"lcc.kind": span.kind})),
+                "status": {"code": _STATUS_ERROR, "message": span.error} if span.error else {"code": _STATUS_OK},
+            }
+            if span.parent_id is not None:
+                data["parentSpanId"] = "%016x" % span.parent_id
+            spans.append(data)
+
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "lemoncheesecake-selenium", "version": __version__},
+                    "spans": spans,
+                }],
+            }],
+        }
+        with open(path, "w") as fh:
+            json.dump(request, fh)
+
+    def save_report(self):
+        """
+        Save the spans as lemoncheesecake report attachments, both in the Chrome trace-event format
+        and in the OTLP JSON format.
+        """
+        with lcc.prepare_attachment("trace.json", "Trace (Chrome trace-event format)") as path:
+            self.write_chrome_trace(path)
+        with lcc.prepare_attachment("trace.otlp.json", "Trace (OTLP JSON format)") as path:
+            self.write_otlp_json(path)
@@ -1,8 +1,38 @@
+from __future__ import annotations
+
+import os
+import gzip
+import hashlib
+import threading
+import weakref
 from contextlib import contextmanager
+from typing import TYPE_CHECKING
 
-from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import WebDriverException
 import lemoncheesecake.api as lcc
+from lemoncheesecake.session import Session
+
+from lemoncheesecake_selenium.instrumentation import step
+from lemoncheesecake_selenium.screenshot import write_screenshot
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+
+# return the outer HTML of the largest ancestor of the element (the element itself at least) fitting into maxSize
+_PAGE_SOURCE_REGION_SCRIPT = """
+var element = arguments[0], maxSize = arguments[1];
+var region = element;
+while (region.parentElement && region.parentElement.outerHTML.length <= maxSize) {
+    region = region.parentElement;
+}
+return {html: region.outerHTML, tag: region.tagName.toLowerCase(), isElement: region === element};
+"""
+
+# the page sources saved during the current lemoncheesecake session: {session: {sha256: attachment URL}}
+_saved_page_sources = weakref.WeakKeyDictionary()
+_saved_page_sources_lock = threading.Lock()
 
 
 def save_screenshot(driver: WebDriver, description: str = None):
@@ -12,8 +42,8 @@ def save_screenshot(driver: WebDriver, description: str = None):
     :param driver: ``WebDriver`` instance
     :param description: an optional screenshot description
     """
-    with lcc.prepare_image_attachment("screenshot.png", description=description) as path:
-        driver.save_screenshot(path)
+    with step("screenshot"), lcc.prepare_image_attachment("screenshot.png", description=description) as path:
+        write_screenshot(driver, path)
 
 
 @contextmanager
@@ -29,3 +59,67 @@ def save_screenshot_on_exception(driver: WebDriver):
     except WebDriverException as exc:
         save_screenshot(driver, str(exc))
         raise
+
+
+def _trim_page_source(driver, source, element, max_size):
+    if element is not None:
+        try:
+            region = driver.execute_script(_PAGE_SOURCE_REGION_SCRIPT, element, max_size)
+        except WebDriverException:
+            region = None
+        if region is not None:
+            html = region["html"][:max_size]
+            what = "the failing element" if region["isElement"] else \
+                f"the <{region['tag']}> element around the failing element"
+            return f"<!-- Page source of {len(source)} characters trimmed to {what} -->\n{html}"
+    return f"<!-- Page source of {len(source)} characters trimmed to its first {max_size} characters -->\n" + \
+        source[:max_size]
+
+
+def save_page_source(driver: WebDriver, description: str = None, *, element: WebElement = None,
+                     max_size: int = None):
+    """
+    Save the page source (the DOM of the current frame) as a gzip-compressed lemoncheesecake report attachment.
+    A page source identical to one already saved during the run is not saved again, a link to the previous
+    attachment is logged instead.
+
+    :param driver: ``WebDriver`` instance
+    :param description: an optional page source description
+    :param element: the element the page source is saved for (for instance, the element of a failed check)
+    :param max_size: a maximum size (in characters) of the page source, a larger page source is trimmed to the
+        largest region around ``element`` that fits (or to its beginning if no ``element`` is given)
+    """
+    with step("page_source"):
+        source = driver.page_source
+        if max_size is not None and len(source) > max_size:
+            source = _trim_page_source(driver, source, element, max_size)
+        content = source.encode("utf-8")
+        digest = hashlib.sha256(content).hexdigest()
+
+        session = Session.get()
+        with _saved_page_sources_lock:
+            url = _saved_page_sources.setdefault(session, {}).get(digest)
+        if url is not None:
+            lcc.log_url(url, (description or "Page source") + " (identical to a previously saved page source)")
+            return
+
+        with lcc.prepare_attachment("page_source.html.gz", description) as path:
+            with gzip.open(path, "wb") as fh:
+                fh.write(content)
+        with _saved_page_sources_lock:
+            _saved_page_sources[session][digest] = os.path.relpath(path, session.report_dir).replace(os.sep, "/")
+
+
+@contextmanager
+def save_page_source_on_exception(driver: WebDriver):
+    """
+    Context manager. Upon a ``WebDriverException`` exception,
+    it saves the page source (see :py:func:`save_page_source`) and re-raise the exception.
+
+    :param driver: ``WebDriver`` instance
+    """
+    try:
+        yield
+    except WebDriverException as exc:
+        save_page_source(driver, str(exc))
+        raise
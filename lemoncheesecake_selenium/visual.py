@@ -0,0 +1,254 @@
+"""
+Visual regression checks, they require the optional ``numpy`` and ``Pillow`` dependencies
+(``pip install lemoncheesecake-selenium[visual]``).
+"""
+
+from __future__ import annotations
+
+import os
+import os.path as osp
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Sequence, Tuple, TYPE_CHECKING
+
+import lemoncheesecake.api as lcc
+from lemoncheesecake.matching.matcher import Matcher, MatchResult
+
+from lemoncheesecake_selenium.screenshot import write_screenshot
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
+
+#: When this environment variable is set (to anything but ``"0"``), :py:func:`looks_like` does not compare
+#: screenshots but (re)writes the baselines instead.
+UPDATE_BASELINES_ENV_VAR = "LCC_SELENIUM_UPDATE_BASELINES"
+
+Region = Tuple[int, int, int, int]
+
+# the maximum possible value of the YIQ color delta (see _color_delta)
+_MAX_DELTA = 35215.0
+
+# the maximum size (in bytes) of the decoded baselines kept in memory
+_BASELINES_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _import_image_libs():
+    try:
+        import numpy
+        from PIL import Image
+    except ImportError:
+        raise ImportError(
+            "visual regression checks require numpy and Pillow, "
+            "install them with 'pip install lemoncheesecake-selenium[visual]'"
+        )
+    return numpy, Image
+
+
+def _decode_rgb(path):
+    np, Image = _import_image_libs()
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"), dtype=np.uint8)
+
+
+def _rgb_to_yiq(pixels):
+    np, _ = _import_image_libs()
+    rgb = pixels.astype(np.float32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    yiq = np.stack((
+        0.29889531 * r + 0.58662247 * g + 0.11448223 * b,
+        0.59597799 * r - 0.27417610 * g - 0.32180189 * b,
+        0.21147017 * r - 0.52261711 * g + 0.31114694 * b,
+    ), axis=-1)
+    yiq.flags.writeable = False
+    return yiq
+
+
+def _to_yiq(path):
+    return _rgb_to_yiq(_decode_rgb(path))
+
+
+# path => (mtime, size, RGB pixels), from the least to the most recently used
+_baselines = OrderedDict()
+_baselines_bytes = 0
+_baselines_lock = threading.Lock()
+
+
+def _load_baseline_rgb(path):
+    global _baselines_bytes
+
+    stat = os.stat(path)
+    # mtime & size are checked so that an updated baseline is decoded again
+    version = stat.st_mtime_ns, stat.st_size
+    with _baselines_lock:
+        cached = _baselines.get(path)
+        if cached and cached[:2] == version:
+            _baselines.move_to_end(path)
+            return cached[2]
+
+    pixels = _decode_rgb(path)
+    pixels.flags.writeable = False
+    with _baselines_lock:
+        cached = _baselines.pop(path, None)
+        if cached:
+            _baselines_bytes -= cached[2].nbytes
+        if pixels.nbytes <= _BASELINES_CACHE_MAX_BYTES:
+            _baselines[path] = version + (pixels,)
+            _baselines_bytes += pixels.nbytes
+        while _baselines_bytes > _BASELINES_CACHE_MAX_BYTES:
+            _, (_, _, evicted) = _baselines.popitem(last=False)
+            _baselines_bytes -= evicted.nbytes
+    return pixels
+
+
+def load_baseline(path: str):
+    """
+    Load a baseline image as a read-only array of YIQ pixels. The decoded baselines are cached
+    (the cache is invalidated when the file changes and is limited to 64 MB of pixels).
+
+    :param path: the PNG file path
+    :return: a ``numpy`` array of shape (height, width, 3)
+    """
+    return _rgb_to_yiq(_load_baseline_rgb(osp.abspath(path)))
+
+
+def _color_delta(a, b):
+    # perceptual color difference from "Measuring perceived color difference using YIQ NTSC transmission color space
+    # in mobile applications" (Kotsarenko & Ramos), also used by pixelmatch
+    delta = a - b
+    return 0.5053 * delta[..., 0] ** 2 + 0.299 * delta[..., 1] ** 2 + 0.1957 * delta[..., 2] ** 2
+
+
+def _matches_shifted(np, source, target, ys, xs, max_delta):
+    # whether the given pixels of source have a similar pixel in target within a one pixel distance
+    height, width = target.shape[:2]
+    pixels = source[ys, xs]
+    matches = np.zeros(len(ys), dtype=bool)
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            if dy == 0 and dx == 0:
+                continue
+            neighbours = target[np.clip(ys + dy, 0, height - 1), np.clip(xs + dx, 0, width - 1)]
+            matches |= _color_delta(pixels, neighbours) <= max_delta
+    return matches
+
+
+def compute_diff_mask(actual, baseline, *, threshold: float = 0.1, ignore_regions: Sequence[Region] = (),
+                      anti_aliasing: bool = True):
+    """
+    Compute the pixels that differ between two images of the same size.
+
+    :param actual: YIQ pixels array (see :py:func:`load_baseline`)
+    :param baseline: YIQ pixels array
+    :param threshold: the perceptual color difference (from 0 to 1) above which two pixels are considered different
+    :param ignore_regions: the ``(x, y, width, height)`` regions to be ignored
+    :param anti_aliasing: ignore the differences caused by anti-aliasing, that is pixels that have a similar
+        neighbour (one pixel away) in the other image
+    :return: a boolean ``numpy`` array of shape (height, width)
+    """
+    np, _ = _import_image_libs()
+    max_delta = _MAX_DELTA * threshold * threshold
+    mask = _color_delta(actual, baseline) > max_delta
+    for x, y, width, height in ignore_regions:
+        mask[max(y, 0):y + height, max(x, 0):x + width] = False
+
+    if anti_aliasing:
+        # only the differing pixels are examined, which keeps the cost proportional to the size of the difference
+        ys, xs = np.nonzero(mask)
+        if len(ys):
+            anti_aliased = _matches_shifted(np, actual, baseline, ys, xs, max_delta) & \
+                _matches_shifted(np, baseline, actual, ys, xs, max_delta)
+            mask[ys[anti_aliased], xs[anti_aliased]] = False
+    return mask
+
+
+def _save_diff_image(actual_path, mask, description):
+    np, Image = _import_image_libs()
+    with Image.open(actual_path) as image:
+        gray = np.asarray(image.convert("L"), dtype=np.float32)
+    # fade the actual image and paint the differing pixels in red
+    faded = (255 - (255 - gray) * 0.1).astype(np.uint8)
+    diff = np.stack((faded, faded, faded), axis=-1)
+    diff[mask] = (255, 0, 0)
+    with lcc.prepare_image_attachment("diff.png", description) as path:
+        Image.fromarray(diff).save(path)
+
+
+class LooksLike(Matcher):
+    def __init__(self, baseline: str, tolerance: float, threshold: float, ignore_regions: Sequence[Region],
+                 anti_aliasing: bool):
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.threshold = threshold
+        self.ignore_regions = tuple(ignore_regions)
+        self.anti_aliasing = anti_aliasing
+
+    def build_description(self, transformation):
+        return transformation(f"to look like baseline '{self.baseline}'")
+
+    @staticmethod
+    def _must_update_baselines():
+        return os.environ.get(UPDATE_BASELINES_ENV_VAR, "0") not in ("", "0")
+
+    def _update_baseline(self, actual: WebElement):
+        directory = osp.dirname(self.baseline)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        write_screenshot(actual.parent, self.baseline, actual)
+        return MatchResult.success(f"baseline '{self.baseline}' has been updated")
+
+    def _compare(self, actual_path):
+        np, _ = _import_image_libs()
+        baseline = load_baseline(self.baseline)
+        actual = _to_yiq(actual_path)
+        if actual.shape != baseline.shape:
+            return MatchResult.failure(
+                f"got an image of {actual.shape[1]}x{actual.shape[0]} pixels "
+                f"while the baseline is {baseline.shape[1]}x{baseline.shape[0]} pixels"
+            )
+
+        mask = compute_diff_mask(
+            actual, baseline,
+            threshold=self.threshold, ignore_regions=self.ignore_regions, anti_aliasing=self.anti_aliasing
+        )
+        diff_count = int(np.count_nonzero(mask))
+        ratio = diff_count / mask.size
+        description = f"{diff_count} pixels differ ({ratio:.2%}, tolerance is {self.tolerance:.2%})"
+        if ratio > self.tolerance:
+            _save_diff_image(actual_path, mask, f"Difference with baseline '{self.baseline}'")
+            return MatchResult.failure(description)
+        return MatchResult.success(description)
+
+    def matches(self, actual: WebElement):
+        if self._must_update_baselines():
+            return self._update_baseline(actual)
+
+        if not osp.exists(self.baseline):
+            return MatchResult.failure(
+                f"baseline '{self.baseline}' does not exist (set {UPDATE_BASELINES_ENV_VAR}=1 to create it)"
+            )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            actual_path = osp.join(tmp_dir, "screenshot.png")
+            write_screenshot(actual.parent, actual_path, actual)
+            return self._compare(actual_path)
+
+
+def looks_like(baseline: str, *, tolerance: float = 0.0, threshold: float = 0.1,
+               ignore_regions: Sequence[Region] = (), anti_aliasing: bool = True):
+    """
+    Test if the screenshot of a ``WebElement`` looks like a baseline image.
+    Upon failure, an image highlighting the differing pixels is attached to the report.
+
+    If the ``LCC_SELENIUM_UPDATE_BASELINES`` environment variable is set, the baseline is replaced
+    by the element's screenshot instead.
+
+    :param baseline: the path of the baseline PNG image
+    :param tolerance: the ratio (from 0 to 1) of differing pixels tolerated
+    :param threshold: the perceptual color difference (from 0 to 1) above which two pixels are considered different
+    :param ignore_regions: the ``(x, y, width, height)`` regions (in screenshot pixels) to be ignored
+    :param anti_aliasing: whether or not to ignore the differences caused by anti-aliasing
+    :return: ``Matcher`` instance
+    """
+    _import_image_libs()
+    return LooksLike(baseline, tolerance, threshold, ignore_regions, anti_aliasing)
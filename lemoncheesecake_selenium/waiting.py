@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from typing import Sequence, Optional, TYPE_CHECKING
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from lemoncheesecake_selenium.context import FRAME, STALE_CONTEXT_EXCEPTIONS, get_context_tracker
+from lemoncheesecake_selenium.iteration import FIND_JS_FUNCTION, to_script_locator
+from lemoncheesecake_selenium.instrumentation import step
+
+if TYPE_CHECKING:
+    from lemoncheesecake_selenium.selection import Selection
+
+
+_PRESENCE_SCRIPT = """
+var find = %s;
+return arguments[0].map(function (locator) { return find(locator[0], locator[1], document, true).length > 0; });
+""" % FIND_JS_FUNCTION
+
+# the exceptions raised while the frames / shadow hosts of a selection are not attached (yet)
+_CONTEXT_EXCEPTIONS = (NoSuchElementException,) + STALE_CONTEXT_EXCEPTIONS
+
+
+def _is_batchable(selection: Selection):
+    # the presence of elements that are not in a shadow root can be checked for several elements by a single script
+    return selection._expected_condition is None and all(entry.kind == FRAME for entry in selection.context)
+
+
+def _check(selection: Selection, search_context):
+    if selection._expected_condition is None:
+        return bool(search_context.find_elements(selection.by, selection.value))
+    condition = selection._expected_condition(selection.locator, *selection._expected_condition_extra_args)
+    return bool(condition(search_context))
+
+
+def _evaluate(selection: Selection):
+    tracker = get_context_tracker(selection.driver)
+    try:
+        search_context = selection._search_context()
+    except _CONTEXT_EXCEPTIONS:
+        # the context is entered again from scratch on next poll
+        tracker.invalidate()
+        result = False
+    else:
+        try:
+            result = _check(selection, search_context)
+        except STALE_CONTEXT_EXCEPTIONS:
+            # the cached frames / shadow roots may have been detached during the wait
+            if selection.context:
+                tracker.invalidate()
+            result = False
+        except NoSuchElementException:
+            result = False
+
+    if selection._expected_condition is None:
+        return result
+    return not result if selection._expected_condition_reverse else result
+
+
+def _poll(driver, selections: Sequence[Selection], indexes):
+    results = {}
+    batches = defaultdict(list)
+    for idx in indexes:
+        selection = selections[idx]
+        if _is_batchable(selection):
+            batches[selection.context].append(idx)
+        else:
+            results[idx] = _evaluate(selection)
+
+    tracker = get_context_tracker(driver)
+    for context, batch in batches.items():
+        try:
+            tracker.enter(context)
+        except _CONTEXT_EXCEPTIONS:
+            # the frames are not attached yet
+            tracker.invalidate()
+            results.update((idx, False) for idx in batch)
+            continue
+        presences = driver.execute_script(
+            _PRESENCE_SCRIPT, [to_script_locator(selections[idx].by, selections[idx].value) for idx in batch]
+        )
+        results.update(zip(batch, presences))
+    return results
+
+
+def wait_for_selections(driver, selections: Sequence[Selection], *, require_all: bool, timeout: Optional[float],
+                        poll_frequency: float) -> Optional[Selection]:
+    """
+    Wait for the selections to be available (see :py:meth:`Selector.wait_all` and :py:meth:`Selector.wait_any`)
+    in a single poll loop.
+
+    :return: the first available selection
+    :raise ValueError: if no selection is given while waiting for any of them
+    """
+    if not selections and not require_all:
+        raise ValueError("at least one selection must be given")
+
+    start = time.monotonic()
+    deadlines = [
+        start + (timeout if timeout is not None else selection._get_timeout()) for selection in selections
+    ]
+    pending = list(range(len(selections)))
+    timed_out = []
+    first = None
+
+    with step("wait", condition="wait_all" if require_all else "wait_any"):
+        while True:
+            results = _poll(driver, selections, pending)
+            available = [idx for idx in pending if results[idx]]
+            if available and first is None:
+                first = selections[available[0]]
+            pending = [idx for idx in pending if not results[idx]]
+            if available and not require_all:
+                return first
+
+            now = time.monotonic()
+            if require_all:
+                # the timed out selections are no longer polled, the others are waited for
+                # so that all the failing selections are reported
+                timed_out.extend(idx for idx in pending if now >= deadlines[idx])
+                pending = [idx for idx in pending if now < deadlines[idx]]
+            elif now >= max(deadlines):
+                timed_out, pending = pending, []
+
+            if not pending:
+                if timed_out:
+                    raise TimeoutException(
+                        "%s available in time: %s" % (
+                            "some elements are not" if require_all else "none of the elements is",
+                            ", ".join(str(selections[idx]) for idx in sorted(timed_out))
+                        )
+                    )
+                return first
+
+            deadline = min(deadlines[idx] for idx in pending) if require_all else max(deadlines)
+            time.sleep(max(min(poll_frequency, deadline - now), 0))
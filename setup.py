@@ -44,5 +44,6 @@ setup(
     },
 
     packages=find_packages(),
-    install_requires=("lemoncheesecake~=1.10", "selenium~=4.0")
+    install_requires=("lemoncheesecake~=1.10", "selenium~=4.0"),
+    extras_require={"visual": ("numpy", "Pillow")}
 )
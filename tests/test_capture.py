@@ -0,0 +1,126 @@
+import io
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+
+from lemoncheesecake_selenium import Selector, Selection
+from lemoncheesecake_selenium.capture import get_capture_cache
+
+
+def _make_png():
+    image = Image.new("RGB", (100, 50), (255, 255, 255))
+    image.paste((255, 0, 0), (10, 10, 30, 20))
+    fh = io.BytesIO()
+    image.save(fh, "PNG")
+    return fh.getvalue()
+
+
+def _make_driver(*rects, token="page"):
+    driver = MagicMock()
+    driver.get_screenshot_as_png.return_value = _make_png()
+    driver.execute_script.return_value = {"token": token, "ratio": 2, "rects": list(rects)}
+    return driver
+
+
+@pytest.fixture
+def prepare_image_attachment_mock(mocker, tmp_path):
+    paths = iter(str(tmp_path / f"screenshot-{idx}.png") for idx in range(100))
+    mock = mocker.patch("lemoncheesecake.api.prepare_image_attachment")
+    mock.return_value.__enter__.side_effect = paths
+    return mock
+
+
+@pytest.fixture
+def preserve_screenshot_capture():
+    orig_screenshot_capture = Selection.screenshot_capture
+    yield
+    Selection.screenshot_capture = orig_screenshot_capture
+
+
+def test_write_element_screenshots(tmp_path):
+    driver = _make_driver([5, 5, 10, 5], [0, 0, 5, 5])
+    paths = [str(tmp_path / "1.png"), str(tmp_path / "2.png")]
+    get_capture_cache(driver).write_element_screenshots([MagicMock(), MagicMock()], paths)
+
+    red = Image.open(paths[0])
+    assert red.size == (20, 10)
+    assert red.getcolors() == [(200, (255, 0, 0))]
+    assert Image.open(paths[1]).getpixel((0, 0)) == (255, 255, 255)
+    driver.get_screenshot_as_png.assert_called_once()
+    driver.execute_script.assert_called_once()
+
+
+def test_write_element_screenshots_reuse_capture(tmp_path):
+    driver = _make_driver([5, 5, 10, 5])
+    cache = get_capture_cache(driver)
+    cache.write_element_screenshots([MagicMock()], [str(tmp_path / "1.png")])
+    cache.write_element_screenshots([MagicMock()], [str(tmp_path / "2.png")])
+    driver.get_screenshot_as_png.assert_called_once()
+
+
+def test_write_element_screenshots_page_changed(tmp_path):
+    driver = _make_driver([5, 5, 10, 5])
+    cache = get_capture_cache(driver)
+    cache.write_element_screenshots([MagicMock()], [str(tmp_path / "1.png")])
+    driver.execute_script.return_value = dict(driver.execute_script.return_value, token="scrolled")
+    cache.write_element_screenshots([MagicMock()], [str(tmp_path / "2.png")])
+    assert driver.get_screenshot_as_png.call_count == 2
+
+
+def test_write_element_screenshots_full_page(tmp_path):
+    driver = _make_driver([5, 5, 10, 5])
+    driver.get_full_page_screenshot_as_png.return_value = _make_png()
+    get_capture_cache(driver).write_element_screenshots([MagicMock()], [str(tmp_path / "1.png")], full_page=True)
+    driver.get_full_page_screenshot_as_png.assert_called_once()
+    driver.get_screenshot_as_png.assert_not_called()
+    assert driver.execute_script.call_args[0][2] is True
+
+
+@pytest.mark.parametrize("rect", ([40, 5, 20, 5], [-1, 0, 5, 5], [5, 5, 0, 0]))
+def test_write_element_screenshots_outside_capture(tmp_path, rect):
+    driver = _make_driver(rect)
+    element = MagicMock()
+    path = str(tmp_path / "1.png")
+    get_capture_cache(driver).write_element_screenshots([element], [path])
+    element.screenshot.assert_called_once_with(path)
+
+
+def test_write_element_screenshots_without_pillow(tmp_path, mocker):
+    mocker.patch("lemoncheesecake_selenium.capture._import_pillow", return_value=None)
+    driver = _make_driver([5, 5, 10, 5])
+    element = MagicMock()
+    path = str(tmp_path / "1.png")
+    get_capture_cache(driver).write_element_screenshots([element], [path])
+    element.screenshot.assert_called_once_with(path)
+    driver.get_screenshot_as_png.assert_not_called()
+
+
+@pytest.mark.usefixtures("preserve_screenshot_capture")
+def test_selection_save_screenshot(prepare_image_attachment_mock, mocker):
+    mocker.patch("lemoncheesecake.api.log_info")
+    Selection.screenshot_capture = "viewport"
+    driver = _make_driver([5, 5, 10, 5])
+    selection = Selector(driver).by_id("foo")
+    selection.save_screenshot()
+    selection.save_screenshot()
+    driver.get_screenshot_as_png.assert_called_once()
+    driver.find_element.return_value.screenshot.assert_not_called()
+
+    # a mutating action drops the capture
+    selection.click()
+    selection.save_screenshot()
+    assert driver.get_screenshot_as_png.call_count == 2
+
+
+def test_selector_save_screenshots(prepare_image_attachment_mock):
+    driver = _make_driver([5, 5, 10, 5], [0, 0, 5, 5])
+    selector = Selector(driver)
+    selection_in_frame = selector.in_frame(selector.by_id("frame")).by_id("baz")
+    selector.save_screenshots(selector.by_id("foo"), selection_in_frame, selector.by_id("bar"))
+
+    assert prepare_image_attachment_mock.call_count == 3
+    driver.get_screenshot_as_png.assert_called_once()
+    elements = driver.execute_script.call_args[0][1]
+    assert len(elements) == 2
+    driver.find_element.return_value.screenshot.assert_called_once()
@@ -0,0 +1,226 @@
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.common.exceptions import TimeoutException, JavascriptException
+from selenium.webdriver.common.by import By
+
+from lemoncheesecake_selenium import Selector, Selection
+from lemoncheesecake_selenium.conditions import network_is_idle, dom_is_settled, page_is_settled, \
+    get_page_activity
+from lemoncheesecake_selenium import conditions
+
+FAKE_WEB_ELEMENT = object()
+
+
+def _make_driver(**activity):
+    driver = MagicMock()
+    driver.execute_script.return_value = dict(
+        {"ready": True, "inflight": 0, "network_idle": 1.0, "dom_idle": 1.0, "animations": 0}, **activity
+    )
+    return driver
+
+
+def test_get_page_activity():
+    driver = _make_driver()
+    assert get_page_activity(driver)["inflight"] == 0
+    assert "__lccActivity" in driver.execute_script.call_args[0][0]
+
+
+@pytest.mark.parametrize(
+    "activity,expected", (
+        ({}, True),
+        ({"ready": False}, False),
+        ({"inflight": 1}, False),
+        ({"network_idle": 0.1}, False),
+        ({"dom_idle": 0.1}, True),
+    )
+)
+def test_network_is_idle(activity, expected):
+    assert network_is_idle(None, 0.5)(_make_driver(**activity)) is expected
+
+
+@pytest.mark.parametrize(
+    "activity,expected", (
+        ({}, True),
+        ({"dom_idle": 0.1}, False),
+        ({"animations": 2}, False),
+        ({"inflight": 1}, True),
+    )
+)
+def test_dom_is_settled(activity, expected):
+    assert dom_is_settled(None, 0.5)(_make_driver(**activity)) is expected
+
+
+@pytest.mark.parametrize(
+    "activity,expected", (
+        ({}, True),
+        ({"ready": False}, False),
+        ({"inflight": 1}, False),
+        ({"network_idle": 0.1}, False),
+        ({"dom_idle": 0.1}, False),
+        ({"animations": 2}, False),
+    )
+)
+def test_page_is_settled(activity, expected):
+    assert page_is_settled(None, 0.5)(_make_driver(**activity)) is expected
+
+
+def test_with_must_be_waited_until():
+    driver = _make_driver()
+    driver.find_element.return_value = FAKE_WEB_ELEMENT
+    selection = Selector(driver).by_id("value").must_be_waited_until(network_is_idle, timeout=0, extra_args=(0.5,))
+    assert selection.element is FAKE_WEB_ELEMENT
+
+
+@pytest.mark.parametrize("method_name", ("wait_until_network_idle", "wait_until_dom_settled", "wait_until_page_settled"))
+def test_selector_wait(method_name):
+    driver = _make_driver()
+    getattr(Selector(driver), method_name)(timeout=0)
+    driver.execute_script.assert_called()
+
+
+@pytest.mark.parametrize("method_name", ("wait_until_network_idle", "wait_until_dom_settled", "wait_until_page_settled"))
+def test_selector_wait_timeout(method_name):
+    driver = _make_driver(inflight=1, dom_idle=0, network_idle=0)
+    with pytest.raises(TimeoutException, match="page has not been settled"):
+        getattr(Selector(driver), method_name)(timeout=0)
+
+
+def test_selector_wait_in_frame():
+    driver = _make_driver()
+    selector = Selector(driver)
+    selector.in_frame(selector.by_id("frame")).wait_until_network_idle(timeout=0)
+    driver.switch_to.frame.assert_called_once()
+
+
+def test_selector_wait_default_timeout(mocker):
+    wait_mock = mocker.patch("selenium.webdriver.support.ui.WebDriverWait")
+    driver = _make_driver()
+    Selector(driver).wait_until_network_idle()
+    wait_mock.assert_called_with(driver, Selection.default_timeout)
+
+
+@pytest.mark.parametrize(
+    "condition,args,name", (
+        (conditions.presence_of_element_located, (), "presence"),
+        (conditions.visibility_of_element_located, (), "visibility"),
+        (conditions.element_to_be_clickable, (), "clickable"),
+        (conditions.text_to_be_present_in_element, ("foo",), "text"),
+        (conditions.text_to_be_present_in_element_attribute, ("value", "foo"), "attribute"),
+        (conditions.staleness_of_element_located, (), "staleness"),
+        (conditions.invisibility_of_element_located, (), "invisibility"),
+    )
+)
+def test_browser_condition_predicate(condition, args, name):
+    driver = MagicMock()
+    driver.execute_script.return_value = {"met": True, "element": None}
+    assert condition((By.ID, "foo"), *args)(driver) is True
+    script_args = driver.execute_script.call_args[0]
+    assert script_args[1:6] == (None, "css selector", '[id="foo"]', name, list(args))
+
+
+def test_browser_condition_predicate_keeps_element():
+    driver = MagicMock()
+    driver.execute_script.return_value = {"met": False, "element": FAKE_WEB_ELEMENT}
+    predicate = conditions.staleness_of_element_located((By.ID, "foo"))
+    assert predicate(driver) is False
+    assert driver.execute_script.call_args[0][6:] == (None, False)
+    predicate(driver)
+    assert driver.execute_script.call_args[0][6:] == (FAKE_WEB_ELEMENT, True)
+
+
+def test_browser_condition_bad_args():
+    with pytest.raises(TypeError):
+        conditions.text_to_be_present_in_element((By.ID, "foo"))
+
+
+def test_browser_condition_wait():
+    driver = MagicMock()
+    driver.execute_async_script.return_value = True
+    selection = Selection(driver, By.ID, "foo").must_be_waited_until(
+        conditions.text_to_be_present_in_element, extra_args=("bar",), timeout=5
+    )
+    selection.element
+    script_args = driver.execute_async_script.call_args[0]
+    assert "MutationObserver" in script_args[0]
+    assert script_args[1:9] == (None, "css selector", '[id="foo"]', "text", ["bar"], False, 5000, 250)
+    driver.execute_script.assert_not_called()
+    driver.find_element.assert_called_once_with(By.ID, "foo")
+
+
+def test_browser_condition_wait_reverse():
+    driver = MagicMock()
+    driver.execute_async_script.return_value = True
+    Selection(driver, By.ID, "foo").must_be_waited_until_not(conditions.visibility_of_element_located, timeout=1).element
+    assert driver.execute_async_script.call_args[0][6] is True
+
+
+def test_browser_condition_wait_timeout():
+    driver = MagicMock()
+    driver.execute_async_script.return_value = False
+    selection = Selection(driver, By.ID, "foo").must_be_waited_until(
+        conditions.presence_of_element_located, timeout=0.1
+    )
+    with pytest.raises(TimeoutException, match="expected condition has not been fulfilled"):
+        selection.element
+    driver.find_element.assert_not_called()
+
+
+def test_browser_condition_wait_by_slices(mocker):
+    mocker.patch("lemoncheesecake_selenium.conditions._MAX_OBSERVE_DURATION", 0.05)
+    driver = MagicMock()
+    driver.execute_async_script.side_effect = [False, TimeoutException("script timeout"), True]
+    Selection(driver, By.ID, "foo").must_be_waited_until(conditions.presence_of_element_located, timeout=30).element
+    assert driver.execute_async_script.call_count == 3
+    assert driver.execute_async_script.call_args[0][7] == 50
+
+
+def test_browser_condition_wait_short_script_timeout():
+    # the session script timeout is shorter than the wait timeout: the wait goes on after each script timeout
+    driver = MagicMock()
+    driver.execute_async_script.side_effect = [TimeoutException("script timeout")] * 3 + [True]
+    Selection(driver, By.ID, "foo").must_be_waited_until(conditions.presence_of_element_located, timeout=5).element
+    assert driver.execute_async_script.call_count == 4
+
+
+def test_browser_condition_wait_across_navigation(mocker):
+    mocker.patch.object(conditions.BrowserCondition, "poll_interval", 0.01)
+    driver = MagicMock()
+    driver.execute_async_script.side_effect = [
+        JavascriptException("javascript error: document unloaded while waiting for result"), True
+    ]
+    Selection(driver, By.ID, "foo").must_be_waited_until(conditions.presence_of_element_located, timeout=5).element
+    assert driver.execute_async_script.call_count == 2
+
+
+def test_browser_condition_wait_script_error():
+    driver = MagicMock()
+    driver.execute_async_script.side_effect = JavascriptException("javascript error: boom")
+    with pytest.raises(JavascriptException):
+        Selection(driver, By.ID, "foo").must_be_waited_until(conditions.presence_of_element_located, timeout=5).element
+
+
+def test_browser_condition_wait_in_shadow_root():
+    driver = MagicMock()
+    driver.execute_async_script.return_value = True
+    selector = Selector(driver)
+    selection = selector.in_shadow(selector.by_id("host")).by_id("foo")
+    selection.must_be_waited_until(conditions.presence_of_element_located, timeout=1).element
+    assert driver.execute_async_script.call_args[0][1] is driver.find_element.return_value
+
+
+def test_get_page_activity_in_shadow_root():
+    shadow_root_class = conditions._get_shadow_root_class()
+    if shadow_root_class is None:
+        pytest.skip("this selenium version does not support shadow roots")
+    shadow_root = MagicMock(spec=shadow_root_class)
+    shadow_root.session = MagicMock()
+    conditions.get_page_activity(shadow_root)
+    shadow_root.session.execute_script.assert_called_once()
+
+
+def test_get_page_activity_without_shadow_root_support(mocker):
+    mocker.patch.object(conditions, "_get_shadow_root_class", return_value=None)
+    driver = MagicMock()
+    conditions.get_page_activity(driver)
+    driver.execute_script.assert_called_once()
@@ -0,0 +1,136 @@
+from unittest.mock import MagicMock, call
+
+from selenium.webdriver.common.by import By
+
+from lemoncheesecake_selenium.context import ContextEntry, ContextTracker, get_context_tracker, FRAME, SHADOW
+
+FRAME1 = ContextEntry(FRAME, By.ID, "frame1")
+FRAME2 = ContextEntry(FRAME, By.ID, "frame2")
+HOST = ContextEntry(SHADOW, By.CSS_SELECTOR, "my-component")
+
+
+def test_get_context_tracker():
+    driver = MagicMock()
+    assert get_context_tracker(driver) is get_context_tracker(driver)
+    assert get_context_tracker(driver) is not get_context_tracker(MagicMock())
+
+
+def test_enter_no_context():
+    driver = MagicMock()
+    assert ContextTracker(driver).enter(()) is driver
+    driver.switch_to.default_content.assert_not_called()
+
+
+def test_enter_frames():
+    driver = MagicMock()
+    tracker = ContextTracker(driver)
+    assert tracker.enter((FRAME1, FRAME2)) is driver
+    driver.switch_to.default_content.assert_called_once()
+    driver.find_element.assert_has_calls([call(By.ID, "frame1"), call(By.ID, "frame2")])
+    assert driver.switch_to.frame.call_count == 2
+
+
+def test_enter_same_frame_twice():
+    driver = MagicMock()
+    tracker = ContextTracker(driver)
+    tracker.enter((FRAME1,))
+    tracker.enter((FRAME1,))
+    driver.switch_to.default_content.assert_called_once()
+    driver.switch_to.frame.assert_called_once()
+
+
+def test_enter_frame_then_top_level():
+    driver = MagicMock()
+    tracker = ContextTracker(driver)
+    tracker.enter((FRAME1,))
+    assert tracker.enter(()) is driver
+    assert driver.switch_to.default_content.call_count == 2
+
+
+def test_enter_shadow():
+    driver = MagicMock()
+    tracker = ContextTracker(driver)
+    shadow_root = driver.find_element.return_value.shadow_root
+    assert tracker.enter((HOST,)) is shadow_root
+    assert tracker.enter((HOST,)) is shadow_root
+    driver.find_element.assert_called_once_with(By.CSS_SELECTOR, "my-component")
+    driver.switch_to.default_content.assert_not_called()
+
+
+def test_enter_frame_in_shadow():
+    driver = MagicMock()
+    tracker = ContextTracker(driver)
+    shadow_root = driver.find_element.return_value.shadow_root
+    assert tracker.enter((HOST, FRAME1)) is driver
+    shadow_root.find_element.assert_called_once_with(By.ID, "frame1")
+    driver.switch_to.frame.assert_called_once_with(shadow_root.find_element.return_value)
+
+
+def test_invalidate():
+    driver = MagicMock()
+    tracker = ContextTracker(driver)
+    tracker.enter((FRAME1, HOST))
+    tracker.invalidate()
+    tracker.enter((FRAME1, HOST))
+    assert driver.switch_to.default_content.call_count == 2
+    assert driver.switch_to.frame.call_count == 2
+    assert driver.find_element.call_args_list.count(call(By.CSS_SELECTOR, "my-component")) == 2
+
+
+def test_invalidate_then_top_level():
+    driver = MagicMock()
+    tracker = ContextTracker(driver)
+    tracker.invalidate()
+    tracker.enter(())
+    driver.switch_to.default_content.assert_called_once()
+
+
+def test_suspect_navigation_without_frames():
+    driver = MagicMock()
+    tracker = ContextTracker(driver)
+    tracker.enter((HOST,))
+    tracker.suspect_navigation()
+    tracker.enter((HOST,))
+    # no frame had been entered, the driver is known to be in the top-level document
+    driver.execute_script.assert_not_called()
+    driver.switch_to.default_content.assert_not_called()
+    driver.find_element.assert_called_once()
+
+
+def test_suspect_navigation_still_in_frames():
+    driver = MagicMock()
+    driver.execute_script.return_value = 2
+    tracker = ContextTracker(driver)
+    tracker.enter((FRAME1, FRAME2))
+    tracker.suspect_navigation()
+    assert tracker.get_frame_depth_to_check((FRAME1, FRAME2)) == 2
+    assert tracker.get_frame_depth_to_check((FRAME1,)) is None
+    tracker.enter((FRAME1, FRAME2))
+    tracker.enter((FRAME1, FRAME2))
+    # the frames are checked once with a single command
+    driver.execute_script.assert_called_once()
+    assert driver.switch_to.frame.call_count == 2
+    assert tracker.get_frame_depth_to_check((FRAME1, FRAME2)) is None
+
+
+def test_suspect_navigation_out_of_frames():
+    driver = MagicMock()
+    driver.execute_script.return_value = 0
+    tracker = ContextTracker(driver)
+    tracker.enter((FRAME1,))
+    tracker.suspect_navigation()
+    tracker.enter((FRAME1,))
+    assert driver.switch_to.default_content.call_count == 2
+    assert driver.switch_to.frame.call_count == 2
+
+
+def test_set_frames_checked():
+    driver = MagicMock()
+    tracker = ContextTracker(driver)
+    tracker.enter((FRAME1,))
+    tracker.suspect_navigation()
+    tracker.set_frames_checked(False)
+    assert tracker.get_frame_depth_to_check((FRAME1,)) is None
+    tracker.enter((FRAME1,))
+    driver.execute_script.assert_not_called()
+    assert driver.switch_to.frame.call_count == 2
\ No newline at end of file
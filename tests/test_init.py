@@ -0,0 +1,56 @@
+import re
+import sys
+import subprocess
+
+import pytest
+
+import lemoncheesecake_selenium
+
+
+# importing the bare package must stay (almost) free, whatever the machine
+IMPORT_TIME_BUDGET_US = 50000
+
+
+def _run_python(code, *options):
+    return subprocess.run(
+        [sys.executable, *options, "-c", code], check=True, capture_output=True, universal_newlines=True
+    )
+
+
+def _get_loaded_modules(code):
+    output = _run_python(code + "\nimport sys\nprint('\\n'.join(sys.modules))").stdout
+    return set(output.splitlines())
+
+
+def test_import_does_not_load_selenium():
+    modules = _get_loaded_modules("import lemoncheesecake_selenium")
+    assert not any(module.startswith("selenium") for module in modules)
+    assert "lemoncheesecake.matching" not in modules
+
+
+def test_selector_import_does_not_load_webdriver():
+    if "selenium.webdriver.remote.webdriver" in _get_loaded_modules("import selenium.webdriver.common.by"):
+        pytest.skip("this selenium version loads all the WebDriver implementations with any selenium.webdriver module")
+    modules = _get_loaded_modules("from lemoncheesecake_selenium import Selector")
+    assert "lemoncheesecake_selenium.selection" in modules
+    assert "selenium.webdriver.remote.webdriver" not in modules
+    assert "selenium.webdriver.support.wait" not in modules
+
+
+def test_import_time_budget():
+    output = _run_python("import lemoncheesecake_selenium", "-X", "importtime").stderr
+    cumulative_times = [
+        int(match.group(1)) for match in re.finditer(r"\|\s*(\d+) \| lemoncheesecake_selenium$", output, re.M)
+    ]
+    assert cumulative_times and cumulative_times[0] < IMPORT_TIME_BUDGET_US
+
+
+@pytest.mark.parametrize("name", lemoncheesecake_selenium.__all__)
+def test_public_api(name):
+    assert getattr(lemoncheesecake_selenium, name).__name__ == name
+    assert name in dir(lemoncheesecake_selenium)
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        lemoncheesecake_selenium.unknown  # noqa
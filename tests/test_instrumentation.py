@@ -0,0 +1,85 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from lemoncheesecake_selenium import Selector, instrument_driver
+from lemoncheesecake_selenium.instrumentation import Listener, add_listener, remove_listener, step, current_step
+
+
+class RecordingListener(Listener):
+    def __init__(self):
+        self.started = []
+        self.ended = []
+
+    def on_step_start(self, step):
+        self.started.append(step)
+
+    def on_step_end(self, step):
+        self.ended.append(step)
+
+
+@pytest.fixture
+def listener():
+    listener = RecordingListener()
+    add_listener(listener)
+    yield listener
+    remove_listener(listener)
+
+
+def test_step_without_listener():
+    with step("click") as current:
+        assert current is None
+
+
+def test_step(listener):
+    with step("click", extra="value") as current:
+        assert current_step() is current
+    assert current_step() is None
+    assert listener.started == listener.ended == [current]
+    assert current.kind == "click"
+    assert current.details == {"extra": "value"}
+    assert current.duration >= 0
+    assert current.error is None
+
+
+def test_step_nested(listener):
+    with step("click") as parent:
+        with step("find") as child:
+            pass
+    assert child.parent is parent
+    assert [s.kind for s in listener.ended] == ["find", "click"]
+
+
+def test_step_error(listener):
+    with pytest.raises(ValueError):
+        with step("click") as current:
+            raise ValueError()
+    assert isinstance(current.error, ValueError)
+
+
+def test_remove_listener(listener):
+    remove_listener(listener)
+    with step("click"):
+        pass
+    assert listener.ended == []
+
+
+def test_selection_steps(listener, mocker):
+    mocker.patch("lemoncheesecake_selenium.selection.lcc.log_info")
+    driver = MagicMock()
+    Selector(driver).by_id("value").click()
+    assert [s.kind for s in listener.ended] == ["find", "click"]
+    assert str(listener.ended[1].selection) == "element identified by id 'value'"
+    assert listener.ended[1].label == "click element identified by id 'value'"
+
+
+def test_instrument_driver(listener):
+    driver = MagicMock()
+    execute = driver.execute
+    assert instrument_driver(driver) is driver
+    assert instrument_driver(driver) is driver
+    driver.execute("getTitle", {})
+    execute.assert_called_once_with("getTitle", {})
+    assert len(listener.ended) == 1
+    assert listener.ended[0].kind == "command"
+    assert listener.ended[0].label == "command getTitle"
@@ -0,0 +1,97 @@
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+
+from lemoncheesecake_selenium.iteration import iter_matches, _START_SCRIPT, _NEXT_SCRIPT, _END_SCRIPT
+
+
+class FakeBrowser:
+    """Emulate the iteration scripts over a list of elements"""
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.kept = {}
+        self.calls = []
+
+    def _chunk(self, matches, start, size, fields):
+        elements = matches[start:start + size]
+        return {
+            "elements": elements,
+            "snapshots": [{field: f"{field} of {element}" for field in fields} for element in elements]
+            if fields else None
+        }
+
+    def execute_script(self, script, *args):
+        self.calls.append((script, args))
+        if script == _START_SCRIPT:
+            using, value, host, key, size, fields = args
+            if len(self.elements) > size:
+                self.kept[key] = self.elements
+            chunk = self._chunk(self.elements, 0, size, fields)
+            chunk["total"] = len(self.elements)
+            return chunk
+        if script == _NEXT_SCRIPT:
+            key, start, size, fields = args
+            return self._chunk(self.kept[key], start, size, fields) if key in self.kept else None
+        if script == _END_SCRIPT:
+            self.kept.pop(args[0], None)
+
+
+def test_iter_matches():
+    browser = FakeBrowser(list(range(10)))
+    assert list(iter_matches(browser, "css selector", "li", chunk_size=3)) == list(range(10))
+    assert [script for script, _ in browser.calls] == [_START_SCRIPT] + [_NEXT_SCRIPT] * 3 + [_END_SCRIPT]
+    assert browser.kept == {}
+
+
+def test_iter_matches_single_chunk():
+    browser = FakeBrowser(list(range(3)))
+    assert list(iter_matches(browser, "css selector", "li", chunk_size=3)) == [0, 1, 2]
+    assert [script for script, _ in browser.calls] == [_START_SCRIPT]
+    assert browser.kept == {}
+
+
+def test_iter_matches_early_exit():
+    browser = FakeBrowser(list(range(100)))
+    iterator = iter_matches(browser, "css selector", "li", chunk_size=10)
+    for element in iterator:
+        if element == 12:
+            break
+    iterator.close()
+    assert [script for script, _ in browser.calls] == [_START_SCRIPT, _NEXT_SCRIPT, _END_SCRIPT]
+    assert browser.kept == {}
+
+
+def test_iter_matches_snapshots():
+    browser = FakeBrowser(["a", "b", "c"])
+    snapshots = list(iter_matches(browser, "css selector", "li", chunk_size=2, fields=["text"]))
+    assert [snapshot.text for snapshot in snapshots] == ["text of a", "text of b", "text of c"]
+    assert [snapshot.element for snapshot in snapshots] == ["a", "b", "c"]
+
+
+def test_iter_matches_locator_conversion():
+    browser = FakeBrowser([])
+    list(iter_matches(browser, "id", "foo"))
+    assert browser.calls[0][1][:2] == ("css selector", '[id="foo"]')
+
+
+def test_iter_matches_page_changed():
+    browser = FakeBrowser(list(range(10)))
+    iterator = iter_matches(browser, "css selector", "li", chunk_size=5)
+    browser.kept.clear()
+    with pytest.raises(StaleElementReferenceException):
+        list(iterator)
+
+
+def test_iter_matches_cleanup_failure():
+    browser = FakeBrowser(list(range(10)))
+    iterator = iter_matches(browser, "css selector", "li", chunk_size=5)
+    next(iterator)
+    browser.execute_script = MagicMock(side_effect=WebDriverException("gone"))
+    iterator.close()
+
+
+def test_iter_matches_invalid_chunk_size():
+    with pytest.raises(ValueError):
+        iter_matches(FakeBrowser([]), "css selector", "li", chunk_size=0)
@@ -2,9 +2,12 @@ from unittest.mock import MagicMock
 
 import pytest
 from callee import Regex
+from lemoncheesecake.matching import match_pattern, greater_than
 from lemoncheesecake.matching.matcher import MatchResult, MatcherDescriptionTransformer
 from lemoncheesecake_selenium import has_text, has_attribute, has_property, \
-    is_displayed, is_enabled, is_selected, is_in_page
+    is_displayed, is_enabled, is_selected, is_in_page, each, any_, none_, count_of, \
+    has_css, has_size, is_in_viewport, is_not_obscured
+from lemoncheesecake_selenium.snapshot import ElementSnapshot
 
 from helpers import MyMatcher
 
@@ -116,3 +119,138 @@ def test_is_in_page():
     matcher = is_in_page()
     assert matcher.build_description(MatcherDescriptionTransformer()) == "to be present in page"
     assert matcher.matches(None)
+
+
+def test_has_css():
+    matcher = has_css("color", "rgb(255, 0, 0)")
+    assert matcher.build_description(MatcherDescriptionTransformer()) == \
+        "to have CSS property 'color' that is equal to \"rgb(255, 0, 0)\""
+    assert matcher.matches(ElementSnapshot({"css:color": "rgb(255, 0, 0)"}))
+    assert not matcher.matches(ElementSnapshot({"css:color": "rgb(0, 0, 0)"}))
+
+
+def test_has_css_fallback():
+    mock = MagicMock()
+    mock.value_of_css_property.return_value = "block"
+    assert has_css("display", "block").matches(mock)
+    mock.value_of_css_property.assert_called_once_with("display")
+
+
+def test_has_size_description():
+    assert has_size(100).build_description(MatcherDescriptionTransformer()) == \
+        "to have a width that is equal to 100"
+    assert has_size(100, greater_than(10)).build_description(MatcherDescriptionTransformer()) == \
+        "to have a width that is equal to 100 and a height that is greater than 10"
+
+
+def test_has_size():
+    snapshot = ElementSnapshot({"rect": {"x": 0, "y": 0, "width": 100, "height": 20}})
+    result = has_size(100, 20).matches(snapshot)
+    assert result and result.description == "got 100x20"
+    result = has_size(height=greater_than(30)).matches(snapshot)
+    assert not result and result.description == "got height 20"
+
+
+def test_has_size_no_dimension():
+    with pytest.raises(ValueError):
+        has_size()
+
+
+@pytest.mark.parametrize(
+    "matcher,field,description", (
+        (is_in_viewport(), "in_viewport", "to be in viewport"),
+        (is_in_viewport(fully=True), "fully_in_viewport", "to be fully in viewport"),
+        (is_not_obscured(), "not_obscured", "to be not obscured"),
+    )
+)
+class TestGeometryState:
+    def test_description(self, matcher, field, description):
+        assert matcher.build_description(MatcherDescriptionTransformer()) == description
+
+    @pytest.mark.parametrize("expected", (True, False))
+    def test_matches(self, matcher, field, description, expected):
+        assert bool(matcher.matches(ElementSnapshot({field: expected}))) is expected
+
+    def test_matches_web_element(self, matcher, field, description):
+        element = MagicMock()
+        element.parent.execute_script.return_value = [{field: True}]
+        assert matcher.matches(element)
+        assert element.parent.execute_script.call_args[0][1:] == ([element], [field])
+
+
+def _make_elements(*texts):
+    elements = []
+    for text in texts:
+        element = MagicMock()
+        element.text = text
+        elements.append(element)
+    return elements
+
+
+def test_each_description():
+    assert each(has_text("foo")).build_description(MatcherDescriptionTransformer()) == \
+        "to have elements that each has text that is equal to \"foo\""
+
+
+def test_each_success():
+    result = each(has_text(match_pattern("^f"))).matches(_make_elements("foo", "far"))
+    assert result
+    assert result.description == "got 2 matching elements"
+
+
+def test_each_failure():
+    result = each(has_text("foo")).matches(_make_elements("foo", "bar", "baz"))
+    assert not result
+    assert result.description.startswith("2 of 3 elements do not match, at index 1, 2\n- at index 1: ")
+
+
+def test_each_no_element():
+    result = each(has_text("foo")).matches([])
+    assert not result
+    assert result.description == "got no element"
+
+
+def test_each_failure_many():
+    result = each(has_text("foo")).matches(_make_elements(*["bar"] * 15))
+    assert not result
+    assert "at index 0, 1, 2, 3, 4, 5, 6, 7, 8, 9 (and 5 more)" in result.description
+
+
+def test_any_description():
+    assert any_(has_text("foo")).build_description(MatcherDescriptionTransformer()) == \
+        "to have an element that has text that is equal to \"foo\""
+
+
+def test_any():
+    assert any_(has_text("foo")).matches(_make_elements("bar", "foo")).description == \
+        "found matching element at index 1"
+    assert not any_(has_text("foo")).matches(_make_elements("bar"))
+
+
+def test_none_description():
+    assert none_(has_text("foo")).build_description(MatcherDescriptionTransformer()) == \
+        "to have no element that has text that is equal to \"foo\""
+
+
+def test_none():
+    assert none_(has_text("foo")).matches(_make_elements("bar", "baz"))
+    result = none_(has_text("foo")).matches(_make_elements("bar", "foo"))
+    assert not result
+    assert result.description == "1 of 2 elements match, at index 1"
+
+
+def test_count_of_description():
+    assert count_of(has_text("foo"), 2).build_description(MatcherDescriptionTransformer()) == \
+        "to have a number of elements that has text that is equal to \"foo\" which is equal to 2"
+
+
+def test_count_of():
+    assert count_of(has_text("foo"), 2).matches(_make_elements("foo", "bar", "foo"))
+    result = count_of(has_text("foo"), greater_than(2)).matches(_make_elements("foo", "bar", "foo"))
+    assert not result
+    assert result.description == "got 2 matching elements (at index 0, 2)"
+
+
+def test_elements_matcher_snapshot_fields():
+    assert each(has_text("foo")).snapshot_fields == {"text"}
+    assert count_of(MyMatcher(), 1).snapshot_fields is None
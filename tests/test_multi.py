@@ -0,0 +1,142 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from callee import Contains
+from selenium.common.exceptions import WebDriverException, NoSuchElementException
+
+from lemoncheesecake_selenium import MultiSelector, Selection, has_text, count_of, is_in_page
+
+
+@pytest.fixture
+def drivers():
+    return {"chrome": MagicMock(), "firefox": MagicMock()}
+
+
+@pytest.fixture
+def selector(drivers):
+    with MultiSelector(drivers) as selector:
+        yield selector
+
+
+@pytest.fixture
+def log_info_mock(mocker):
+    return mocker.patch("lemoncheesecake.api.log_info")
+
+
+@pytest.fixture
+def log_error_mock(mocker):
+    return mocker.patch("lemoncheesecake.api.log_error")
+
+
+@pytest.fixture
+def log_check_mock(mocker):
+    return mocker.patch("lemoncheesecake.matching.operations.log_check")
+
+
+@pytest.fixture
+def prepare_image_attachment_mock(mocker):
+    return mocker.patch("lemoncheesecake.api.prepare_image_attachment")
+
+
+@pytest.fixture
+def preserve_selection_settings():
+    orig_screenshot_on_exceptions = Selection.screenshot_on_exceptions
+    orig_screenshot_on_failed_checks = Selection.screenshot_on_failed_checks
+    yield
+    Selection.screenshot_on_exceptions = orig_screenshot_on_exceptions
+    Selection.screenshot_on_failed_checks = orig_screenshot_on_failed_checks
+
+
+def test_no_driver():
+    with pytest.raises(ValueError):
+        MultiSelector({})
+
+
+def test_click(selector, drivers, log_info_mock):
+    threads = set()
+    for driver in drivers.values():
+        driver.find_element.return_value.click.side_effect = lambda: threads.add(threading.current_thread())
+    selector.by_id("foo").click()
+
+    for driver in drivers.values():
+        driver.find_element.return_value.click.assert_called_once()
+    assert threading.current_thread() not in threads
+    log_info_mock.assert_called_once_with("Click on element identified by id 'foo' on chrome, firefox")
+
+
+def test_set_text(selector, drivers, log_info_mock):
+    selector.by_id("foo").set_text("bar")
+    for driver in drivers.values():
+        driver.find_element.return_value.send_keys.assert_called_once_with("bar")
+    log_info_mock.assert_called_once()
+
+
+def test_select(selector, drivers, log_info_mock, mocker):
+    select_mock = mocker.patch("lemoncheesecake_selenium.selection.Select")
+    selector.by_id("foo").select_by_value("bar")
+    assert select_mock.return_value.select_by_value.call_count == 2
+    log_info_mock.assert_called_once_with(
+        "Select by value 'bar' the element identified by id 'foo' on chrome, firefox"
+    )
+
+
+@pytest.mark.usefixtures("preserve_selection_settings")
+def test_action_failure(selector, drivers, log_info_mock, log_error_mock, prepare_image_attachment_mock):
+    Selection.screenshot_on_exceptions = True
+    drivers["firefox"].find_element.return_value.click.side_effect = WebDriverException("boom")
+    with pytest.raises(WebDriverException):
+        selector.by_id("foo").click()
+
+    drivers["chrome"].find_element.return_value.click.assert_called_once()
+    log_error_mock.assert_called_once_with(Contains("failed on firefox"))
+    prepare_image_attachment_mock.assert_called_once()
+    drivers["firefox"].save_screenshot.assert_called_once()
+    drivers["chrome"].save_screenshot.assert_not_called()
+
+
+def test_check_element(selector, drivers, log_check_mock):
+    drivers["chrome"].find_element.return_value.text = "bar"
+    drivers["firefox"].find_element.return_value.text = "bar"
+    selector.by_id("foo").check_element(has_text("bar"))
+    log_check_mock.assert_called_once_with(
+        "Expect element identified by id 'foo' on chrome, firefox to have text that is equal to \"bar\"", True,
+        "Chrome: OK (got \"bar\"); firefox: OK (got \"bar\")"
+    )
+
+
+@pytest.mark.usefixtures("preserve_selection_settings")
+def test_check_element_failure(selector, drivers, log_check_mock, prepare_image_attachment_mock):
+    Selection.screenshot_on_failed_checks = True
+    drivers["chrome"].find_element.return_value.text = "bar"
+    drivers["firefox"].find_element.side_effect = NoSuchElementException()
+    selector.by_id("foo").check_element(has_text("bar"))
+
+    log_check_mock.assert_called_once_with(
+        Contains("to have text"), False,
+        "Chrome: OK (got \"bar\"); firefox: KO (Could not find element identified by id 'foo')"
+    )
+    prepare_image_attachment_mock.assert_called_once()
+    drivers["firefox"].save_screenshot.assert_called_once()
+    drivers["chrome"].save_screenshot.assert_not_called()
+
+
+def test_check_no_element(selector, drivers, log_check_mock):
+    for driver in drivers.values():
+        driver.find_element.side_effect = NoSuchElementException()
+    selector.by_id("foo").check_no_element()
+    assert log_check_mock.call_args[0][1] is True
+
+
+def test_check_elements(selector, drivers, log_check_mock):
+    for driver in drivers.values():
+        driver.find_elements.return_value = [MagicMock(), MagicMock()]
+    selector.by_id("foo").check_elements(count_of(is_in_page(), 2))
+    assert log_check_mock.call_args[0][1] is True
+
+
+def test_in_frame(selector, drivers):
+    selection = selector.in_frame(selector.by_id("frame")).by_id("foo")
+    for name, driver in drivers.items():
+        assert selection.selections[name].driver is driver
+        assert str(selection.selections[name]) == "element identified by id 'foo' in frame identified by id 'frame'"
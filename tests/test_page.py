@@ -0,0 +1,123 @@
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as ec
+
+from lemoncheesecake_selenium import Page, Selection, by_id, by_css_selector, by_xpath, by_class_name
+from lemoncheesecake_selenium.page import Locator
+from lemoncheesecake_selenium.context import ContextEntry, FRAME, SHADOW
+
+
+class LoginPage(Page):
+    user = by_id("user")
+    password = by_css_selector("input[type='password']")
+    submit = by_xpath("//button[@type='submit']").must_be_waited_until(ec.element_to_be_clickable, timeout=5)
+
+
+def test_selection():
+    driver = MagicMock()
+    page = LoginPage(driver)
+    assert isinstance(page.user, Selection)
+    assert page.user.driver is driver
+    assert page.user.locator == (By.ID, "user")
+    assert page.user.context == ()
+
+
+def test_selection_is_bound_lazily_once():
+    page = LoginPage(MagicMock())
+    assert page._selections == {}
+    assert page.user is page.user
+    assert list(page._selections) == ["user"]
+
+
+def test_selection_per_page_instance():
+    assert LoginPage(MagicMock()).user is not LoginPage(MagicMock()).user
+
+
+def test_selection_with_wait():
+    page = LoginPage(MagicMock())
+    assert page.submit._expected_condition is ec.element_to_be_clickable
+    assert page.submit._expected_condition_timeout == 5
+
+
+def test_selection_read_only():
+    page = LoginPage(MagicMock())
+    with pytest.raises(AttributeError):
+        page.user = None
+
+
+def test_locator_class_access():
+    assert isinstance(LoginPage.user, Locator)
+
+
+def test_get_locators_and_selections():
+    page = LoginPage(MagicMock())
+    assert list(LoginPage.get_locators()) == ["user", "password", "submit"]
+    assert page.get_selections(["password"]) == [page.password]
+    assert len(page.get_selections()) == 3
+
+
+def test_inheritance():
+    class ExtendedLoginPage(LoginPage):
+        remember_me = by_id("remember-me")
+        submit = None
+
+    assert list(ExtendedLoginPage.get_locators()) == ["user", "password", "remember_me"]
+
+
+def test_context():
+    class MyPage(Page):
+        frame = by_id("frame")
+        host = by_css_selector("my-widget", in_frame=frame)
+        button = by_css_selector("button", in_shadow=host)
+
+    page = MyPage(MagicMock())
+    assert page.button.context == (
+        ContextEntry(FRAME, By.ID, "frame"), ContextEntry(SHADOW, By.CSS_SELECTOR, "my-widget")
+    )
+
+
+def test_selection_attributes_are_slots():
+    page = LoginPage(MagicMock())
+    # only the per-instance overrides of the class-level settings go into the instance dict
+    assert page.user.__dict__ == {}
+
+
+@pytest.mark.parametrize(
+    "locator", (
+        Locator("foo", "bar"),
+        by_id(""),
+        by_class_name("foo bar"),
+        by_css_selector("input[type='password'"),
+        by_css_selector("input[type='password]"),
+        by_xpath("//div[@id='foo']]"),
+    )
+)
+def test_invalid_locator(locator):
+    with pytest.raises(ValueError, match="Invalid locator MyPage.elem"):
+        type("MyPage", (Page,), {"elem": locator})
+
+
+def test_invalid_locator_frame_and_shadow():
+    frame = by_id("frame")
+    with pytest.raises(ValueError):
+        type("MyPage", (Page,), {"frame": frame, "elem": Locator(By.ID, "x", in_frame=frame, in_shadow=frame)})
+
+
+def test_prefetch_selections():
+    class MyPage(Page):
+        prefetch_selections = ("user",)
+        user = by_id("user")
+
+    driver = MagicMock()
+    driver.execute_script.return_value = [{"element": "elem", "data": {}}]
+    page = MyPage(driver)
+    page.prefetch()
+    assert driver.execute_script.call_args[0][1] == [[("css selector", '[id="user"]')]]
+    assert page.user.element == "elem"
+
+
+def test_invalid_prefetch_selections():
+    with pytest.raises(ValueError, match="MyPage.missing"):
+        type("MyPage", (Page,), {"prefetch_selections": ("missing",)})
@@ -0,0 +1,143 @@
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.support import expected_conditions as ec
+
+from lemoncheesecake_selenium import Selector, has_text, is_displayed, is_in_viewport, looks_like
+from lemoncheesecake_selenium.prefetch import prefetch_selections, invalidate_prefetch
+
+
+@pytest.fixture
+def log_check_mock(mocker):
+    return mocker.patch("lemoncheesecake.matching.operations.log_check")
+
+
+def _make_driver(*results):
+    driver = MagicMock()
+    driver.execute_script.return_value = list(results)
+    return driver
+
+
+def test_prefetch_script_arguments():
+    driver = _make_driver(None, None, None)
+    selector = Selector(driver)
+    host = selector.by_id("host")
+    frame = selector.by_id("frame")
+    prefetch_selections(driver, [
+        selector.by_id("foo"),
+        selector.in_shadow(host).by_css_selector("input"),
+        selector.in_frame(frame).by_name("bar"),
+    ], ["text"])
+
+    assert driver.execute_script.call_count == 2
+    locators, fields = driver.execute_script.call_args_list[0][0][1:]
+    assert locators == [
+        [("css selector", '[id="foo"]')],
+        [("css selector", '[id="host"]'), ("css selector", "input")],
+    ]
+    assert fields == ["text"]
+    assert driver.execute_script.call_args_list[1][0][1] == [[("css selector", '[name="bar"]')]]
+    driver.switch_to.frame.assert_called_once()
+
+
+def test_element_from_prefetch():
+    element = MagicMock()
+    driver = _make_driver({"element": element, "data": {"text": "bar"}})
+    selection = Selector(driver).by_id("foo")
+    Selector(driver).prefetch(selection)
+    assert selection.element is element
+    driver.find_element.assert_not_called()
+
+
+def test_element_not_prefetched():
+    driver = _make_driver(None)
+    selection = Selector(driver).by_id("foo")
+    Selector(driver).prefetch(selection)
+    assert selection.element is driver.find_element.return_value
+
+
+def test_element_with_explicit_wait():
+    driver = _make_driver({"element": MagicMock(), "data": {}})
+    selection = Selector(driver).by_id("foo").must_be_waited_until(ec.presence_of_element_located)
+    Selector(driver).prefetch(selection)
+    assert selection.element is driver.find_element.return_value
+
+
+def test_check_from_prefetch(log_check_mock):
+    element = MagicMock()
+    element.text = "not from prefetch"
+    driver = _make_driver({"element": element, "data": {"text": "bar", "displayed": True}})
+    driver.find_element.side_effect = NoSuchElementException()
+    selection = Selector(driver).by_id("foo")
+    Selector(driver).prefetch(selection)
+
+    selection.check_element(has_text("bar"))
+    assert log_check_mock.call_args[0][1] is True
+    selection.check_element(is_displayed())
+    assert log_check_mock.call_args[0][1] is True
+    element.is_displayed.assert_not_called()
+
+
+def test_check_from_prefetch_with_layout_fields(log_check_mock):
+    element = MagicMock()
+    driver = _make_driver({"element": element, "data": {"text": "bar"}})
+    selection = Selector(driver).by_id("foo")
+    Selector(driver).prefetch(selection)
+
+    driver.execute_script.return_value = [{"in_viewport": True}]
+    selection.check_element(is_in_viewport())
+    assert log_check_mock.call_args[0][1] is True
+    assert driver.execute_script.call_args[0][1:] == ([element], ["in_viewport"])
+    driver.find_element.assert_not_called()
+
+
+def test_check_not_supporting_snapshots(mocker, log_check_mock):
+    element = MagicMock()
+    driver = _make_driver({"element": element, "data": {}})
+    selection = Selector(driver).by_id("foo")
+    Selector(driver).prefetch(selection)
+    matcher = looks_like("baseline.png")
+    matches_mock = mocker.patch.object(type(matcher), "matches")
+    selection.check_element(matcher)
+    matches_mock.assert_called_once_with(element)
+
+
+def test_invalidated_by_action(mocker):
+    mocker.patch("lemoncheesecake.api.log_info")
+    element = MagicMock()
+    driver = _make_driver({"element": element, "data": {}})
+    selection = Selector(driver).by_id("foo")
+    Selector(driver).prefetch(selection)
+
+    selection.click()
+    element.click.assert_called_once()
+    assert selection.element is driver.find_element.return_value
+
+
+def test_invalidate_prefetch():
+    driver = _make_driver({"element": MagicMock(), "data": {}})
+    selection = Selector(driver).by_id("foo")
+    Selector(driver).prefetch(selection)
+    invalidate_prefetch(driver)
+    assert selection.element is driver.find_element.return_value
+
+
+def test_element_from_prefetch_in_frames():
+    element_a, element_b = MagicMock(), MagicMock()
+    driver = MagicMock()
+    driver.execute_script.side_effect = [
+        [{"element": element_a, "data": {}}], [{"element": element_b, "data": {}}]
+    ]
+    frame_a, frame_b = MagicMock(), MagicMock()
+    driver.find_element.side_effect = lambda by, value: frame_a if "frame_a" in value else frame_b
+    selector = Selector(driver)
+    selection_a = selector.in_frame(selector.by_id("frame_a")).by_id("foo")
+    selection_b = selector.in_frame(selector.by_id("frame_b")).by_id("foo")
+    selector.prefetch(selection_a, selection_b)
+    driver.switch_to.frame.assert_called_with(frame_b)
+
+    assert selection_a.element is element_a
+    driver.switch_to.frame.assert_called_with(frame_a)
+    assert selection_b.element is element_b
+    driver.switch_to.frame.assert_called_with(frame_b)
@@ -0,0 +1,110 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from callee import Contains
+
+from lemoncheesecake_selenium import Selector, Profiler
+from lemoncheesecake_selenium.instrumentation import step
+from lemoncheesecake_selenium.profiler import PYTHON_PHASE
+
+
+@pytest.fixture
+def profiler():
+    with Profiler() as profiler:
+        yield profiler
+
+
+def _read_stacks(profiler, tmp_path):
+    path = tmp_path / "profile.collapsed"
+    profiler.write_collapsed_stacks(str(path))
+    stacks = {}
+    for line in path.read_text().splitlines():
+        stack, value = line.rsplit(" ", 1)
+        stacks[stack] = int(value)
+    return stacks
+
+
+def test_collapsed_stacks(profiler, tmp_path):
+    with profiler.profile_test("suite.test"):
+        with step("click"):
+            with step("find"):
+                time.sleep(0.01)
+
+    stacks = _read_stacks(profiler, tmp_path)
+    assert set(stacks) == {"suite.test", "suite.test;click", "suite.test;click;find"}
+    assert stacks["suite.test;click;find"] >= 10000
+
+
+def test_frame_escaping(profiler, tmp_path):
+    driver = MagicMock()
+    with profiler.profile_test("test"):
+        Selector(driver).by_css_selector("a;b").element  # noqa
+
+    assert "test;find element identified by CSS selector 'a,b'" in _read_stacks(profiler, tmp_path)
+
+
+def test_step_outside_test(profiler, tmp_path):
+    with step("click"):
+        pass
+    assert list(_read_stacks(profiler, tmp_path)) == ["<no test>;click"]
+
+
+def test_phases(profiler):
+    with profiler.profile_test("test"):
+        with step("wait"):
+            time.sleep(0.01)
+        time.sleep(0.01)
+
+    phases = profiler.phases["test"]
+    assert set(phases) == {"wait", PYTHON_PHASE}
+    assert phases["wait"] >= 0.01
+    assert phases[PYTHON_PHASE] >= 0.01
+
+
+def test_get_slowest_steps(profiler):
+    driver = MagicMock()
+    selector = Selector(driver)
+    with profiler.profile_test("test"):
+        for _ in range(3):
+            selector.by_id("fast").element  # noqa
+        driver.find_element.side_effect = lambda *_: time.sleep(0.01)
+        selector.by_id("slow").element  # noqa
+
+    slowest = profiler.get_slowest_steps()
+    assert [(label, count) for label, count, _, _ in slowest] == [
+        ("find element identified by id 'slow'", 1),
+        ("find element identified by id 'fast'", 3),
+    ]
+    assert len(profiler.get_slowest_steps(limit=1)) == 1
+
+
+def test_disable():
+    profiler = Profiler()
+    profiler.enable()
+    profiler.disable()
+    with step("click"):
+        pass
+    assert profiler.get_slowest_steps() == []
+
+
+def test_format_report(profiler):
+    with profiler.profile_test("my_test"):
+        with step("click"):
+            pass
+    report = profiler.format_report()
+    assert "Slowest actions / locators" in report
+    assert "my_test" in report
+    assert "click" in report
+
+
+def test_save_report(profiler, mocker, tmp_path):
+    prepare_attachment_mock = mocker.patch("lemoncheesecake.api.prepare_attachment")
+    prepare_attachment_mock.return_value.__enter__.return_value = str(tmp_path / "profile.collapsed")
+    save_attachment_content_mock = mocker.patch("lemoncheesecake.api.save_attachment_content")
+    with profiler.profile_test("my_test"):
+        pass
+    profiler.save_report()
+    prepare_attachment_mock.assert_called_with("profile.collapsed", Contains("collapsed stacks"))
+    save_attachment_content_mock.assert_called_with(Contains("my_test"), "profile.txt", "Profiling report")
+    assert (tmp_path / "profile.collapsed").read_text().startswith("my_test ")
@@ -0,0 +1,143 @@
+import os
+import json
+
+import pytest
+from selenium.common.exceptions import WebDriverException, NoSuchElementException
+from selenium.webdriver.common.options import ArgOptions
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from lemoncheesecake_selenium import Selector, TraceRecorder, ReplayDriver
+from lemoncheesecake_selenium.recording import ReplayError, read_trace, count_commands, diff_command_counts
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+SCREENSHOT = "iVBORw0KGgo" * 1000
+
+
+class FakeCommandExecutor:
+    def __init__(self):
+        self.commands = []
+
+    def execute(self, command, params):
+        self.commands.append(command)
+        if command == "newSession":
+            return {"value": {"sessionId": "session", "capabilities": {"browserName": "fake"}}}
+        if command == "findElement":
+            if "missing" in params["value"]:
+                return {"status": 404, "value": json.dumps({"value": {"error": "no such element", "message": "not found"}})}
+            return {"value": {ELEMENT_KEY: "element-1"}}
+        if command == "getElementText":
+            return {"value": "some text"}
+        if command == "screenshot":
+            return {"value": SCREENSHOT}
+        return {"value": None}
+
+
+def _run_scenario(driver):
+    selector = Selector(driver)
+    text = selector.by_id("value").element.text
+    with pytest.raises(NoSuchElementException):
+        selector.by_id("missing").element  # noqa
+    screenshot = driver.get_screenshot_as_base64()
+    return text, screenshot
+
+
+@pytest.fixture
+def trace_path(tmp_path):
+    path = str(tmp_path / "test.trace.gz")
+    driver = WebDriver(command_executor=FakeCommandExecutor(), options=ArgOptions())
+    with TraceRecorder(path, blob_threshold=1000).attach(driver):
+        assert _run_scenario(driver) == ("some text", SCREENSHOT)
+    return path
+
+
+def test_record(trace_path):
+    records = list(read_trace(trace_path))
+    assert records[0]["type"] == "session"
+    assert records[0]["session_id"] == "session"
+    assert [r["command"] for r in records[1:]] == ["findElement", "getElementText", "findElement", "screenshot"]
+    assert records[1]["params"] == {"using": "css selector", "value": '[id="value"]', "sessionId": "session"}
+    assert records[1]["duration"] >= 0
+    assert records[4]["response"]["value"] == SCREENSHOT
+
+
+def test_record_blobs(trace_path):
+    assert len(os.listdir(trace_path + ".blobs")) == 1
+    with open(trace_path, "rb") as fh:
+        assert SCREENSHOT.encode() not in fh.read()
+
+
+def test_record_detach(tmp_path):
+    executor = FakeCommandExecutor()
+    driver = WebDriver(command_executor=executor, options=ArgOptions())
+    recorder = TraceRecorder(str(tmp_path / "test.trace.gz"))
+    recorder.attach(driver)
+    recorder.detach()
+    driver.title  # noqa
+    assert len(list(read_trace(recorder.path))) == 1
+    assert executor.commands[-1] == "getTitle"
+
+
+def test_replay(trace_path):
+    driver = ReplayDriver(trace_path)
+    assert driver.session_id == "session"
+    assert driver.caps == {"browserName": "fake"}
+    assert _run_scenario(driver) == ("some text", SCREENSHOT)
+    assert driver.command_count == 4
+
+
+def test_replay_element(trace_path):
+    driver = ReplayDriver(trace_path)
+    element = Selector(driver).by_id("value").element
+    assert isinstance(element, WebElement)
+    assert element.id == "element-1"
+
+
+def test_replay_command_mismatch(trace_path):
+    driver = ReplayDriver(trace_path)
+    with pytest.raises(ReplayError, match="mismatch"):
+        driver.title  # noqa
+
+
+def test_replay_strict_params_mismatch(trace_path):
+    driver = ReplayDriver(trace_path, strict=True)
+    with pytest.raises(ReplayError, match="parameters mismatch"):
+        Selector(driver).by_id("other").element  # noqa
+
+
+def test_replay_exhausted(trace_path):
+    driver = ReplayDriver(trace_path)
+    _run_scenario(driver)
+    with pytest.raises(ReplayError, match="exhausted"):
+        driver.title  # noqa
+
+
+def test_replay_recorded_error(tmp_path):
+    class FailingExecutor(FakeCommandExecutor):
+        def execute(self, command, params):
+            if command == "getTitle":
+                raise WebDriverException("connection lost")
+            return super().execute(command, params)
+
+    path = str(tmp_path / "test.trace.gz")
+    driver = WebDriver(command_executor=FailingExecutor(), options=ArgOptions())
+    with TraceRecorder(path).attach(driver):
+        with pytest.raises(WebDriverException):
+            driver.title  # noqa
+
+    with pytest.raises(WebDriverException, match="connection lost"):
+        ReplayDriver(path).title  # noqa
+
+
+def test_count_commands(trace_path):
+    assert count_commands(trace_path) == {"findElement": 2, "getElementText": 1, "screenshot": 1}
+
+
+def test_diff_command_counts(trace_path, tmp_path):
+    other_path = str(tmp_path / "other.trace.gz")
+    driver = WebDriver(command_executor=FakeCommandExecutor(), options=ArgOptions())
+    with TraceRecorder(other_path).attach(driver):
+        Selector(driver).by_id("value").element  # noqa
+    assert diff_command_counts(trace_path, other_path) == {
+        "findElement": (2, 1), "getElementText": (1, 0), "screenshot": (1, 0)
+    }
@@ -0,0 +1,170 @@
+import json
+import threading
+
+import pytest
+from lemoncheesecake.suite.core import Suite, Test as LccTest
+
+from lemoncheesecake_selenium import DurationScheduler
+from lemoncheesecake_selenium.instrumentation import Step
+
+
+def _make_step(duration):
+    step = Step("click")
+    step.start, step.end = 0.0, duration
+    return step
+
+
+def _make_suite(name, test_names, sub_suites=()):
+    suite = Suite(None, name, name)
+    for test_name in test_names:
+        suite.add_test(LccTest(test_name, test_name, lambda: None))
+    for sub_suite in sub_suites:
+        suite.add_suite(sub_suite)
+    return suite
+
+
+def _make_scheduler(tmp_path, history=None, slots=2):
+    path = tmp_path / "durations.json"
+    if history is not None:
+        path.write_text(json.dumps({"tests": history}))
+    return DurationScheduler(str(path), slots=slots)
+
+
+def test_invalid_slots(tmp_path):
+    with pytest.raises(ValueError):
+        _make_scheduler(tmp_path, slots=0)
+
+
+def test_record_test(tmp_path):
+    scheduler = _make_scheduler(tmp_path)
+    with scheduler.record_test("suite.test"):
+        outer = _make_step(2.0)
+        scheduler.on_step_start(outer)
+        inner = _make_step(1.5)
+        scheduler.on_step_start(inner)
+        scheduler.on_step_end(inner)
+        scheduler.on_step_end(outer)
+        step = _make_step(0.5)
+        scheduler.on_step_start(step)
+        scheduler.on_step_end(step)
+    # a step outside of any recorded test is ignored
+    scheduler.on_step_start(step)
+    scheduler.on_step_end(step)
+
+    assert scheduler.get_estimate("suite.test") == pytest.approx(2.5)
+    assert scheduler.get_estimate("suite.other") is None
+    assert scheduler.actual_makespan is not None
+
+
+def test_save_load(tmp_path):
+    scheduler = _make_scheduler(tmp_path, {"suite.test": [1.0, 5.0, 2.0]})
+    with scheduler.record_test("suite.other"):
+        pass
+    scheduler.save()
+
+    scheduler = _make_scheduler(tmp_path)
+    assert scheduler.get_estimate("suite.test") == 2.0
+    assert scheduler.get_estimate("suite.other") == 0.0
+
+
+def test_max_samples(tmp_path):
+    scheduler = DurationScheduler(str(tmp_path / "durations.json"), slots=1, max_samples=2)
+    for duration in (10.0, 1.0, 1.0):
+        with scheduler.record_test("suite.test"):
+            step = _make_step(duration)
+            scheduler.on_step_start(step)
+            scheduler.on_step_end(step)
+    assert scheduler.get_estimate("suite.test") == 1.0
+
+
+def test_plan(tmp_path):
+    scheduler = _make_scheduler(tmp_path, {"a": [7], "b": [5], "c": [4], "d": [3], "e": [3]})
+    assert scheduler.plan(["a", "b", "c", "d", "e"]) == [["a", "d"], ["b", "c", "e"]]
+    assert scheduler.predict_makespan(["a", "b", "c", "d", "e"]) == 12
+
+
+def test_plan_unknown_test(tmp_path):
+    scheduler = _make_scheduler(tmp_path, {"a": [6], "b": [2]})
+    # an unknown test is assumed to be an average test
+    assert scheduler.predict_makespan(["a", "b", "c"]) == 6
+
+
+def test_predict_makespan_no_test(tmp_path):
+    assert _make_scheduler(tmp_path).predict_makespan([]) == 0.0
+
+
+def test_order_suites(tmp_path):
+    scheduler = _make_scheduler(tmp_path, {
+        "short.fast": [1], "short.slow": [2],
+        "long.fast": [1], "long.sub.slow": [10],
+    })
+    short = _make_suite("short", ["fast", "slow"])
+    long = _make_suite("long", ["fast"], [_make_suite("sub", ["slow"]), _make_suite("empty", [])])
+
+    suites = scheduler.order_suites([short, long])
+    assert suites == [long, short]
+    assert [test.name for test in short.get_tests()] == ["slow", "fast"]
+    assert [suite.name for suite in long.get_suites()] == ["sub", "empty"]
+    assert scheduler.predicted_makespan == 10
+
+
+def test_order_suites_predicts_the_run_order(tmp_path):
+    scheduler = _make_scheduler(tmp_path, {"a.x": [3], "a.y": [3], "b.z": [5]})
+    a, b = _make_suite("a", ["x", "y"]), _make_suite("b", ["z"])
+    assert scheduler.order_suites([b, a]) == [a, b]
+    # the tests of "a" are run first, "b.z" then starts once one of them is done
+    assert scheduler.plan(["a.x", "a.y", "b.z"]) == [["a.x", "b.z"], ["a.y"]]
+    assert scheduler.predicted_makespan == 8
+
+
+def test_save_report(tmp_path, mocker):
+    add_report_info_mock = mocker.patch("lemoncheesecake.api.add_report_info")
+    scheduler = _make_scheduler(tmp_path, {"suite.test": [3]})
+    scheduler.order_suites([_make_suite("suite", ["test"])])
+    with scheduler.record_test("suite.test"):
+        pass
+    scheduler.save_report()
+    assert add_report_info_mock.call_args_list[0][0] == ("Predicted makespan (browser time)", "3.0s over 2 slots")
+    assert add_report_info_mock.call_args_list[1][0] == ("Actual makespan (browser time)", "0.0s over 1 slots")
+    assert add_report_info_mock.call_args_list[2][0][0] == "Elapsed time of the tests (wall-clock)"
+
+
+def test_actual_makespan(tmp_path):
+    scheduler = _make_scheduler(tmp_path)
+    assert scheduler.actual_makespan is None
+    assert scheduler.elapsed_time is None
+
+    def run_test(name, duration):
+        with scheduler.record_test(name):
+            step = _make_step(duration)
+            scheduler.on_step_start(step)
+            scheduler.on_step_end(step)
+
+    run_test("suite.a", 1.0)
+    run_test("suite.b", 2.0)
+    thread = threading.Thread(target=run_test, args=("suite.c", 2.5))
+    thread.start()
+    thread.join()
+    # the actual makespan is the browser time of the busiest thread
+    assert scheduler.actual_makespan == pytest.approx(3.0)
+    assert scheduler.elapsed_time is not None
+
+
+def test_order_suites_unexpected_internals(tmp_path):
+    scheduler = _make_scheduler(tmp_path, {"suite.fast": [1], "suite.slow": [2]})
+    tests = list(_make_suite("suite", ["fast", "slow"]).get_tests())
+
+    class OtherSuite:
+        name = path = "suite"
+
+        def get_tests(self):
+            return list(tests)
+
+        def get_suites(self):
+            return []
+
+    other_suite = OtherSuite()
+    # the suite keeps its original order
+    assert scheduler.order_suites([other_suite]) == [other_suite]
+    assert [test.name for test in other_suite.get_tests()] == ["fast", "slow"]
+    assert scheduler.predicted_makespan == 2
@@ -0,0 +1,177 @@
+import io
+import json
+import base64
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+try:
+    from selenium.webdriver.remote.client_config import ClientConfig
+except ImportError:  # older selenium versions keep the connection settings in the RemoteConnection itself
+    ClientConfig = None
+
+from lemoncheesecake_selenium import instrumentation
+from lemoncheesecake_selenium.screenshot import decode_screenshot_response, write_screenshot
+
+
+PNG = bytes(range(256)) * 40
+
+
+def _split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", (1, 3, 7, 64, 100000))
+def test_decode_screenshot_response(chunk_size):
+    response = json.dumps({"value": base64.b64encode(PNG).decode()}).encode()
+    fh = io.BytesIO()
+    decode_screenshot_response(_split(response, chunk_size), fh)
+    assert fh.getvalue() == PNG
+
+
+@pytest.mark.parametrize("chunk_size", (1, 5, 1000))
+def test_decode_screenshot_response_with_escaped_slashes(chunk_size):
+    value = base64.b64encode(PNG).decode().replace("/", "\\/")
+    response = ('{"sessionId": "sid", "status": 0, "value" : "%s"}' % value).encode()
+    fh = io.BytesIO()
+    decode_screenshot_response(_split(response, chunk_size), fh)
+    assert fh.getvalue() == PNG
+
+
+def test_decode_screenshot_response_without_value():
+    with pytest.raises(ValueError):
+        decode_screenshot_response([b'{"value": null}'], io.BytesIO())
+
+
+def test_decode_screenshot_response_truncated():
+    with pytest.raises(ValueError):
+        decode_screenshot_response([b'{"value": "AAAA'], io.BytesIO())
+
+
+def test_decode_screenshot_response_invalid_base64():
+    with pytest.raises(ValueError):
+        decode_screenshot_response([b'{"value": "AAAAA"}'], io.BytesIO())
+
+
+def _make_executor(legacy=False):
+    if ClientConfig is None:
+        return RemoteConnection("http://localhost:4444", keep_alive=True)
+    executor = RemoteConnection(client_config=ClientConfig("http://localhost:4444"))
+    if legacy:
+        # emulate a RemoteConnection of a selenium version without ClientConfig
+        executor._client_config = None
+        executor._url = "http://localhost:4444"
+        executor.keep_alive = True
+    return executor
+
+
+def _make_driver(status=200, body=None, legacy=False):
+    executor = _make_executor(legacy)
+    response = MagicMock()
+    response.status = status
+    response.stream.return_value = _split(
+        body if body is not None else json.dumps({"value": base64.b64encode(PNG).decode()}).encode(), 1000
+    )
+    executor._conn = MagicMock()
+    executor._conn.request.return_value = response
+    driver = MagicMock()
+    driver.command_executor = executor
+    driver.session_id = "sid"
+    return driver
+
+
+def test_write_screenshot_streamed(tmp_path):
+    driver = _make_driver()
+    path = tmp_path / "screenshot.png"
+    write_screenshot(driver, str(path))
+    assert path.read_bytes() == PNG
+    driver.save_screenshot.assert_not_called()
+    args, kwargs = driver.command_executor._conn.request.call_args
+    assert args == ("GET", "http://localhost:4444/session/sid/screenshot")
+    assert kwargs["preload_content"] is False
+
+
+@pytest.mark.filterwarnings("ignore:get_timeout:DeprecationWarning")
+def test_write_screenshot_streamed_legacy_connection(tmp_path):
+    driver = _make_driver(legacy=True)
+    path = tmp_path / "screenshot.png"
+    write_screenshot(driver, str(path))
+    assert path.read_bytes() == PNG
+    driver.save_screenshot.assert_not_called()
+    args, kwargs = driver.command_executor._conn.request.call_args
+    assert args == ("GET", "http://localhost:4444/session/sid/screenshot")
+    assert kwargs["timeout"] == RemoteConnection.get_timeout()
+    assert kwargs["headers"]["Connection"] == "keep-alive"
+
+
+def test_write_screenshot_streamed_element(tmp_path):
+    driver = _make_driver()
+    element = MagicMock()
+    element.id = "elem"
+    path = tmp_path / "screenshot.png"
+    write_screenshot(driver, str(path), element)
+    assert path.read_bytes() == PNG
+    element.screenshot.assert_not_called()
+    args, _ = driver.command_executor._conn.request.call_args
+    assert args == ("GET", "http://localhost:4444/session/sid/element/elem/screenshot")
+
+
+def test_write_screenshot_error_response(tmp_path):
+    driver = _make_driver(status=404)
+    write_screenshot(driver, str(tmp_path / "screenshot.png"))
+    driver.save_screenshot.assert_called_once()
+
+
+def test_write_screenshot_invalid_response(tmp_path):
+    driver = _make_driver(body=b"{}")
+    write_screenshot(driver, str(tmp_path / "screenshot.png"))
+    driver.save_screenshot.assert_called_once()
+
+
+def test_write_screenshot_intercepted_executor(tmp_path):
+    driver = _make_driver()
+    driver.command_executor.execute = MagicMock()
+    write_screenshot(driver, str(tmp_path / "screenshot.png"))
+    driver.save_screenshot.assert_called_once()
+
+
+@pytest.mark.parametrize("exception", [ConnectionResetError(), AttributeError("_conn")])
+def test_write_screenshot_streaming_error(tmp_path, exception):
+    driver = _make_driver()
+    driver.command_executor._conn.request.side_effect = exception
+    write_screenshot(driver, str(tmp_path / "screenshot.png"))
+    driver.save_screenshot.assert_called_once()
+
+
+@pytest.mark.skipif(ClientConfig is None, reason="this selenium version has no ClientConfig")
+def test_write_screenshot_unexpected_executor_internals(tmp_path):
+    driver = _make_driver()
+    del driver.command_executor._client_config._remote_server_addr
+    write_screenshot(driver, str(tmp_path / "screenshot.png"))
+    driver.save_screenshot.assert_called_once()
+
+
+def test_write_screenshot_fallback():
+    driver = MagicMock()
+    write_screenshot(driver, "/some/path")
+    driver.save_screenshot.assert_called_with("/some/path")
+
+
+def test_write_screenshot_fallback_element():
+    element = MagicMock()
+    write_screenshot(MagicMock(), "/some/path", element)
+    element.screenshot.assert_called_with("/some/path")
+
+
+def test_write_screenshot_instrumented(tmp_path):
+    driver = _make_driver()
+    driver._lcc_instrumented = True
+    steps = []
+
+    class Recorder(instrumentation.Listener):
+        def on_step_end(self, step):
+            steps.append(step)
+
+    with Recorder():
+        write_screenshot(driver, str(tmp_path / "screenshot.png"))
+    assert [(step.kind, step.details) for step in steps] == [("command", {"command": "screenshot"})]
@@ -1,12 +1,15 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, patch, ANY
 from callee import StartsWith, Any, Contains
 
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import WebDriverException, NoSuchElementException, TimeoutException
 import lemoncheesecake.api as lcc
+from lemoncheesecake.matching import all_of
 from lemoncheesecake.matching.matcher import MatchResult
-from lemoncheesecake_selenium import Selector, Selection
+from lemoncheesecake_selenium import Selector, Selection, has_text, each, any_, count_of, has_row, has_css, \
+    is_not_obscured
+from lemoncheesecake_selenium.selection import _APPEND_VALUE_SCRIPT
 
 from helpers import MyMatcher
 
@@ -39,10 +42,16 @@ def preserve_selection_settings():
     orig_default_timeout = Selection.default_timeout
     orig_screenshot_on_exceptions = Selection.screenshot_on_exceptions
     orig_screenshot_on_failed_checks = Selection.screenshot_on_failed_checks
+    orig_input_strategy = Selection.input_strategy
+    orig_page_source_on_failed_checks = Selection.page_source_on_failed_checks
+    orig_page_source_max_size = Selection.page_source_max_size
     yield
     Selection.default_timeout = orig_default_timeout
     Selection.screenshot_on_exceptions = orig_screenshot_on_exceptions
     Selection.screenshot_on_failed_checks = orig_screenshot_on_failed_checks
+    Selection.input_strategy = orig_input_strategy
+    Selection.page_source_on_failed_checks = orig_page_source_on_failed_checks
+    Selection.page_source_max_size = orig_page_source_max_size
 
 
 def test_element():
@@ -127,6 +136,58 @@ def test_set_text_failure(log_info_mock):
         selection.set_text("content")
 
 
+def test_set_text_script(log_info_mock):
+    mock = MagicMock()
+    mock.execute_script.return_value = True
+    selection = Selector(mock).by_id("value")
+    selection.set_text("content", strategy="script")
+    mock.execute_script.assert_called_once_with(ANY, mock.find_element.return_value, "content", True)
+    mock.find_element.return_value.send_keys.assert_not_called()
+    log_info_mock.assert_called_with(StartsWith("Set text"))
+
+
+def test_set_text_script_not_a_text_field(log_info_mock):
+    mock = MagicMock()
+    mock.execute_script.return_value = False
+    selection = Selector(mock).by_id("value")
+    selection.set_text("/tmp/file.txt", strategy="script")
+    mock.find_element.return_value.send_keys.assert_called_once_with("/tmp/file.txt")
+
+
+def test_set_text_script_text_field_types():
+    # the value of the other input types is not a plain concatenation of the typed characters
+    for input_type in ("text", "search", "email", "url", "tel", "password"):
+        assert f'"{input_type}"' in _APPEND_VALUE_SCRIPT
+    for input_type in ("date", "number", "color", "range", "file"):
+        assert f'"{input_type}"' not in _APPEND_VALUE_SCRIPT
+    assert "isContentEditable" not in _APPEND_VALUE_SCRIPT
+
+
+@pytest.mark.usefixtures("preserve_selection_settings")
+def test_set_text_hybrid(log_info_mock):
+    Selection.input_strategy = "hybrid"
+    mock = MagicMock()
+    mock.execute_script.return_value = True
+    selection = Selector(mock).by_id("value")
+    selection.set_text("some content")
+    mock.execute_script.assert_called_once_with(ANY, mock.find_element.return_value, "some cont", False)
+    mock.find_element.return_value.send_keys.assert_called_once_with("ent")
+
+
+def test_set_text_hybrid_short_text(log_info_mock):
+    mock = MagicMock()
+    selection = Selector(mock).by_id("value")
+    selection.set_text("abc", strategy="hybrid")
+    mock.execute_script.assert_not_called()
+    mock.find_element.return_value.send_keys.assert_called_once_with("abc")
+
+
+def test_set_text_invalid_strategy():
+    selection = Selector(MagicMock()).by_id("value")
+    with pytest.raises(ValueError):
+        selection.set_text("content", strategy="paste")
+
+
 def test_clear(log_info_mock):
     mock = MagicMock()
     selector = Selector(mock)
@@ -224,6 +285,17 @@ def test_check_element_failure_match(log_check_mock):
     assert matcher.actual is FAKE_WEB_ELEMENT
 
 
+def test_check_element_layout(log_check_mock):
+    mock = MagicMock()
+    mock.execute_script.return_value = [{"css:color": "red", "not_obscured": True}]
+    selector = Selector(mock)
+    selection = selector.by_id("value")
+    selection.check_element(all_of(has_css("color", "red"), is_not_obscured()))
+    log_check_mock.assert_called_with(Any(), True, Any())
+    mock.execute_script.assert_called_once_with(ANY, [mock.find_element.return_value], ["css:color", "not_obscured"])
+    mock.find_element.return_value.value_of_css_property.assert_not_called()
+
+
 def test_check_element_failure_not_found(log_check_mock):
     mock = MagicMock()
     mock.find_element.side_effect = NoSuchElementException()
@@ -382,6 +454,7 @@ def test_with_must_be_waited_until_not_failure():
         lambda s: s.click(),
         lambda s: s.clear(),
         lambda s: s.set_text("foo"),
+        lambda s: s.set_text("foo", strategy="script"),
         lambda s: s.select_by_value("foo"),
         lambda s: s.select_by_index(1),
         lambda s: s.select_by_visible_text("foo"),
@@ -403,6 +476,20 @@ def test_screenshot_on_exception(log_info_mock, prepare_image_attachment_mock, a
     prepare_image_attachment_mock.assert_called()
 
 
+def test_per_instance_settings(log_info_mock, prepare_image_attachment_mock):
+    driver_mock = MagicMock()
+    driver_mock.find_element.side_effect = WebDriverException()
+    selection = Selector(driver_mock).by_id("value")
+    selection.screenshot_on_exceptions = True
+    selection.default_timeout = 30
+    assert Selection.screenshot_on_exceptions is False
+    assert Selection.default_timeout == 10
+    assert selection.must_be_waited_until(MagicMock())._get_timeout() == 30
+    with pytest.raises(WebDriverException):
+        selection.click()
+    prepare_image_attachment_mock.assert_called()
+
+
 def test_save_screenshot(prepare_image_attachment_mock):
     mock = MagicMock()
     selector = Selector(mock)
@@ -441,3 +528,139 @@ def test_save_screenshot_exception_raised_by_screenshot(prepare_image_attachment
     selection = selector.by_id("value")
     with pytest.raises(WebDriverException):
         selection.save_screenshot()
+
+
+@pytest.mark.usefixtures("preserve_selection_settings")
+def test_check_element_failure_with_page_source(log_check_mock, mocker):
+    save_page_source_mock = mocker.patch("lemoncheesecake_selenium.selection.save_page_source")
+    Selection.page_source_on_failed_checks = True
+    Selection.page_source_max_size = 1000
+    mock = MagicMock()
+    mock.find_element.return_value = FAKE_WEB_ELEMENT
+    selection = Selector(mock).by_id("value")
+    selection.check_element(MyMatcher(result=MatchResult.failure("boom")))
+    save_page_source_mock.assert_called_once_with(
+        mock, "Expect element identified by id 'value' to be here: boom", element=FAKE_WEB_ELEMENT, max_size=1000
+    )
+
+
+def test_save_page_source_element_not_found(mocker):
+    save_page_source_mock = mocker.patch("lemoncheesecake_selenium.selection.save_page_source")
+    mock = MagicMock()
+    mock.find_element.side_effect = NoSuchElementException()
+    Selector(mock).by_id("value").save_page_source()
+    save_page_source_mock.assert_called_once_with(
+        mock, "Page source of element identified by id 'value'", element=None, max_size=None
+    )
+
+
+def test_check_elements_success(log_check_mock):
+    mock = MagicMock()
+    mock.find_elements.return_value = [object(), object()]
+    mock.execute_script.return_value = [{"text": "foo"}, {"text": "foo"}]
+    selector = Selector(mock)
+    selection = selector.by_css_selector("li")
+    selection.check_elements(each(has_text("foo")))
+    log_check_mock.assert_called_with(
+        "Expect element identified by CSS selector 'li' to have elements that each has text that is equal to \"foo\"",
+        True, Any()
+    )
+    mock.execute_script.assert_called_once()
+
+
+def test_check_elements_failure(log_check_mock):
+    mock = MagicMock()
+    mock.find_elements.return_value = [object(), object()]
+    mock.execute_script.return_value = [{"text": "foo"}, {"text": "bar"}]
+    selector = Selector(mock)
+    selection = selector.by_css_selector("li")
+    selection.check_elements(each(has_text("foo")))
+    log_check_mock.assert_called_with(Any(), False, Contains("at index 1"))
+
+
+def test_check_elements_without_snapshot_support(log_check_mock):
+    mock = MagicMock()
+    mock.find_elements.return_value = [FAKE_WEB_ELEMENT]
+    selector = Selector(mock)
+    selection = selector.by_css_selector("li")
+    matcher = MyMatcher()
+    selection.check_elements(each(matcher))
+    mock.execute_script.assert_not_called()
+    assert matcher.actual is FAKE_WEB_ELEMENT
+
+
+def test_require_elements(log_check_mock):
+    mock = MagicMock()
+    mock.find_elements.return_value = []
+    selector = Selector(mock)
+    with pytest.raises(lcc.AbortTest):
+        selector.by_css_selector("li").require_elements(any_(has_text("foo")))
+
+
+def test_assert_elements(log_check_mock):
+    mock = MagicMock()
+    mock.find_elements.return_value = []
+    selector = Selector(mock)
+    selector.by_css_selector("li").assert_elements(count_of(has_text("foo"), 0))
+    log_check_mock.assert_not_called()
+
+
+def test_iter_elements():
+    mock = MagicMock()
+    mock.execute_script.return_value = {"elements": [FAKE_WEB_ELEMENT], "snapshots": None, "total": 1}
+    selector = Selector(mock)
+    assert list(selector.by_css_selector("li").iter_elements(chunk_size=10)) == [FAKE_WEB_ELEMENT]
+    assert mock.execute_script.call_args[0][1:3] == ("css selector", "li")
+
+
+def test_iter_elements_in_shadow_root():
+    mock = MagicMock()
+    mock.execute_script.return_value = {"elements": [], "snapshots": None, "total": 0}
+    selector = Selector(mock)
+    host = mock.find_element.return_value
+    list(selector.in_shadow(selector.by_id("host")).by_css_selector("li").iter_elements())
+    mock.find_element.assert_called_with(By.ID, "host")
+    assert mock.execute_script.call_args[0][3] is host
+
+
+def test_as_table():
+    mock = MagicMock()
+    mock.execute_script.return_value = [["name"], ["apple"]]
+    selector = Selector(mock)
+    assert selector.by_id("table").as_table() == [{"name": "apple"}]
+    assert mock.execute_script.call_args[0][1] is mock.find_element.return_value
+
+
+def test_check_table(log_check_mock):
+    mock = MagicMock()
+    mock.execute_script.return_value = [["name"], ["apple"]]
+    selector = Selector(mock)
+    selector.by_id("table").check_table(has_row(name="banana"))
+    log_check_mock.assert_called_with(
+        "Expect element identified by id 'table' to have a row with 'name' that is equal to \"banana\"",
+        False, "Closest row is #0 which differs on 'name': 'apple'"
+    )
+
+
+def test_check_table_not_found(log_check_mock):
+    mock = MagicMock()
+    mock.find_element.side_effect = NoSuchElementException()
+    selector = Selector(mock)
+    selector.by_id("table").check_table(has_row(name="banana"))
+    log_check_mock.assert_called_with(Any(), False, Contains("Could not find"))
+
+
+def test_require_table(log_check_mock):
+    mock = MagicMock()
+    mock.execute_script.return_value = [["name"], ["apple"]]
+    selector = Selector(mock)
+    with pytest.raises(lcc.AbortTest):
+        selector.by_id("table").require_table(has_row(name="banana"))
+
+
+def test_assert_table(log_check_mock):
+    mock = MagicMock()
+    mock.execute_script.return_value = [["apple"]]
+    selector = Selector(mock)
+    selector.by_id("table").assert_table(has_row({0: "apple"}), header_row=False)
+    log_check_mock.assert_not_called()
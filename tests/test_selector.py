@@ -1,5 +1,9 @@
+from unittest.mock import MagicMock
+
 import pytest
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import StaleElementReferenceException, NoSuchElementException
+from selenium.webdriver.support import expected_conditions as ec
 
 from lemoncheesecake_selenium import Selector
 
@@ -34,3 +38,133 @@ def test_by(name, expected):
     assert selection.by == expected
     assert selection.value == "dummy"
     assert selection.driver is driver
+
+
+def test_in_frame():
+    driver = MagicMock()
+    selector = Selector(driver)
+    frame_selector = selector.in_frame(selector.by_id("frame"))
+    selection = frame_selector.by_id("value")
+    assert str(selection) == "element identified by id 'value' in frame identified by id 'frame'"
+    selection.element  # noqa
+    selection.element  # noqa
+    driver.switch_to.frame.assert_called_once()
+    driver.find_element.assert_called_with(By.ID, "value")
+
+
+def test_in_shadow():
+    driver = MagicMock()
+    selector = Selector(driver)
+    selection = selector.in_shadow(selector.by_css_selector("my-component")).by_css_selector("input")
+    assert str(selection) == \
+        "element identified by CSS selector 'input' in shadow root of element identified by CSS selector 'my-component'"
+    shadow_root = driver.find_element.return_value.shadow_root
+    assert selection.element is shadow_root.find_element.return_value
+    shadow_root.find_element.assert_called_once_with(By.CSS_SELECTOR, "input")
+
+
+def test_nested_contexts():
+    driver = MagicMock()
+    selector = Selector(driver)
+    frame_selector = selector.in_frame(selector.by_id("frame"))
+    shadow_selector = frame_selector.in_shadow(frame_selector.by_css_selector("my-component"))
+    selection = shadow_selector.by_css_selector("input")
+    assert [entry.value for entry in selection.context] == ["frame", "my-component"]
+    assert str(selection) == (
+        "element identified by CSS selector 'input' in shadow root of element identified by CSS selector "
+        "'my-component' in frame identified by id 'frame'"
+    )
+
+
+def test_stale_shadow_root():
+    driver = MagicMock()
+    selector = Selector(driver)
+    selection = selector.in_shadow(selector.by_css_selector("my-component")).by_css_selector("input")
+    stale_shadow_root = MagicMock()
+    stale_shadow_root.find_element.side_effect = StaleElementReferenceException()
+    fresh_shadow_root = MagicMock()
+    type(driver.find_element.return_value).shadow_root = \
+        property(MagicMock(side_effect=[stale_shadow_root, fresh_shadow_root]))
+    assert selection.element is fresh_shadow_root.find_element.return_value
+
+
+def test_navigation_out_of_frame():
+    driver = MagicMock()
+    selector = Selector(driver)
+    selection = selector.in_frame(selector.by_id("frame")).by_id("value")
+    selection.element  # noqa
+    # a driver.get has brought the driver back to the top-level document
+    element = MagicMock()
+    driver.find_element.side_effect = [NoSuchElementException(), MagicMock(), element]
+    assert selection.element is element
+    assert driver.switch_to.frame.call_count == 2
+
+
+def test_actions_in_frame(mocker):
+    mocker.patch("lemoncheesecake.api.log_info")
+    driver = MagicMock()
+    element = MagicMock()
+    driver.execute_script.return_value = [element]
+    selector = Selector(driver)
+    selection = selector.in_frame(selector.by_id("frame")).by_id("value")
+    for _ in range(3):
+        selection.set_text("foo")
+    # after an action, the driver is checked to be still in the frame in the same command as the lookup
+    assert driver.execute_script.call_count == 2
+    assert driver.execute_script.call_args[0][1:] == (1, "css selector", '[id="value"]', True)
+    assert element.send_keys.call_count == 2
+    driver.switch_to.default_content.assert_called_once()
+    driver.switch_to.frame.assert_called_once()
+
+
+def test_action_navigating_out_of_frame(mocker):
+    mocker.patch("lemoncheesecake.api.log_info")
+    driver = MagicMock()
+    selector = Selector(driver)
+    selection = selector.in_frame(selector.by_id("frame")).by_id("value")
+    selection.click()
+    # the link clicked has navigated the top-level document
+    driver.execute_script.return_value = None
+    assert selection.element is driver.find_element.return_value
+    assert driver.switch_to.frame.call_count == 2
+
+
+def test_action_in_frame_then_missing_element(mocker):
+    mocker.patch("lemoncheesecake.api.log_info")
+    driver = MagicMock()
+    selector = Selector(driver)
+    selection = selector.in_frame(selector.by_id("frame")).by_id("value")
+    selection.click()
+    driver.execute_script.return_value = []
+    assert selection.elements == []
+    driver.switch_to.frame.assert_called_once()
+
+
+def test_wait_with_stale_shadow_root():
+    driver = MagicMock()
+    selector = Selector(driver)
+    selection = selector.in_shadow(selector.by_css_selector("my-component")).by_css_selector("input") \
+        .must_be_waited_until(ec.presence_of_element_located)
+    stale_shadow_root = MagicMock()
+    stale_shadow_root.find_element.side_effect = StaleElementReferenceException()
+    fresh_shadow_root = MagicMock()
+    type(driver.find_element.return_value).shadow_root = \
+        property(MagicMock(side_effect=[stale_shadow_root, fresh_shadow_root]))
+    assert selection.element is fresh_shadow_root.find_element.return_value
+
+
+def test_stale_element_without_context():
+    driver = MagicMock()
+    driver.find_element.side_effect = StaleElementReferenceException()
+    with pytest.raises(StaleElementReferenceException):
+        Selector(driver).by_id("value").element  # noqa
+
+
+def test_invalidate_context_cache():
+    driver = MagicMock()
+    selector = Selector(driver)
+    selection = selector.in_frame(selector.by_id("frame")).by_id("value")
+    selection.element  # noqa
+    selector.invalidate_context_cache()
+    selection.element  # noqa
+    assert driver.switch_to.frame.call_count == 2
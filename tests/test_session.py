@@ -0,0 +1,159 @@
+from unittest.mock import MagicMock, call
+
+import pytest
+from callee import StartsWith
+from selenium.common.exceptions import WebDriverException
+
+from selenium.webdriver.common.by import By
+
+from lemoncheesecake_selenium import SessionPool
+from lemoncheesecake_selenium.context import ContextEntry, FRAME, get_context_tracker
+from lemoncheesecake_selenium.prefetch import get_prefetch_generation
+
+
+@pytest.fixture
+def log_info_mock(mocker):
+    return mocker.patch("lemoncheesecake.api.log_info")
+
+
+@pytest.fixture
+def log_warning_mock(mocker):
+    return mocker.patch("lemoncheesecake.api.log_warning")
+
+
+def _make_driver(cdp=False):
+    driver = MagicMock()
+    driver.window_handles = ["main"]
+    if not cdp:
+        del driver.execute_cdp_cmd
+    return driver
+
+
+def test_use_reuse_session(log_info_mock):
+    factory = MagicMock(side_effect=_make_driver)
+    pool = SessionPool(factory)
+    with pool.use() as driver1:
+        pass
+    with pool.use() as driver2:
+        pass
+    assert driver1 is driver2
+    assert factory.call_count == 1
+    driver1.quit.assert_not_called()
+    log_info_mock.assert_called_with(StartsWith("Browser session reset in"))
+    assert pool.reset_count == 2
+    assert pool.reset_time > 0
+
+
+def test_reset():
+    driver = _make_driver()
+    driver.window_handles = ["main", "popup1", "popup2"]
+    SessionPool(MagicMock()).reset(driver)
+    assert driver.close.call_count == 2
+    driver.switch_to.window.assert_called_with("main")
+    driver.execute_async_script.assert_called_once()
+    driver.delete_all_cookies.assert_called_once()
+    driver.implicitly_wait.assert_called_with(0)
+    driver.set_page_load_timeout.assert_called_with(300)
+    driver.set_script_timeout.assert_called_with(30)
+    driver.get.assert_called_with("about:blank")
+
+
+def test_reset_origins():
+    driver = _make_driver()
+    SessionPool(MagicMock(), origins=["https://login.example.com"]).reset(driver)
+    assert driver.get.call_args_list == [call("https://login.example.com"), call("about:blank")]
+    assert driver.execute_async_script.call_count == 2
+    assert driver.delete_all_cookies.call_count == 2
+
+
+def test_reset_cdp():
+    driver = _make_driver(cdp=True)
+    SessionPool(MagicMock(), origins=["https://login.example.com"]).reset(driver)
+    assert driver.execute_cdp_cmd.call_args_list == [
+        call("Network.clearBrowserCookies", {}),
+        call("Storage.clearDataForOrigin", {"origin": "https://login.example.com", "storageTypes": "all"}),
+    ]
+    driver.delete_all_cookies.assert_not_called()
+    driver.execute_async_script.assert_called_once()
+    driver.get.assert_called_once_with("about:blank")
+
+
+def test_reset_failure(log_info_mock, log_warning_mock):
+    factory = MagicMock(side_effect=_make_driver)
+    pool = SessionPool(factory)
+    with pool.use() as driver1:
+        driver1.delete_all_cookies.side_effect = WebDriverException("crashed")
+    with pool.use() as driver2:
+        pass
+    assert driver1 is not driver2
+    driver1.quit.assert_called_once()
+    log_warning_mock.assert_called_with(StartsWith("Could not reset browser session"))
+
+
+def test_max_uses(log_info_mock):
+    factory = MagicMock(side_effect=_make_driver)
+    pool = SessionPool(factory, max_uses=2)
+    drivers = []
+    for _ in range(3):
+        with pool.use() as driver:
+            drivers.append(driver)
+    assert drivers[0] is drivers[1]
+    assert drivers[2] is not drivers[0]
+    drivers[0].quit.assert_called_once()
+    log_info_mock.assert_any_call("Restart browser session after 2 uses")
+
+
+def test_concurrent_use(log_info_mock):
+    factory = MagicMock(side_effect=_make_driver)
+    pool = SessionPool(factory)
+    with pool.use() as driver1:
+        with pool.use() as driver2:
+            assert driver1 is not driver2
+    assert factory.call_count == 2
+
+
+def test_quit_all(log_info_mock):
+    pool = SessionPool(MagicMock(side_effect=_make_driver))
+    with pool.use() as driver:
+        pass
+    pool.quit_all()
+    driver.quit.assert_called_once()
+    with pool.use() as other_driver:
+        pass
+    assert other_driver is not driver
+
+
+def test_reset_invalidates_cached_state():
+    driver = _make_driver()
+    tracker = get_context_tracker(driver)
+    tracker.enter((ContextEntry(FRAME, By.ID, "frame"),))
+    generation = get_prefetch_generation(driver)
+    SessionPool(MagicMock()).reset(driver)
+    assert get_prefetch_generation(driver) == generation + 1
+    tracker.enter((ContextEntry(FRAME, By.ID, "frame"),))
+    assert driver.switch_to.frame.call_count == 2
+
+
+def test_reset_connection_error(log_info_mock, log_warning_mock):
+    factory = MagicMock(side_effect=_make_driver)
+    pool = SessionPool(factory)
+    with pool.use() as driver1:
+        driver1.delete_all_cookies.side_effect = ConnectionError("connection refused")
+        driver1.quit.side_effect = ConnectionError("connection refused")
+    with pool.use() as driver2:
+        pass
+    assert driver1 is not driver2
+    log_warning_mock.assert_called_with(StartsWith("Could not reset browser session"))
+
+
+def test_quit_all_with_session_in_use(log_info_mock):
+    pool = SessionPool(MagicMock(side_effect=_make_driver))
+    with pool.use() as driver:
+        with pool.use() as idle_driver:
+            pass
+        pool.quit_all()
+        idle_driver.quit.assert_called_once()
+        driver.quit.assert_not_called()
+    driver.quit.assert_called_once()
+    # the session in use has been quit instead of being reset
+    driver.delete_all_cookies.assert_not_called()
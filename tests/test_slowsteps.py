@@ -0,0 +1,76 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from callee import StartsWith
+from selenium.common.exceptions import WebDriverException
+
+from lemoncheesecake_selenium import Selector, SlowStepDetector
+
+
+@pytest.fixture
+def log_warning_mock(mocker):
+    return mocker.patch("lemoncheesecake.api.log_warning")
+
+
+@pytest.fixture
+def save_screenshot_mock(mocker):
+    return mocker.patch("lemoncheesecake_selenium.slowsteps.save_screenshot")
+
+
+def _slow_find(driver):
+    driver.find_element.side_effect = lambda *_: time.sleep(0.02)
+
+
+def test_slow_step(log_warning_mock, save_screenshot_mock):
+    driver = MagicMock()
+    _slow_find(driver)
+    with SlowStepDetector({"find": 0.01}):
+        Selector(driver).by_id("value").element  # noqa
+    log_warning_mock.assert_called_once_with(StartsWith("Slow step: find element identified by id 'value' took"))
+    save_screenshot_mock.assert_not_called()
+
+
+def test_fast_step(log_warning_mock):
+    driver = MagicMock()
+    with SlowStepDetector({"find": 10}):
+        Selector(driver).by_id("value").element  # noqa
+    log_warning_mock.assert_not_called()
+
+
+def test_unmonitored_step(log_warning_mock):
+    driver = MagicMock()
+    _slow_find(driver)
+    detector = SlowStepDetector()
+    del detector.thresholds["find"]
+    with detector:
+        Selector(driver).by_id("value").element  # noqa
+    log_warning_mock.assert_not_called()
+
+
+def test_screenshot_rate_limit(log_warning_mock, save_screenshot_mock):
+    driver = MagicMock()
+    _slow_find(driver)
+    with SlowStepDetector({"find": 0.01}, screenshot=True, screenshot_interval=3600):
+        Selector(driver).by_id("value").element  # noqa
+        Selector(driver).by_id("value").element  # noqa
+    assert log_warning_mock.call_count == 2
+    save_screenshot_mock.assert_called_once_with(driver, StartsWith("Slow step"))
+
+
+def test_max_screenshots(log_warning_mock, save_screenshot_mock):
+    driver = MagicMock()
+    _slow_find(driver)
+    with SlowStepDetector({"find": 0.01}, screenshot=True, screenshot_interval=0, max_screenshots=2):
+        for _ in range(3):
+            Selector(driver).by_id("value").element  # noqa
+    assert save_screenshot_mock.call_count == 2
+
+
+def test_screenshot_failure(log_warning_mock, save_screenshot_mock):
+    driver = MagicMock()
+    _slow_find(driver)
+    save_screenshot_mock.side_effect = WebDriverException("error")
+    with SlowStepDetector({"find": 0.01}, screenshot=True):
+        Selector(driver).by_id("value").element  # noqa
+    log_warning_mock.assert_called_with(StartsWith("Could not save screenshot"))
@@ -0,0 +1,106 @@
+from unittest.mock import MagicMock
+
+import pytest
+from lemoncheesecake.matching import all_of, any_of, not_, equal_to
+
+from lemoncheesecake_selenium import has_text, has_attribute, has_property, is_displayed, is_enabled, \
+    is_selected, is_in_page, has_css, has_size, is_in_viewport, is_not_obscured
+from lemoncheesecake_selenium.snapshot import ElementSnapshot, fetch_snapshots, get_required_fields, \
+    has_layout_fields
+
+from helpers import MyMatcher
+
+
+def test_snapshot():
+    snapshot = ElementSnapshot({
+        "text": "foo", "tag_name": "a", "displayed": True, "enabled": False, "selected": True,
+        "attribute:href": "/path", "property:value": 42
+    })
+    assert snapshot.text == "foo"
+    assert snapshot.tag_name == "a"
+    assert snapshot.is_displayed() is True
+    assert snapshot.is_enabled() is False
+    assert snapshot.is_selected() is True
+    assert snapshot.get_attribute("href") == "/path"
+    assert snapshot.get_property("value") == 42
+
+
+def test_snapshot_layout():
+    snapshot = ElementSnapshot({
+        "css:color": "red", "rect": {"x": 1, "y": 2, "width": 3, "height": 4},
+        "in_viewport": True, "fully_in_viewport": False, "not_obscured": True
+    })
+    assert snapshot.value_of_css_property("color") == "red"
+    assert snapshot.rect == {"x": 1, "y": 2, "width": 3, "height": 4}
+    assert snapshot.size == {"width": 3, "height": 4}
+    assert snapshot.is_in_viewport() is True
+    assert snapshot.is_in_viewport(fully=True) is False
+    assert snapshot.is_not_obscured() is True
+
+
+def test_snapshot_fallback():
+    element = MagicMock()
+    element.text = "foo"
+    snapshot = ElementSnapshot({}, element)
+    assert snapshot.text == "foo"
+    assert snapshot.get_attribute("href") is element.get_attribute.return_value
+    element.get_attribute.assert_called_with("href")
+
+
+def test_snapshot_missing_field():
+    with pytest.raises(KeyError):
+        ElementSnapshot({}).text  # noqa
+
+
+def test_fetch_snapshots():
+    driver = MagicMock()
+    elements = [object(), object()]
+    driver.execute_script.return_value = [{"text": "foo"}, {"text": "bar"}]
+    snapshots = fetch_snapshots(driver, elements, {"text", "displayed"})
+    assert [s.text for s in snapshots] == ["foo", "bar"]
+    assert [s.element for s in snapshots] == elements
+    driver.execute_script.assert_called_once()
+    assert driver.execute_script.call_args[0][1:] == (elements, ["displayed", "text"])
+
+
+def test_fetch_snapshots_no_elements():
+    driver = MagicMock()
+    assert fetch_snapshots(driver, [], {"text"}) == []
+    driver.execute_script.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "matcher,expected", (
+        (has_text("foo"), {"text"}),
+        (has_attribute("href"), {"attribute:href"}),
+        (has_property("value", 1), {"property:value"}),
+        (is_displayed(), {"displayed"}),
+        (is_enabled(), {"enabled"}),
+        (is_selected(), {"selected"}),
+        (is_in_page(), set()),
+        (has_css("color"), {"css:color"}),
+        (has_size(10), {"rect"}),
+        (is_in_viewport(), {"in_viewport"}),
+        (is_in_viewport(fully=True), {"fully_in_viewport"}),
+        (is_not_obscured(), {"not_obscured"}),
+        (all_of(has_text("foo"), any_of(is_displayed(), not_(is_enabled()))), {"text", "displayed", "enabled"}),
+        (MyMatcher(), None),
+        (equal_to("foo"), None),
+        (all_of(has_text("foo"), MyMatcher()), None),
+    )
+)
+def test_get_required_fields(matcher, expected):
+    assert get_required_fields(matcher) == expected
+
+
+@pytest.mark.parametrize(
+    "fields,expected", (
+        ({"text", "displayed"}, False),
+        ({"text", "css:color"}, True),
+        ({"rect"}, True),
+        ({"not_obscured"}, True),
+        (set(), False),
+    )
+)
+def test_has_layout_fields(fields, expected):
+    assert has_layout_fields(fields) is expected
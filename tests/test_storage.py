@@ -0,0 +1,117 @@
+import time
+from unittest.mock import MagicMock, call
+
+import pytest
+
+from lemoncheesecake_selenium import StorageState, StoredLogin
+
+
+@pytest.fixture(autouse=True)
+def log_info_mock(mocker):
+    return mocker.patch("lemoncheesecake.api.log_info")
+
+
+def _make_driver(url="about:blank"):
+    driver = MagicMock()
+    driver.current_url = url
+    driver.execute_script.return_value = {
+        "origin": "https://example.com", "local": {"token": "abc"}, "session": {"tab": "1"}
+    }
+    driver.get_cookies.return_value = [
+        {"name": "sid", "value": "123", "domain": ".example.com", "path": "/", "httpOnly": True},
+    ]
+    return driver
+
+
+def test_capture():
+    state = StorageState.capture(_make_driver())
+    assert state.origin == "https://example.com"
+    assert state.cookies[0]["name"] == "sid"
+    assert state.local_storage == {"token": "abc"}
+    assert state.session_storage == {"tab": "1"}
+
+
+def test_restore():
+    state = StorageState(
+        "https://www.example.com",
+        [{"name": "sid", "value": "123", "domain": ".example.com", "extra": "x"},
+         {"name": "idp", "value": "456", "domain": "login.other.com"}],
+        {"token": "abc"}, {"tab": "1"}
+    )
+    driver = _make_driver()
+    state.restore(driver)
+    driver.get.assert_called_once_with("https://www.example.com/")
+    driver.add_cookie.assert_called_once_with({"name": "sid", "value": "123", "domain": ".example.com"})
+    assert driver.execute_script.call_args[0][1:] == ({"token": "abc"}, {"tab": "1"})
+
+
+def test_restore_same_origin():
+    driver = _make_driver("https://example.com/home")
+    StorageState("https://example.com").restore(driver)
+    driver.get.assert_not_called()
+
+
+def test_is_expired():
+    now = time.time()
+    assert not StorageState("https://example.com", [{"name": "sid", "value": "1"}]).is_expired()
+    assert StorageState("https://example.com", [{"name": "sid", "value": "1", "expiry": now + 10}]).is_expired()
+    assert not StorageState(
+        "https://example.com", [{"name": "sid", "value": "1", "expiry": now + 3600}]
+    ).is_expired()
+    assert StorageState("https://example.com", created=now - 100).is_expired(max_age=60)
+
+
+def test_save_load(tmp_path):
+    path = str(tmp_path / "state.json")
+    StorageState("https://example.com", [{"name": "sid", "value": "1"}], {"a": "1"}, {"b": "2"}, 1234).save(path)
+    state = StorageState.load(path)
+    assert (state.origin, state.cookies, state.local_storage, state.session_storage, state.created) == \
+        ("https://example.com", [{"name": "sid", "value": "1"}], {"a": "1"}, {"b": "2"}, 1234)
+
+
+def test_load_invalid(tmp_path):
+    assert StorageState.load(str(tmp_path / "missing.json")) is None
+    (tmp_path / "invalid.json").write_text("{")
+    assert StorageState.load(str(tmp_path / "invalid.json")) is None
+
+
+def test_stored_login(tmp_path):
+    path = str(tmp_path / "login.json")
+    login = MagicMock()
+    stored_login = StoredLogin(path, login)
+
+    driver = _make_driver()
+    assert stored_login.apply(driver, "https://example.com/dashboard") is False
+    login.assert_called_once_with(driver)
+    driver.get.assert_called_with("https://example.com/dashboard")
+
+    # restored from memory
+    driver = _make_driver()
+    assert stored_login.apply(driver, "https://example.com/dashboard") is True
+    login.assert_called_once()
+    driver.add_cookie.assert_called_once()
+    assert driver.get.call_args_list == [call("https://example.com/"), call("https://example.com/dashboard")]
+
+    # restored from file
+    assert StoredLogin(path, login).apply(_make_driver(), "https://example.com/dashboard") is True
+    login.assert_called_once()
+
+
+def test_stored_login_expired(tmp_path):
+    path = str(tmp_path / "login.json")
+    StorageState("https://example.com", created=time.time() - 100).save(path)
+    login = MagicMock()
+    assert StoredLogin(path, login, max_age=60).apply(_make_driver(), "https://example.com/") is False
+    login.assert_called_once()
+    assert StorageState.load(path).created > time.time() - 60
+
+
+def test_stored_login_not_logged_in(tmp_path):
+    path = str(tmp_path / "login.json")
+    StorageState("https://example.com").save(path)
+    login = MagicMock()
+    driver = _make_driver()
+    stored_login = StoredLogin(path, login, is_logged_in=lambda _: False)
+    assert stored_login.apply(driver, "https://example.com/") is False
+    login.assert_called_once_with(driver)
+    driver.delete_all_cookies.assert_called_once()
@@ -0,0 +1,114 @@
+from unittest.mock import MagicMock
+
+from lemoncheesecake.matching import match_pattern
+from lemoncheesecake.matching.matcher import MatcherDescriptionTransformer
+
+from lemoncheesecake_selenium import has_row, contains_rows
+from lemoncheesecake_selenium.table import fetch_table, make_rows
+
+GRID = [
+    ["name", "price", "stock"],
+    ["apple", "1.5", "10"],
+    ["banana", "0.5", "0"],
+]
+
+TABLE = make_rows(GRID)
+
+
+def test_fetch_table():
+    driver = MagicMock()
+    element = object()
+    driver.execute_script.return_value = GRID
+    assert fetch_table(driver, element) == GRID
+    assert driver.execute_script.call_args[0][1:] == (element,)
+
+
+def test_make_rows_with_header():
+    assert TABLE == [
+        {"name": "apple", "price": "1.5", "stock": "10"},
+        {"name": "banana", "price": "0.5", "stock": "0"},
+    ]
+
+
+def test_make_rows_with_columns():
+    assert make_rows(GRID, columns=["fruit", None, "qty"]) == [
+        {"fruit": "apple", "qty": "10"},
+        {"fruit": "banana", "qty": "0"},
+    ]
+
+
+def test_make_rows_without_header():
+    assert make_rows(GRID[1:], header_row=False) == [
+        {0: "apple", 1: "1.5", 2: "10"},
+        {0: "banana", 1: "0.5", 2: "0"},
+    ]
+
+
+def test_make_rows_empty():
+    assert make_rows([]) == []
+
+
+def test_has_row_description():
+    assert has_row(name="apple").build_description(MatcherDescriptionTransformer()) == \
+        "to have a row with 'name' that is equal to \"apple\""
+
+
+def test_has_row_success():
+    result = has_row(name="banana", price=match_pattern(r"^0\.")).matches(TABLE)
+    assert result
+    assert result.description == "found at row #1"
+
+
+def test_has_row_with_dict():
+    assert has_row({"name": "apple"}).matches(TABLE)
+
+
+def test_has_row_failure():
+    result = has_row(name="banana", price="0.6").matches(TABLE)
+    assert not result
+    assert result.description == "closest row is #1 which differs on 'price': '0.5'"
+
+
+def test_has_row_unknown_column():
+    result = has_row(color="yellow").matches(TABLE)
+    assert not result
+    assert result.description == "closest row is #0 which differs on no 'color' column"
+
+
+def test_has_row_empty_table():
+    assert has_row(name="apple").matches([]).description == "the table is empty"
+
+
+def test_contains_rows_description():
+    assert contains_rows({"name": "apple"}, {"name": "banana"}).build_description(MatcherDescriptionTransformer()) == \
+        "to contain rows: ['name' that is equal to \"apple\"]; ['name' that is equal to \"banana\"]"
+
+
+def test_contains_rows_success():
+    assert contains_rows({"name": "banana", "stock": "0"}, {"name": "apple"}).matches(TABLE)
+
+
+def test_contains_rows_distinct_rows():
+    table = make_rows([["name", "stock"], ["apple", "10"], ["apple", "0"]])
+    # the first expected row could take either row, the second one only the first row
+    assert contains_rows({"name": "apple"}, {"name": "apple", "stock": "10"}).matches(table)
+    result = contains_rows({"name": "apple"}, {"name": "apple"}, {"stock": "10"}).matches(table)
+    assert not result
+    assert result.description == (
+        "1 of 3 rows are missing\n"
+        "- missing row {'stock': '10'}: all the matching rows (#0) are matched by other expected rows"
+    )
+
+
+def test_contains_rows_same_row_twice():
+    assert not contains_rows({"name": "apple"}, {"name": "apple"}).matches(TABLE)
+
+
+def test_contains_rows_failure():
+    result = contains_rows({"name": "apple"}, {"name": "banana", "stock": "5"}, {"name": "cherry"}).matches(TABLE)
+    assert not result
+    assert result.description == (
+        "2 of 3 rows are missing\n"
+        "- missing row {'name': 'banana', 'stock': '5'}: closest row is #1 which differs on 'stock': '0'\n"
+        "- missing row {'name': 'cherry'}: closest row is #0 which differs on 'name': 'apple'"
+    )
@@ -0,0 +1,161 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+from callee import Contains
+
+from lemoncheesecake_selenium import Selector, Selection, TimeoutLearner
+from lemoncheesecake_selenium.instrumentation import Step
+
+
+@pytest.fixture(autouse=True)
+def restore_timeout_provider():
+    orig = Selection.timeout_provider
+    yield
+    Selection.timeout_provider = orig
+
+
+def _make_selection(value="value"):
+    return Selector(MagicMock()).by_id(value)
+
+
+def _make_wait_step(selection, duration, timeout=10, error=None):
+    step = Step("wait", selection, {"timeout": timeout})
+    step.start, step.end = 0.0, duration
+    step.error = error
+    return step
+
+
+def _feed(learner, selection, durations, **kwargs):
+    for duration in durations:
+        learner.on_step_end(_make_wait_step(selection, duration, **kwargs))
+
+
+def test_learned_timeout(tmp_path):
+    learner = TimeoutLearner(str(tmp_path / "history.json"), min_samples=5, margin=2, min_timeout=0.1)
+    selection = _make_selection()
+    _feed(learner, selection, [0.1, 0.2, 0.3, 0.4])
+    assert learner.get_timeout(selection) is None
+    _feed(learner, selection, [0.5])
+    assert learner.get_timeout(selection) == pytest.approx(1.0)
+
+
+def test_learned_timeout_percentile(tmp_path):
+    learner = TimeoutLearner(str(tmp_path / "history.json"), min_samples=1, percentile=50, margin=1, min_timeout=0)
+    selection = _make_selection()
+    _feed(learner, selection, [0.4, 0.1, 0.3, 0.2])
+    assert learner.get_timeout(selection) == pytest.approx(0.2)
+
+
+def test_learned_timeout_clamped(tmp_path):
+    learner = TimeoutLearner(str(tmp_path / "history.json"), min_samples=1, min_timeout=1, max_timeout=5)
+    fast, slow = _make_selection("fast"), _make_selection("slow")
+    _feed(learner, fast, [0.01])
+    _feed(learner, slow, [20])
+    assert learner.get_timeout(fast) == 1
+    assert learner.get_timeout(slow) == 5
+
+
+def test_failed_waits_are_not_learned(tmp_path):
+    learner = TimeoutLearner(str(tmp_path / "history.json"), min_samples=1)
+    selection = _make_selection()
+    _feed(learner, selection, [10], error=Exception())
+    assert learner.get_timeout(selection) is None
+
+
+def test_timed_out_waits_grow_the_timeout(tmp_path):
+    learner = TimeoutLearner(str(tmp_path / "history.json"), min_samples=1, margin=2, min_timeout=0)
+    selection = _make_selection()
+    _feed(learner, selection, [0.5])
+    assert learner.get_timeout(selection) == 1
+    # the learned timeout has become too short
+    _feed(learner, selection, [1], timeout=1, error=TimeoutException())
+    assert learner.get_timeout(selection) == 2
+
+
+def test_learned_timeout_per_condition(tmp_path):
+    learner = TimeoutLearner(str(tmp_path / "history.json"), min_samples=1, margin=1, min_timeout=0)
+
+    def presence_of_element_located(locator):
+        return lambda driver: True
+
+    def visibility_of_element_located(locator):
+        return lambda driver: True
+
+    appears = _make_selection("spinner").must_be_waited_until(presence_of_element_located)
+    disappears = _make_selection("spinner").must_be_waited_until_not(visibility_of_element_located)
+    visible = _make_selection("spinner").must_be_waited_until(visibility_of_element_located)
+    _feed(learner, appears, [1])
+    _feed(learner, disappears, [5])
+    assert learner.get_timeout(appears) == 1
+    assert learner.get_timeout(disappears) == 5
+    assert learner.get_timeout(visible) is None
+    assert learner.get_timeout(_make_selection("spinner")) is None
+    learner.save()
+    assert sorted(json.load(open(tmp_path / "history.json"))["locators"]) == [
+        "element identified by id 'spinner' until not visibility_of_element_located",
+        "element identified by id 'spinner' until presence_of_element_located",
+    ]
+
+
+def test_max_samples(tmp_path):
+    learner = TimeoutLearner(str(tmp_path / "history.json"), min_samples=1, max_samples=2, margin=1, min_timeout=0)
+    selection = _make_selection()
+    _feed(learner, selection, [9, 1, 2])
+    assert learner.get_timeout(selection) == 2
+
+
+def test_history(tmp_path):
+    path = str(tmp_path / "history.json")
+    learner = TimeoutLearner(path, min_samples=2, margin=1, min_timeout=0)
+    selection = _make_selection()
+    _feed(learner, selection, [1.5, 2.5])
+    learner.save()
+    assert json.load(open(path)) == {"locators": {str(selection): [1.5, 2.5]}}
+    assert TimeoutLearner(path, min_samples=2, margin=1, min_timeout=0).get_timeout(selection) == 2.5
+
+
+def test_near_limit_locators(tmp_path):
+    learner = TimeoutLearner(str(tmp_path / "history.json"), near_limit_ratio=0.5)
+    ok, near, timed_out = _make_selection("ok"), _make_selection("near"), _make_selection("timed_out")
+    _feed(learner, ok, [1], timeout=10)
+    _feed(learner, near, [6, 7], timeout=10)
+    _feed(learner, timed_out, [10], timeout=10, error=Exception())
+    assert learner.get_near_limit_locators() == [
+        (str(timed_out), 10, 10, True), (str(near), 7, 10, False)
+    ]
+    report = learner.format_report()
+    assert "timed out" in report
+    assert "70%" in report
+
+
+def test_save_report(tmp_path, mocker):
+    mock = mocker.patch("lemoncheesecake.api.save_attachment_content")
+    TimeoutLearner(str(tmp_path / "history.json")).save_report()
+    mock.assert_called_once_with(Contains("Locators near their timeout"), "timeouts.txt", "Learned timeouts report")
+
+
+def test_timeout_provider(tmp_path, mocker):
+    wait_mock = mocker.patch("selenium.webdriver.support.ui.WebDriverWait")
+    learner = TimeoutLearner(str(tmp_path / "history.json"), min_samples=1, margin=1, min_timeout=0)
+    selection = _make_selection().must_be_waited_until(MagicMock())
+    _feed(learner, selection, [3])
+    with learner:
+        selection.element  # noqa
+        assert wait_mock.call_args[0] == (selection.driver, 3)
+        # an explicit timeout takes precedence
+        selection.must_be_waited_until(MagicMock(), timeout=7).element  # noqa
+        assert wait_mock.call_args[0] == (selection.driver, 7)
+    assert Selection.timeout_provider is None
+    selection.must_be_waited_until(MagicMock()).element  # noqa
+    assert wait_mock.call_args[0] == (selection.driver, Selection.default_timeout)
+
+
+def test_wait_durations_are_recorded(tmp_path, mocker):
+    mocker.patch("selenium.webdriver.support.ui.WebDriverWait")
+    learner = TimeoutLearner(str(tmp_path / "history.json"), min_samples=1, min_timeout=0.5)
+    selection = _make_selection().must_be_waited_until(MagicMock())
+    with learner:
+        selection.element  # noqa
+    assert learner.get_timeout(selection) == 0.5
@@ -0,0 +1,113 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from lemoncheesecake_selenium import Selector, Tracer, instrument_driver
+from lemoncheesecake_selenium.instrumentation import step
+
+
+@pytest.fixture
+def tracer():
+    with Tracer() as tracer:
+        yield tracer
+
+
+def test_nested_spans(tracer):
+    driver = MagicMock()
+    driver.find_element.side_effect = lambda *_: driver.execute("findElement")
+    instrument_driver(driver)
+    with tracer.trace_test("suite.test"):
+        Selector(driver).by_id("foo").element  # noqa
+
+    command, find, test = tracer.spans
+    assert test.kind == "test" and test.name == "suite.test" and test.parent_id is None
+    assert find.kind == "find" and find.parent_id == test.span_id
+    assert find.attributes == {"locator": "element identified by id 'foo'"}
+    assert command.kind == "command" and command.parent_id == find.span_id
+    assert command.attributes == {"command": "findElement"}
+    assert len({span.trace_id for span in tracer.spans}) == 1
+    assert test.start <= find.start <= command.start <= command.end <= find.end <= test.end
+
+
+def test_error(tracer):
+    with pytest.raises(ValueError):
+        with step("click"):
+            raise ValueError("oops")
+    assert tracer.spans[0].error == "ValueError: oops"
+
+
+def test_sampling():
+    with Tracer(sample_rate=0) as tracer:
+        with tracer.trace_test("test"):
+            with step("click"):
+                pass
+        with step("click"):
+            pass
+    assert tracer.spans == []
+
+
+def test_invalid_sample_rate():
+    with pytest.raises(ValueError):
+        Tracer(sample_rate=2)
+
+
+def test_max_spans():
+    with Tracer(max_spans=1) as tracer:
+        with step("click"):
+            pass
+        with step("clear"):
+            pass
+    assert [span.kind for span in tracer.spans] == ["click"]
+    assert tracer.dropped_spans == 1
+
+
+def test_write_chrome_trace(tracer, tmp_path):
+    with step("wait", timeout=5):
+        pass
+    with pytest.raises(ValueError):
+        with step("click"):
+            raise ValueError("oops")
+
+    path = tmp_path / "trace.json"
+    tracer.write_chrome_trace(str(path))
+    wait, click = json.loads(path.read_text())["traceEvents"]
+    assert wait["name"] == "wait" and wait["cat"] == "wait" and wait["ph"] == "X"
+    assert wait["args"] == {"timeout": 5, "outcome": "ok"}
+    assert wait["dur"] >= 0
+    assert click["args"] == {"outcome": "error", "error": "ValueError: oops"}
+
+
+def test_write_otlp_json(tracer, tmp_path):
+    with tracer.trace_test("test"):
+        with pytest.raises(ValueError):
+            with step("wait", timeout=5):
+                raise ValueError("oops")
+
+    path = tmp_path / "trace.otlp.json"
+    tracer.write_otlp_json(str(path))
+    resource_spans = json.loads(path.read_text())["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "lemoncheesecake-selenium"}}
+    ]
+    wait, test = resource_spans["scopeSpans"][0]["spans"]
+    assert len(wait["traceId"]) == 32 and wait["traceId"] == test["traceId"]
+    assert len(wait["spanId"]) == 16 and wait["parentSpanId"] == test["spanId"]
+    assert "parentSpanId" not in test
+    assert int(wait["startTimeUnixNano"]) <= int(wait["endTimeUnixNano"])
+    assert wait["attributes"] == [
+        {"key": "timeout", "value": {"intValue": "5"}},
+        {"key": "lcc.kind", "value": {"stringValue": "wait"}},
+    ]
+    assert wait["status"] == {"code": 2, "message": "ValueError: oops"}
+    assert test["status"] == {"code": 1}
+
+
+def test_save_report(tracer, mocker, tmp_path):
+    prepare_attachment_mock = mocker.patch("lemoncheesecake.api.prepare_attachment")
+    prepare_attachment_mock.return_value.__enter__.side_effect = [
+        str(tmp_path / "trace.json"), str(tmp_path / "trace.otlp.json")
+    ]
+    tracer.save_report()
+    assert (tmp_path / "trace.json").exists()
+    assert (tmp_path / "trace.otlp.json").exists()
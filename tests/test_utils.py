@@ -1,10 +1,12 @@
+import gzip
 from unittest.mock import MagicMock
 
 import pytest
 from callee import String, Any, Contains
 from selenium.common.exceptions import WebDriverException
 
-from lemoncheesecake_selenium import save_screenshot, save_screenshot_on_exception
+from lemoncheesecake_selenium import save_screenshot, save_screenshot_on_exception, save_page_source, \
+    save_page_source_on_exception
 
 
 ATTACHMENT_PATH = "/some/path"
@@ -48,3 +50,82 @@ def test_save_screenshot_on_exception_without_exception(prepare_image_attachment
 
     driver_mock.save_screenshot.assert_not_called()
 
+
+
+@pytest.fixture
+def report_dir(mocker, tmp_path):
+    session = MagicMock()
+    session.report_dir = str(tmp_path)
+    mocker.patch("lemoncheesecake_selenium.utils.Session.get", return_value=session)
+    (tmp_path / "attachments").mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def prepare_attachment_mock(mocker, report_dir):
+    paths = (str(report_dir / "attachments" / f"{idx:04d}_page_source.html.gz") for idx in range(1, 100))
+    mock = mocker.patch("lemoncheesecake.api.prepare_attachment")
+    mock.return_value.__enter__.side_effect = paths
+    return mock
+
+
+@pytest.fixture
+def log_url_mock(mocker):
+    return mocker.patch("lemoncheesecake.api.log_url")
+
+
+def _read_page_source(report_dir, idx=1):
+    with gzip.open(report_dir / "attachments" / f"{idx:04d}_page_source.html.gz", "rt") as fh:
+        return fh.read()
+
+
+def test_save_page_source(report_dir, prepare_attachment_mock):
+    driver_mock = MagicMock()
+    driver_mock.page_source = "<html>foo</html>"
+    save_page_source(driver_mock, "my desc")  # noqa
+    prepare_attachment_mock.assert_called_once_with("page_source.html.gz", "my desc")
+    assert _read_page_source(report_dir) == "<html>foo</html>"
+
+
+def test_save_page_source_deduplicated(report_dir, prepare_attachment_mock, log_url_mock):
+    driver_mock = MagicMock()
+    driver_mock.page_source = "<html>foo</html>"
+    save_page_source(driver_mock)  # noqa
+    save_page_source(driver_mock, "again")  # noqa
+    prepare_attachment_mock.assert_called_once()
+    log_url_mock.assert_called_once_with("attachments/0001_page_source.html.gz", Contains("again"))
+
+    driver_mock.page_source = "<html>bar</html>"
+    save_page_source(driver_mock)  # noqa
+    assert prepare_attachment_mock.call_count == 2
+
+
+def test_save_page_source_trimmed_around_element(report_dir, prepare_attachment_mock):
+    driver_mock = MagicMock()
+    driver_mock.page_source = "<html>" + "x" * 100 + "<div><p>foo</p></div></html>"
+    driver_mock.execute_script.return_value = {"html": "<div><p>foo</p></div>", "tag": "div", "isElement": False}
+    element = object()
+    save_page_source(driver_mock, element=element, max_size=50)  # noqa
+    assert driver_mock.execute_script.call_args[0][1:] == (element, 50)
+    assert _read_page_source(report_dir) == \
+        "<!-- Page source of 134 characters trimmed to the <div> element around the failing element -->\n" \
+        "<div><p>foo</p></div>"
+
+
+def test_save_page_source_trimmed(report_dir, prepare_attachment_mock):
+    driver_mock = MagicMock()
+    driver_mock.page_source = "<html>" + "x" * 100 + "</html>"
+    save_page_source(driver_mock, max_size=10)  # noqa
+    driver_mock.execute_script.assert_not_called()
+    assert _read_page_source(report_dir) == \
+        "<!-- Page source of 113 characters trimmed to its first 10 characters -->\n<html>xxxx"
+
+
+def test_save_page_source_on_exception(report_dir, prepare_attachment_mock):
+    driver_mock = MagicMock()
+    driver_mock.page_source = "<html>foo</html>"
+    with pytest.raises(WebDriverException):
+        with save_page_source_on_exception(driver_mock):  # noqa
+            raise WebDriverException("some error")
+
+    prepare_attachment_mock.assert_called_once_with(String(), Contains("some error"))
@@ -0,0 +1,134 @@
+import os
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from PIL import Image
+from lemoncheesecake.matching.matcher import MatcherDescriptionTransformer
+
+from lemoncheesecake_selenium import looks_like, visual
+from lemoncheesecake_selenium.visual import UPDATE_BASELINES_ENV_VAR, load_baseline, compute_diff_mask
+
+
+def _make_image(path, color=(255, 255, 255), size=(20, 10), squares=()):
+    pixels = np.full((size[1], size[0], 3), color, dtype=np.uint8)
+    for x, y, width, height, square_color in squares:
+        pixels[y:y + height, x:x + width] = square_color
+    Image.fromarray(pixels).save(path)
+
+
+def _make_element(**kwargs):
+    element = MagicMock()
+    element.screenshot.side_effect = lambda path: _make_image(path, **kwargs)
+    return element
+
+
+@pytest.fixture
+def prepare_image_attachment_mock(mocker, tmp_path):
+    mock = mocker.patch("lemoncheesecake.api.prepare_image_attachment")
+    mock.return_value.__enter__.return_value = str(tmp_path / "diff.png")
+    return mock
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    path = str(tmp_path / "baseline.png")
+    _make_image(path)
+    return path
+
+
+def test_description(baseline):
+    assert looks_like(baseline).build_description(MatcherDescriptionTransformer()) == \
+        f"to look like baseline '{baseline}'"
+
+
+def test_success(baseline, prepare_image_attachment_mock):
+    result = looks_like(baseline).matches(_make_element())
+    assert result
+    assert result.description == "0 pixels differ (0.00%, tolerance is 0.00%)"
+    prepare_image_attachment_mock.assert_not_called()
+
+
+def test_failure(baseline, prepare_image_attachment_mock, tmp_path):
+    result = looks_like(baseline).matches(_make_element(squares=[(0, 0, 4, 5, (0, 0, 0))]))
+    assert not result
+    assert result.description == "20 pixels differ (10.00%, tolerance is 0.00%)"
+    prepare_image_attachment_mock.assert_called_once()
+    diff = np.asarray(Image.open(tmp_path / "diff.png"))
+    assert tuple(diff[0, 0]) == (255, 0, 0)
+    assert tuple(diff[9, 19]) == (255, 255, 255)
+
+
+def test_tolerance(baseline, prepare_image_attachment_mock):
+    assert looks_like(baseline, tolerance=0.1).matches(_make_element(squares=[(0, 0, 4, 5, (0, 0, 0))]))
+    prepare_image_attachment_mock.assert_not_called()
+
+
+def test_threshold(baseline, prepare_image_attachment_mock):
+    element = _make_element(color=(250, 250, 250))
+    assert looks_like(baseline).matches(element)
+    assert not looks_like(baseline, threshold=0.01).matches(element)
+
+
+def test_ignore_regions(baseline, prepare_image_attachment_mock):
+    assert looks_like(baseline, ignore_regions=[(0, 0, 4, 5)]).matches(
+        _make_element(squares=[(0, 0, 4, 5, (0, 0, 0))])
+    )
+
+
+def test_size_mismatch(baseline):
+    result = looks_like(baseline).matches(_make_element(size=(10, 10)))
+    assert not result
+    assert result.description == "got an image of 10x10 pixels while the baseline is 20x10 pixels"
+
+
+def test_missing_baseline(tmp_path):
+    result = looks_like(str(tmp_path / "missing.png")).matches(_make_element())
+    assert not result
+    assert UPDATE_BASELINES_ENV_VAR in result.description
+
+
+def test_update_baseline(tmp_path, monkeypatch):
+    monkeypatch.setenv(UPDATE_BASELINES_ENV_VAR, "1")
+    path = tmp_path / "sub" / "baseline.png"
+    result = looks_like(str(path)).matches(_make_element(color=(0, 0, 0)))
+    assert result
+    assert np.asarray(Image.open(path)).max() == 0
+
+
+def test_load_baseline_cache(baseline, mocker):
+    decode_rgb_spy = mocker.spy(visual, "_decode_rgb")
+    first = load_baseline(baseline)
+    assert not first.flags.writeable
+    assert np.array_equal(load_baseline(baseline), first)
+    assert decode_rgb_spy.call_count == 1
+    _make_image(baseline, color=(0, 0, 0), size=(30, 10))
+    os.utime(baseline, ns=(0, 0))
+    assert load_baseline(baseline).shape == (10, 30, 3)
+    assert decode_rgb_spy.call_count == 2
+
+
+def test_load_baseline_cache_max_bytes(tmp_path, mocker):
+    # each 20x10 baseline takes 600 bytes of pixels
+    mocker.patch.object(visual, "_BASELINES_CACHE_MAX_BYTES", 1000)
+    decode_rgb_spy = mocker.spy(visual, "_decode_rgb")
+    paths = [str(tmp_path / f"baseline_{idx}.png") for idx in range(2)]
+    for path in paths:
+        _make_image(path)
+        load_baseline(path)
+    assert visual._baselines_bytes <= 1000
+    # the least recently used baseline has been evicted
+    load_baseline(paths[1])
+    assert decode_rgb_spy.call_count == 2
+    load_baseline(paths[0])
+    assert decode_rgb_spy.call_count == 3
+
+
+def test_anti_aliasing(tmp_path):
+    # a one pixel shift of a vertical line is considered as anti-aliasing
+    baseline_path, actual_path = str(tmp_path / "baseline.png"), str(tmp_path / "actual.png")
+    _make_image(baseline_path, squares=[(5, 0, 2, 10, (0, 0, 0))])
+    _make_image(actual_path, squares=[(6, 0, 2, 10, (0, 0, 0))])
+    baseline, actual = load_baseline(baseline_path), load_baseline(actual_path)
+    assert not compute_diff_mask(actual, baseline).any()
+    assert compute_diff_mask(actual, baseline, anti_aliasing=False).sum() == 20
@@ -0,0 +1,146 @@
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from lemoncheesecake_selenium import Selector
+from lemoncheesecake_selenium.waiting import _PRESENCE_SCRIPT
+
+
+def make_driver(appear_after=None):
+    """A driver whose elements appear after a given number of presence polls"""
+    appear_after = appear_after or {}
+    driver = MagicMock()
+    driver.polls = 0
+
+    def execute_script(script, locators):
+        assert script == _PRESENCE_SCRIPT
+        driver.polls += 1
+        return [driver.polls >= appear_after.get(value, 1) for _, value in locators]
+
+    driver.execute_script.side_effect = execute_script
+    return driver
+
+
+def test_wait_all_single_command_per_poll():
+    driver = make_driver({'[id="a"]': 1, '[id="b"]': 3})
+    selector = Selector(driver)
+    selector.wait_all(selector.by_id("a"), selector.by_id("b"), poll_frequency=0)
+    assert driver.polls == 3
+    # once available, an element is no longer polled
+    assert driver.execute_script.call_args[0][1] == [(By.CSS_SELECTOR, '[id="b"]')]
+
+
+def test_wait_all_timeout():
+    driver = make_driver({'[id="b"]': 1000, '[id="c"]': 1000})
+    selector = Selector(driver)
+    with pytest.raises(TimeoutException, match="some elements are not available in time: "
+                                               "element identified by id 'b', element identified by id 'c'"):
+        selector.wait_all(selector.by_id("a"), selector.by_id("b"), selector.by_id("c"), timeout=0.05,
+                          poll_frequency=0.01)
+
+
+def test_wait_all_per_selection_timeout():
+    driver = make_driver({'[id="b"]': 3})
+    selector = Selector(driver)
+    a = selector.by_id("a").must_be_waited_until(MagicMock(return_value=lambda _: False), timeout=0)
+    with pytest.raises(TimeoutException) as excinfo:
+        selector.wait_all(a, selector.by_id("b"), poll_frequency=0)
+    assert "id 'a'" in str(excinfo.value)
+    assert "id 'b'" not in str(excinfo.value)
+    # the other selections are still waited for once a selection has timed out
+    assert driver.polls == 3
+
+
+def test_wait_all_reports_all_timed_out_selections():
+    driver = make_driver({'[id="b"]': 1000})
+    selector = Selector(driver)
+    a = selector.by_id("a").must_be_waited_until(MagicMock(return_value=lambda _: False), timeout=0)
+    b = selector.by_id("b").must_be_waited_until(MagicMock(return_value=lambda _: False), timeout=0.02)
+    with pytest.raises(TimeoutException, match="element identified by id 'a', element identified by id 'b'"):
+        selector.wait_all(a, b, poll_frequency=0.01)
+
+
+def test_wait_frame_not_attached_yet():
+    driver = make_driver()
+    frame = MagicMock()
+    driver.find_element.side_effect = [NoSuchElementException(), frame]
+    selector = Selector(driver)
+    selector.wait_all(selector.in_frame(selector.by_id("frame")).by_id("a"), poll_frequency=0)
+    driver.switch_to.frame.assert_called_once_with(frame)
+    assert driver.polls == 1
+
+
+def test_wait_shadow_host_not_attached_yet():
+    driver = make_driver()
+    host = MagicMock()
+    host.shadow_root.find_elements.return_value = [object()]
+    driver.find_element.side_effect = [NoSuchElementException(), host]
+    selector = Selector(driver)
+    selector.wait_all(selector.in_shadow(selector.by_id("host")).by_id("a"), poll_frequency=0)
+    assert driver.find_element.call_count == 2
+
+
+def test_wait_shadow_root_detached():
+    driver = make_driver()
+    detached_host, host = MagicMock(), MagicMock()
+    # the cached shadow root is detached (DetachedShadowRootException with selenium >= 4.1)
+    detached_host.shadow_root.find_elements.side_effect = StaleElementReferenceException()
+    host.shadow_root.find_elements.return_value = [object()]
+    driver.find_element.side_effect = [detached_host, host]
+    selector = Selector(driver)
+    selector.wait_all(selector.in_shadow(selector.by_id("host")).by_id("a"), poll_frequency=0)
+    assert driver.find_element.call_count == 2
+
+
+def test_wait_any():
+    driver = make_driver({'[id="a"]': 5, '[id="b"]': 2})
+    selector = Selector(driver)
+    b = selector.by_id("b")
+    assert selector.wait_any(selector.by_id("a"), b, poll_frequency=0) is b
+    assert driver.polls == 2
+
+
+def test_wait_any_timeout():
+    driver = make_driver({'[id="a"]': 1000})
+    selector = Selector(driver)
+    with pytest.raises(TimeoutException, match="none of the elements is available in time"):
+        selector.wait_any(selector.by_id("a"), timeout=0.02, poll_frequency=0.01)
+
+
+def test_wait_any_no_selection():
+    with pytest.raises(ValueError):
+        Selector(make_driver()).wait_any()
+
+
+def test_wait_all_no_selection():
+    Selector(make_driver()).wait_all()
+
+
+def test_wait_with_expected_condition():
+    driver = make_driver()
+    selector = Selector(driver)
+    outcomes = iter([False, True])
+    condition = MagicMock(return_value=lambda _: next(outcomes))
+    selection = selector.by_id("a").must_be_waited_until(condition, extra_args=("foo",))
+    selector.wait_all(selection, poll_frequency=0)
+    condition.assert_called_with((By.ID, "a"), "foo")
+    driver.execute_script.assert_not_called()
+
+
+def test_wait_with_expected_condition_not():
+    driver = make_driver()
+    selector = Selector(driver)
+    condition = MagicMock(return_value=MagicMock(side_effect=NoSuchElementException()))
+    selector.wait_all(selector.by_id("a").must_be_waited_until_not(condition), poll_frequency=0)
+
+
+def test_wait_in_shadow_root():
+    driver = make_driver()
+    selector = Selector(driver)
+    shadow_root = driver.find_element.return_value.shadow_root
+    shadow_root.find_elements.side_effect = [[], [object()]]
+    selector.wait_all(selector.in_shadow(selector.by_id("host")).by_id("a"), poll_frequency=0)
+    assert shadow_root.find_elements.call_count == 2
+    driver.execute_script.assert_not_called()